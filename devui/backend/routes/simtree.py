@@ -1,7 +1,9 @@
 import asyncio
 import json
 
-from fastapi import APIRouter, HTTPException, WebSocket
+from typing import Iterator
+
+from fastapi import APIRouter, Depends, HTTPException, WebSocket
 
 from socialsim4.core.simtree import SimTree
 from socialsim4.devui.backend.models.payloads import (
@@ -30,6 +32,18 @@ from socialsim4.scripts.run_basic_scenes import (
 router = APIRouter(tags=["simtree"])
 
 
+def _leased_record(tree_id: int) -> Iterator[SimTreeRecord]:
+    # Held until the handler returns, so the tree is not spilled while in use
+    try:
+        rec = TREES.pin(tree_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="simtree not found") from None
+    try:
+        yield rec
+    finally:
+        TREES.unpin(rec)
+
+
 @router.post("/simtree", response_model=SimTreeCreateResult)
 def create_tree(payload: SimTreeCreatePayload):
     sc = payload.scenario
@@ -72,72 +86,27 @@ def create_tree(payload: SimTreeCreatePayload):
 
 @router.get("/simtree")
 def list_trees():
-    res = []
-    for tid, rec in TREES.items():
-        t: SimTree = rec.tree
-        res.append({"id": int(tid), "root": int(t.root)})
+    # summary() reads spilled trees' metadata instead of loading them back
+    res = [TREES.summary(tid) for tid in TREES]
     res.sort(key=lambda x: int(x["id"]))
     return res
 
 
 @router.get("/simtree/{tree_id}/summaries")
-def tree_summaries(tree_id: int):
-    if tree_id not in TREES:
-        raise HTTPException(status_code=404, detail="simtree not found")
-    t: SimTree = TREES[tree_id].tree
+def tree_summaries(tree_id: int, rec: SimTreeRecord = Depends(_leased_record)):
+    t: SimTree = rec.tree
     return t.summaries()
 
 
 @router.get("/simtree/{tree_id}/graph")
-def tree_graph(tree_id: int):
-    if tree_id not in TREES:
-        raise HTTPException(status_code=404, detail="simtree not found")
-    rec: SimTreeRecord = TREES[tree_id]
-    t: SimTree = rec.tree
-    # Filter out any not-yet-attached nodes (depth is None)
-    attached_ids = {
-        int(nid) for nid, n in t.nodes.items() if n.get("depth") is not None
-    }
-    nodes = [
-        {"id": int(n["id"]), "depth": int(n["depth"])}
-        for n in t.nodes.values()
-        if n.get("depth") is not None
-    ]
-    edges = []
-    for pid, ch in t.children.items():
-        if pid not in attached_ids:
-            continue
-        for cid in ch:
-            if cid not in attached_ids:
-                continue
-            et = t.nodes[cid]["edge_type"]
-            edges.append({"from": int(pid), "to": int(cid), "type": et})
-    # Compute frontier among attached nodes only
-    depth_map = {
-        int(n["id"]): int(n["depth"])
-        for n in t.nodes.values()
-        if n.get("depth") is not None
-    }
-    outdeg = {i: 0 for i in depth_map.keys()}
-    for e in edges:
-        outdeg[e["from"]] = outdeg.get(e["from"], 0) + 1
-    leaves = [i for i, deg in outdeg.items() if deg == 0]
-    maxd = max(depth_map.values()) if depth_map else 0
-    frontier = [i for i in leaves if depth_map.get(i) == maxd]
-    return {
-        "root": int(t.root),
-        "frontier": frontier,
-        "running": list(rec.running),
-        "nodes": nodes,
-        "edges": edges,
-    }
+def tree_graph(tree_id: int, since: int | None = None, epoch: str | None = None, rec: SimTreeRecord = Depends(_leased_record)):
+    graph = rec.tree.graph(since=since, epoch=epoch)
+    graph["running"] = list(rec.running)
+    return graph
 
 
 @router.post("/simtree/{tree_id}/advance")
-def tree_advance(tree_id: int, payload: SimTreeAdvancePayload):
-    if tree_id not in TREES:
-        raise HTTPException(status_code=404, detail="simtree not found")
-    rec: SimTreeRecord = TREES[tree_id]
+def tree_advance(tree_id: int, payload: SimTreeAdvancePayload, rec: SimTreeRecord = Depends(_leased_record)):
     t: SimTree = rec.tree
     parent = int(payload.parent)
     turns = int(payload.turns)
@@ -162,7 +131,7 @@ def tree_advance(tree_id: int, payload: SimTreeAdvancePayload):
     for q in rec.subs:
         q.put_nowait({"type": "run_start", "data": {"node": int(cid)}})
 
-    sim = t.nodes[cid]["sim"]
+    sim = t.get_sim(cid)
     sim.run(max_turns=turns)
 
     if cid in rec.running:
@@ -173,10 +142,7 @@ def tree_advance(tree_id: int, payload: SimTreeAdvancePayload):
 
 
 @router.post("/simtree/{tree_id}/advance_frontier")
-async def tree_advance_frontier(tree_id: int, payload: SimTreeAdvanceFrontierPayload):
-    if tree_id not in TREES:
-        raise HTTPException(status_code=404, detail="simtree not found")
-    rec: SimTreeRecord = TREES[tree_id]
+async def tree_advance_frontier(tree_id: int, payload: SimTreeAdvanceFrontierPayload, rec: SimTreeRecord = Depends(_leased_record)):
     t: SimTree = rec.tree
     pids = t.frontier(True) if bool(payload.only_max_depth) else t.leaves()
     turns = int(payload.turns)
@@ -204,7 +170,7 @@ async def tree_advance_frontier(tree_id: int, payload: SimTreeAdvanceFrontierPay
 
     def _run_one(pid: int):
         cid = alloc[pid]
-        sim = t.nodes[cid]["sim"]
+        sim = t.get_sim(cid)
         sim.run(max_turns=turns)
         return pid, cid
 
@@ -221,11 +187,8 @@ async def tree_advance_frontier(tree_id: int, payload: SimTreeAdvanceFrontierPay
 
 
 @router.post("/simtree/{tree_id}/advance_chain")
-async def tree_advance_chain(tree_id: int, payload: SimTreeAdvanceChainPayload):
+async def tree_advance_chain(tree_id: int, payload: SimTreeAdvanceChainPayload, rec: SimTreeRecord = Depends(_leased_record)):
     """Advance one step at a time for N steps, each step creates a new child."""
-    if tree_id not in TREES:
-        raise HTTPException(status_code=404, detail="simtree not found")
-    rec: SimTreeRecord = TREES[tree_id]
     t: SimTree = rec.tree
     parent = int(payload.parent)
     steps = max(1, int(payload.turns))
@@ -253,7 +216,7 @@ async def tree_advance_chain(tree_id: int, payload: SimTreeAdvanceChainPayload):
             q.put_nowait({"type": "run_start", "data": {"node": int(cid)}})
 
         def _run_one():
-            sim = t.nodes[cid]["sim"]
+            sim = t.get_sim(cid)
             sim.run(max_turns=1)
             return cid
 
@@ -268,10 +231,7 @@ async def tree_advance_chain(tree_id: int, payload: SimTreeAdvanceChainPayload):
 
 
 @router.post("/simtree/{tree_id}/branch")
-def tree_branch(tree_id: int, payload: SimTreeBranchPayload):
-    if tree_id not in TREES:
-        raise HTTPException(status_code=404, detail="simtree not found")
-    rec: SimTreeRecord = TREES[tree_id]
+def tree_branch(tree_id: int, payload: SimTreeBranchPayload, rec: SimTreeRecord = Depends(_leased_record)):
     t: SimTree = rec.tree
     cid = t.branch(int(payload.parent), [dict(x) for x in payload.ops])
     node = t.nodes[cid]
@@ -292,10 +252,7 @@ def tree_branch(tree_id: int, payload: SimTreeBranchPayload):
 
 
 @router.delete("/simtree/{tree_id}/node/{node_id}")
-def tree_delete_subtree(tree_id: int, node_id: int):
-    if tree_id not in TREES:
-        raise HTTPException(status_code=404, detail="simtree not found")
-    rec: SimTreeRecord = TREES[tree_id]
+def tree_delete_subtree(tree_id: int, node_id: int, rec: SimTreeRecord = Depends(_leased_record)):
     t: SimTree = rec.tree
     t.delete_subtree(int(node_id))
     for q in rec.subs:
@@ -304,22 +261,15 @@ def tree_delete_subtree(tree_id: int, node_id: int):
 
 
 @router.get("/simtree/{tree_id}/node/{node_id}/logs")
-def node_logs(tree_id: int, node_id: int):
-    if tree_id not in TREES:
-        raise HTTPException(status_code=404, detail="simtree not found")
-    rec: SimTreeRecord = TREES[tree_id]
+def node_logs(tree_id: int, node_id: int, rec: SimTreeRecord = Depends(_leased_record)):
     t: SimTree = rec.tree
     return t.nodes[int(node_id)].get("logs", [])
 
 
 @router.get("/simtree/{tree_id}/node/{node_id}/state")
-def node_state(tree_id: int, node_id: int):
-    if tree_id not in TREES:
-        raise HTTPException(status_code=404, detail="simtree not found")
-    rec: SimTreeRecord = TREES[tree_id]
+def node_state(tree_id: int, node_id: int, rec: SimTreeRecord = Depends(_leased_record)):
     t: SimTree = rec.tree
-    node = t.nodes[int(node_id)]
-    sim = node["sim"]
+    sim = t.get_sim(int(node_id))
     agents = []
     for name, ag in sim.agents.items():
         agents.append(
@@ -335,22 +285,15 @@ def node_state(tree_id: int, node_id: int):
 
 # --- Sim-scoped aliases (sim_id == node_id within a tree) ---
 @router.get("/simtree/{tree_id}/sim/{sim_id}/events")
-def sim_events(tree_id: int, sim_id: int):
-    if tree_id not in TREES:
-        raise HTTPException(status_code=404, detail="simtree not found")
-    rec: SimTreeRecord = TREES[tree_id]
+def sim_events(tree_id: int, sim_id: int, rec: SimTreeRecord = Depends(_leased_record)):
     t: SimTree = rec.tree
     return t.nodes[int(sim_id)].get("logs", [])
 
 
 @router.get("/simtree/{tree_id}/sim/{sim_id}/state")
-def sim_state(tree_id: int, sim_id: int):
-    if tree_id not in TREES:
-        raise HTTPException(status_code=404, detail="simtree not found")
-    rec: SimTreeRecord = TREES[tree_id]
+def sim_state(tree_id: int, sim_id: int, rec: SimTreeRecord = Depends(_leased_record)):
     t: SimTree = rec.tree
-    node = t.nodes[int(sim_id)]
-    sim = node["sim"]
+    sim = t.get_sim(int(sim_id))
     agents = []
     for name, ag in sim.agents.items():
         agents.append(
@@ -365,10 +308,7 @@ def sim_state(tree_id: int, sim_id: int):
 
 
 @router.post("/simtree/{tree_id}/advance_multi")
-async def tree_advance_multi(tree_id: int, payload: SimTreeAdvanceMultiPayload):
-    if tree_id not in TREES:
-        raise HTTPException(status_code=404, detail="simtree not found")
-    rec: SimTreeRecord = TREES[tree_id]
+async def tree_advance_multi(tree_id: int, payload: SimTreeAdvanceMultiPayload, rec: SimTreeRecord = Depends(_leased_record)):
     t: SimTree = rec.tree
     parent = int(payload.parent)
     turns = int(payload.turns)
@@ -400,7 +340,7 @@ async def tree_advance_multi(tree_id: int, payload: SimTreeAdvanceMultiPayload):
     def _run_one(i: int):
         try:
             cid = cids[i]
-            sim = t.nodes[cid]["sim"]
+            sim = t.get_sim(cid)
             sim.run(max_turns=turns)
         except Exception as e:
             print(f"Run one exception: {e}")
@@ -1,4 +1,10 @@
-from typing import Dict, List
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from typing import Dict, Iterator, List, Tuple
 
 from socialsim4.core.simtree import SimTree
 
@@ -8,9 +14,115 @@ class SimTreeRecord:
         self.tree = tree
         self.subs: List[object] = []  # asyncio.Queue list (typed loosely)
         self.running: set[int] = set()
+        # Requests currently using the record (see SpillingTrees.pin)
+        self.leases = 0
 
 
-TREES: Dict[int, SimTreeRecord] = {}
+class SpillingTrees(MutableMapping):
+    """Tree records with at most ``max_live`` kept in memory.
+
+    Least recently used idle records (nothing running, no subscribers, not
+    pinned) are serialized to ``spill_dir`` and reloaded on the next lookup.
+    Iteration and ``summary`` never reload a spilled record. Sync routes run
+    in worker threads, so lookups and spills hold one lock.
+    """
+
+    def __init__(self, max_live: int = 16, spill_dir: str | None = None):
+        self.max_live = max_live
+        self.spill_dir = spill_dir or tempfile.mkdtemp(prefix="socialsim4-devui-trees-")
+        self._live: OrderedDict[int, SimTreeRecord] = OrderedDict()
+        # Clients are not serializable; keep them for reloading spilled trees,
+        # along with the summary fields listings need
+        self._spilled: Dict[int, Tuple[Dict[str, object], Dict[str, int]]] = {}
+        self._lock = threading.RLock()
+
+    def _path(self, tree_id: int) -> str:
+        return os.path.join(self.spill_dir, f"{int(tree_id)}.json")
+
+    def __getitem__(self, tree_id: int) -> SimTreeRecord:
+        with self._lock:
+            return self._get(tree_id)
+
+    def _get(self, tree_id: int) -> SimTreeRecord:
+        rec = self._live.get(tree_id)
+        if rec is not None:
+            self._live.move_to_end(tree_id)
+            return rec
+        spilled = self._spilled.pop(tree_id, None)
+        if spilled is None:
+            raise KeyError(tree_id)
+        clients = spilled[0]
+        path = self._path(tree_id)
+        with open(path, "r", encoding="utf-8") as fh:
+            rec = SimTreeRecord(SimTree.deserialize(json.load(fh), clients))
+        os.remove(path)
+        self[tree_id] = rec
+        return rec
+
+    def __setitem__(self, tree_id: int, rec: SimTreeRecord) -> None:
+        with self._lock:
+            self._live[tree_id] = rec
+            self._live.move_to_end(tree_id)
+            self._spill_idle()
+
+    def __delitem__(self, tree_id: int) -> None:
+        with self._lock:
+            rec = self._live.pop(tree_id, None)
+            if rec is not None:
+                rec.tree.close()
+            elif self._spilled.pop(tree_id, None) is not None:
+                os.remove(self._path(tree_id))
+            else:
+                raise KeyError(tree_id)
+
+    def pin(self, tree_id: int) -> SimTreeRecord:
+        """Look up a record and keep it in memory until ``unpin``."""
+        with self._lock:
+            rec = self._get(tree_id)
+            rec.leases += 1
+            return rec
+
+    def unpin(self, rec: SimTreeRecord) -> None:
+        with self._lock:
+            rec.leases -= 1
+
+    def __contains__(self, tree_id: object) -> bool:
+        return tree_id in self._live or tree_id in self._spilled
+
+    def __iter__(self) -> Iterator[int]:
+        # Snapshot both key sets up front so records spilled mid-loop are not yielded twice
+        with self._lock:
+            return iter(list(self._live) + list(self._spilled))
+
+    def __len__(self) -> int:
+        return len(self._live) + len(self._spilled)
+
+    def summary(self, tree_id: int) -> Dict[str, int]:
+        """Listing fields of a record, without reloading it if spilled."""
+        with self._lock:
+            rec = self._live.get(tree_id)
+            if rec is not None:
+                return {"id": int(tree_id), "root": int(rec.tree.root)}
+            spilled = self._spilled.get(tree_id)
+            if spilled is None:
+                raise KeyError(tree_id)
+            return dict(spilled[1])
+
+    def _spill_idle(self) -> None:
+        for tree_id in list(self._live)[:-1]:
+            if len(self._live) <= self.max_live:
+                break
+            rec = self._live[tree_id]
+            if rec.leases or rec.running or rec.subs or rec.tree.has_subscribers():
+                continue
+            with open(self._path(tree_id), "w", encoding="utf-8") as fh:
+                json.dump(rec.tree.serialize(), fh)
+            self._spilled[tree_id] = (rec.tree.clients, {"id": int(tree_id), "root": int(rec.tree.root)})
+            del self._live[tree_id]
+            rec.tree.close()
+
+
+TREES = SpillingTrees(max_live=int(os.getenv("SOCIALSIM4_DEVUI_MAX_TREES", "16")))
 
 _TREE_ID = 0
 
@@ -22,15 +22,20 @@ export type AdminSimulation = {
   created_at: string;
 };
 
+// Listings are keyset-paginated: pass the previous page's nextCursor to continue
+export type AdminPage<T> = { items: T[]; nextCursor: string | null };
+
 export async function adminListUsers(params: {
   q?: string;
   org?: string;
   created_from?: string;
   created_to?: string;
   sort?: string; // e.g., name_asc, org_desc, created_desc
-}): Promise<AdminUser[]> {
-  const { data } = await apiClient.get<AdminUser[]>("admin/users", { params });
-  return data;
+  limit?: number;
+  cursor?: string;
+}): Promise<AdminPage<AdminUser>> {
+  const res = await apiClient.get<AdminUser[]>("admin/users", { params });
+  return { items: res.data, nextCursor: res.headers["x-next-cursor"] ?? null };
 }
 
 export async function adminListSimulations(params: {
@@ -39,9 +44,11 @@ export async function adminListSimulations(params: {
   created_from?: string;
   created_to?: string;
   sort?: string; // username_asc, scene_desc, created_desc
-}): Promise<AdminSimulation[]> {
-  const { data } = await apiClient.get<AdminSimulation[]>("admin/simulations", { params });
-  return data;
+  limit?: number;
+  cursor?: string;
+}): Promise<AdminPage<AdminSimulation>> {
+  const res = await apiClient.get<AdminSimulation[]>("admin/simulations", { params });
+  return { items: res.data, nextCursor: res.headers["x-next-cursor"] ?? null };
 }
 
 export type AdminStats = {
@@ -56,7 +63,32 @@ export async function adminGetStats(period: "day" | "week" | "month"): Promise<A
   return data;
 }
 
+type MemoryBytes = { agents: number; logs: number; scene: number; stored: number; cold: number; total: number };
+
+export type AdminMemory = {
+  total_bytes: number;
+  trees: {
+    simulation_id: string;
+    owner_id: number | null;
+    nodes: number;
+    running: number;
+    bytes: MemoryBytes;
+    top_nodes: { node: number; bytes: number; tier: string }[];
+  }[];
+  users: { user_id: number; trees: number; bytes: number }[];
+};
+
+export async function adminGetMemory(limit = 20): Promise<AdminMemory> {
+  const { data } = await apiClient.get<AdminMemory>("admin/memory", { params: { limit } });
+  return data;
+}
+
 export async function adminUpdateUserRole(userId: number, role: 'user' | 'admin'): Promise<AdminUser> {
   const { data } = await apiClient.patch<AdminUser>(`admin/users/${userId}/role`, { role });
   return data;
 }
+
+export async function adminUpdateUserActive(userId: number, isActive: boolean): Promise<AdminUser> {
+  const { data } = await apiClient.patch<AdminUser>(`admin/users/${userId}/active`, { is_active: isActive });
+  return data;
+}
@@ -9,11 +9,16 @@ export type Graph = {
   running?: number[];
   nodes: GraphNode[];
   edges: GraphEdge[];
+  version?: number;
+  epoch?: string;
+  full?: boolean;
+  removed?: number[];
 };
 
-export async function getTreeGraph(id: string): Promise<Graph | null> {
+export async function getTreeGraph(id: string, since?: Pick<Graph, "version" | "epoch">): Promise<Graph | null> {
+  const params = since?.version != null ? { since: since.version, epoch: since.epoch } : undefined;
   try {
-    const { data } = await apiClient.get<Graph>(`simulations/${id}/tree/graph`);
+    const { data } = await apiClient.get<Graph>(`simulations/${id}/tree/graph`, { params });
     return data;
   } catch (error: any) {
     if (error?.response?.status === 404) return null;
@@ -21,8 +26,25 @@ export async function getTreeGraph(id: string): Promise<Graph | null> {
   }
 }
 
+// Apply a `?since=` response to the graph it was requested against. Nodes the
+// tree websocket already added locally are replaced rather than duplicated.
+export function applyGraphDiff(current: Graph | null, diff: Graph): Graph {
+  if (!current || diff.full !== false) return diff;
+  const replaced = new Set(diff.removed || []);
+  diff.nodes.forEach((n) => replaced.add(n.id));
+  const nodes = current.nodes.filter((n) => !replaced.has(n.id)).concat(diff.nodes);
+  const edges = current.edges.filter((e) => !replaced.has(e.to)).concat(diff.edges);
+  return { ...diff, nodes, edges, removed: [] };
+}
+
 export type SimEvent = { type: string; data?: Record<string, unknown> | null; node?: number };
 
+function dispatchFrame(data: string, onMessage: (event: SimEvent) => void) {
+  const parsed = JSON.parse(data);
+  if (Array.isArray(parsed)) parsed.forEach(onMessage);
+  else onMessage(parsed);
+}
+
 export function buildWsUrl(path: string, token?: string): string {
   const base = (API_BASE_URL || "http://localhost:8000/api").replace(/\/$/, "");
   const url = new URL(base);
@@ -30,6 +52,7 @@ export function buildWsUrl(path: string, token?: string): string {
   const wsBase = url.toString();
   const full = new URL(`${wsBase}${path}`);
   if (token) full.searchParams.set("token", token);
+  full.searchParams.set("batch", "1");
   return full.toString();
 }
 
@@ -40,7 +63,7 @@ export function connectTreeEvents(
 ): WebSocket {
   const ws = new WebSocket(buildWsUrl(`/simulations/${simulationId}/tree/events`, accessToken || undefined));
   ws.onopen = () => ws.send("ready");
-  ws.onmessage = (ev) => onMessage(JSON.parse(ev.data));
+  ws.onmessage = (ev) => dispatchFrame(ev.data, onMessage);
   return ws;
 }
 
@@ -52,7 +75,7 @@ export function connectNodeEvents(
 ): WebSocket {
   const ws = new WebSocket(buildWsUrl(`/simulations/${simulationId}/tree/${nodeId}/events`, accessToken || undefined));
   ws.onopen = () => ws.send("ready");
-  ws.onmessage = (ev) => onMessage(JSON.parse(ev.data));
+  ws.onmessage = (ev) => dispatchFrame(ev.data, onMessage);
   return ws;
 }
 
@@ -60,8 +83,8 @@ export async function treeAdvanceFrontier(
   id: string,
   turns: number,
   onlyMaxDepth = false,
-): Promise<{ children: number[] }> {
-  const { data } = await apiClient.post<{ children: number[] }>(`simulations/${id}/tree/advance_frontier`, {
+): Promise<{ job_id: string; children: number[] }> {
+  const { data } = await apiClient.post<{ job_id: string; children: number[] }>(`simulations/${id}/tree/advance_frontier`, {
     turns,
     only_max_depth: onlyMaxDepth,
   });
@@ -73,8 +96,8 @@ export async function treeAdvanceMulti(
   parent: number,
   turns: number,
   count: number,
-): Promise<{ children: number[] }> {
-  const { data } = await apiClient.post<{ children: number[] }>(`simulations/${id}/tree/advance_multi`, {
+): Promise<{ job_id: string | null; children: number[] }> {
+  const { data } = await apiClient.post<{ job_id: string | null; children: number[] }>(`simulations/${id}/tree/advance_multi`, {
     parent,
     turns,
     count,
@@ -86,14 +109,19 @@ export async function treeAdvanceChain(
   id: string,
   parent: number,
   turns: number,
-): Promise<{ child: number }> {
-  const { data } = await apiClient.post<{ child: number }>(`simulations/${id}/tree/advance_chain`, {
+): Promise<{ job_id: string }> {
+  const { data } = await apiClient.post<{ job_id: string }>(`simulations/${id}/tree/advance_chain`, {
     parent,
     turns,
   });
   return data;
 }
 
+export async function cancelTreeJob(id: string, jobId: string): Promise<{ id: string; status: string }> {
+  const { data } = await apiClient.post<{ id: string; status: string }>(`simulations/${id}/jobs/${jobId}/cancel`);
+  return data;
+}
+
 export async function treeBranchPublic(id: string, parent: number, text: string): Promise<{ child: number }> {
   const { data } = await apiClient.post<{ child: number }>(`simulations/${id}/tree/branch`, {
     parent,
@@ -107,11 +135,54 @@ export async function treeDeleteSubtree(id: string, nodeId: number): Promise<{ o
   return data;
 }
 
+// Last response per URL+params, revalidated with If-None-Match (the server answers 304 when unchanged).
+// A Map keeps insertion order; entries are re-inserted on use and the oldest dropped past the limit.
+const ETAG_CACHE_MAX = 16;
+const etagCache = new Map<string, { etag: string; data: unknown; headers: Record<string, string> }>();
+
+async function getWithEtag<T>(url: string, params?: Record<string, unknown>): Promise<{ data: T; headers: Record<string, string> }> {
+  const key = `${url}?${JSON.stringify(params ?? {})}`;
+  const cached = etagCache.get(key);
+  const res = await apiClient.get<T>(url, {
+    params,
+    headers: cached ? { "If-None-Match": cached.etag } : undefined,
+    validateStatus: (status) => (status >= 200 && status < 300) || status === 304,
+  });
+  if (res.status === 304 && cached) {
+    etagCache.delete(key);
+    etagCache.set(key, cached);
+    return { data: cached.data as T, headers: cached.headers };
+  }
+  const headers = res.headers as Record<string, string>;
+  etagCache.delete(key);
+  if (headers.etag) {
+    etagCache.set(key, { etag: headers.etag, data: res.data, headers });
+    while (etagCache.size > ETAG_CACHE_MAX) {
+      const oldest = etagCache.keys().next().value;
+      if (oldest === undefined) break;
+      etagCache.delete(oldest);
+    }
+  }
+  return { data: res.data, headers };
+}
+
+export type SimEventsPage = { events: any[]; nextSince: number };
+
 export async function getSimEvents(id: string, node: number): Promise<any[]> {
-  const { data } = await apiClient.get<any[]>(`simulations/${id}/tree/sim/${node}/events`);
+  const { data } = await getWithEtag<any[]>(`simulations/${id}/tree/sim/${node}/events`);
   return data;
 }
 
+export async function getSimEventsPage(
+  id: string,
+  node: number,
+  opts: { since?: number; limit?: number; types?: string[] } = {},
+): Promise<SimEventsPage> {
+  const params = { since: opts.since ?? 0, limit: opts.limit, types: opts.types?.join(",") };
+  const { data, headers } = await getWithEtag<any[]>(`simulations/${id}/tree/sim/${node}/events`, params);
+  return { events: data, nextSince: Number(headers["x-next-since"] ?? params.since) };
+}
+
 export type AgentMemory = { role: string; content: string };
 
 export type PlanGoal = { id: string; desc: string; priority: string; status: string };
@@ -129,6 +200,7 @@ export type AgentInfo = {
   emotion?: string;
   plan_state: PlanState;
   short_memory: AgentMemory[];
+  memory_size?: number;
 };
 
 export type SimState = {
@@ -136,7 +208,12 @@ export type SimState = {
   agents: AgentInfo[];
 };
 
-export async function getSimState(id: string, node: number): Promise<SimState> {
-  const { data } = await apiClient.get<SimState>(`simulations/${id}/tree/sim/${node}/state`);
+export async function getSimState(
+  id: string,
+  node: number,
+  opts: { agents?: string[]; tail?: number } = {},
+): Promise<SimState> {
+  const params = { agents: opts.agents?.join(","), tail: opts.tail };
+  const { data } = await getWithEtag<SimState>(`simulations/${id}/tree/sim/${node}/state`, params);
   return data;
 }
@@ -14,10 +14,18 @@ export type Snapshot = {
   id: number;
   label: string;
   turns: number;
-  state: Record<string, unknown>;
   created_at: string;
 };
 
+// One page of a snapshot's tree nodes; request the next page from next_offset
+export type SnapshotDetail = Snapshot & {
+  root: number | null;
+  seq: number;
+  nodes: Record<string, unknown>[];
+  total_nodes: number;
+  next_offset: number | null;
+};
+
 export async function listSimulations(): Promise<Simulation[]> {
   const { data } = await apiClient.get<Simulation[]>("simulations");
   return data;
@@ -61,6 +69,11 @@ export async function saveSnapshot(id: string, label?: string): Promise<Snapshot
   return data;
 }
 
+export async function getSnapshot(id: string, snapshotId: number, offset = 0, limit?: number): Promise<SnapshotDetail> {
+  const { data } = await apiClient.get<SnapshotDetail>(`simulations/${id}/snapshots/${snapshotId}`, { params: { offset, limit } });
+  return data;
+}
+
 export async function listSnapshots(id: string): Promise<Snapshot[]> {
   const { data } = await apiClient.get<Snapshot[]>(`simulations/${id}/snapshots`);
   return data;
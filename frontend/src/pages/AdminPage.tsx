@@ -1,5 +1,5 @@
 import { useEffect, useMemo, useState } from 'react';
-import { useQuery } from '@tanstack/react-query';
+import { useInfiniteQuery, useQuery } from '@tanstack/react-query';
 import { useTranslation } from 'react-i18next';
 import { useAuthStore } from '../store/auth';
 import { adminGetStats, adminListSimulations, adminListUsers, adminUpdateUserRole } from '../api/admin';
@@ -56,10 +56,13 @@ function UsersCard() {
   const [to, setTo] = useState('');
   const [sort, setSort] = useState('created_desc');
 
-  const query = useQuery({
+  const query = useInfiniteQuery({
     queryKey: ['admin-users', q, org, from, to, sort],
-    queryFn: () => adminListUsers({ q, org, created_from: from, created_to: to, sort }),
+    queryFn: ({ pageParam }) => adminListUsers({ q, org, created_from: from, created_to: to, sort, cursor: pageParam }),
+    initialPageParam: undefined as string | undefined,
+    getNextPageParam: (last) => last.nextCursor ?? undefined,
   });
+  const users = useMemo(() => (query.data?.pages || []).flatMap((p) => p.items), [query.data]);
 
   return (
     <div className="card" style={{ display: 'grid', gap: '0.5rem' }}>
@@ -98,7 +101,7 @@ function UsersCard() {
           <div>{t('admin.users.columns.role') || 'Role'}</div>
         </div>
         <div>
-          {(query.data || []).map((u, idx, arr) => (
+          {users.map((u, idx, arr) => (
             <div key={u.id} style={{ display: 'grid', gridTemplateColumns: '1.2fr 1fr 1fr 1fr 0.8fr 0.8fr', gap: '0.35rem', padding: '0.5rem 0.6rem', borderBottom: idx === arr.length - 1 ? 'none' : '1px solid var(--border)' }}>
               <div style={{ overflow: 'hidden', textOverflow: 'ellipsis' }}>{u.full_name || u.username}</div>
               <div style={{ overflow: 'hidden', textOverflow: 'ellipsis' }}>{u.email}</div>
@@ -120,6 +123,13 @@ function UsersCard() {
           ))}
           {query.isLoading && <div style={{ padding: '0.5rem 0.6rem', color: 'var(--muted)' }}>{t('common.loading')}</div>}
           {query.error && <div style={{ padding: '0.5rem 0.6rem', color: '#f87171' }}>{t('admin.common.fetchError')}</div>}
+          {query.hasNextPage && (
+            <div style={{ padding: '0.5rem 0.6rem' }}>
+              <button type="button" className="button small" disabled={query.isFetchingNextPage} onClick={() => query.fetchNextPage()}>
+                {query.isFetchingNextPage ? t('common.loading') : t('admin.common.loadMore')}
+              </button>
+            </div>
+          )}
         </div>
       </div>
     </div>
@@ -133,10 +143,13 @@ function SimulationsCard() {
   const [from, setFrom] = useState('');
   const [to, setTo] = useState('');
   const [sort, setSort] = useState('created_desc');
-  const query = useQuery({
+  const query = useInfiniteQuery({
     queryKey: ['admin-sims', userQ, scene, from, to, sort],
-    queryFn: () => adminListSimulations({ user: userQ, scene_type: scene, created_from: from, created_to: to, sort }),
+    queryFn: ({ pageParam }) => adminListSimulations({ user: userQ, scene_type: scene, created_from: from, created_to: to, sort, cursor: pageParam }),
+    initialPageParam: undefined as string | undefined,
+    getNextPageParam: (last) => last.nextCursor ?? undefined,
   });
+  const sims = useMemo(() => (query.data?.pages || []).flatMap((p) => p.items), [query.data]);
 
   return (
     <div className="card" style={{ display: 'grid', gap: '0.5rem' }}>
@@ -173,7 +186,7 @@ function SimulationsCard() {
           </div>
         </div>
         <div>
-          {(query.data || []).map((s, idx, arr) => (
+          {sims.map((s, idx, arr) => (
             <div key={s.id} style={{ display: 'grid', gridTemplateColumns: '1fr 1fr 1fr 1fr', gap: '0.35rem', padding: '0.5rem 0.6rem', borderBottom: idx === arr.length - 1 ? 'none' : '1px solid var(--border)' }}>
               <div>{s.owner_username || s.owner_id}</div>
               <div style={{ overflow: 'hidden', textOverflow: 'ellipsis' }}>{s.name}</div>
@@ -183,6 +196,13 @@ function SimulationsCard() {
           ))}
           {query.isLoading && <div style={{ padding: '0.5rem 0.6rem', color: 'var(--muted)' }}>{t('common.loading')}</div>}
           {query.error && <div style={{ padding: '0.5rem 0.6rem', color: '#f87171' }}>{t('admin.common.fetchError')}</div>}
+          {query.hasNextPage && (
+            <div style={{ padding: '0.5rem 0.6rem' }}>
+              <button type="button" className="button small" disabled={query.isFetchingNextPage} onClick={() => query.fetchNextPage()}>
+                {query.isFetchingNextPage ? t('common.loading') : t('admin.common.loadMore')}
+              </button>
+            </div>
+          )}
         </div>
       </div>
     </div>
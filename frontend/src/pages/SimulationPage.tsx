@@ -10,12 +10,14 @@ import { apiClient } from "../api/client";
 import {
   AgentInfo,
   Graph,
+  applyGraphDiff,
   SimEvent,
   connectNodeEvents,
   connectTreeEvents,
   getSimEvents,
   getSimState,
   getTreeGraph,
+  cancelTreeJob,
   treeAdvanceChain,
   treeAdvanceFrontier,
   treeAdvanceMulti,
@@ -43,6 +45,8 @@ type ToastMessage = {
 
 // WS helpers are provided by ../api/simulationTree
 
+const GRAPH_RESYNC_MS = 5000;
+
 export function SimulationPage() {
   const params = useParams();
   const simulationSlug = (params.id ?? "").toUpperCase();
@@ -56,6 +60,8 @@ export function SimulationPage() {
   const selectedRef = useRef<number | null>(null);
 
   const [graph, setGraph] = useState<Graph | null>(null);
+  // Last graph state, for incremental (`since`) refreshes
+  const graphRef = useRef<Graph | null>(null);
   const [selectedNode, setSelectedNode] = useState<number | null>(null);
   const [events, setEvents] = useState<SimEvent[]>([]);
   const [agents, setAgents] = useState<AgentInfo[]>([]);
@@ -118,6 +124,8 @@ export function SimulationPage() {
   const [chainTurns, setChainTurns] = useState("5");
   const [frontierTurns, setFrontierTurns] = useState("1");
   const [broadcastText, setBroadcastText] = useState("(announcement)");
+  // Advance jobs started from this page; cleared once nothing is running
+  const [activeJobs, setActiveJobs] = useState<string[]>([]);
 
   const [toasts, setToasts] = useState<ToastMessage[]>([]);
   const toastSeq = useRef(0);
@@ -392,6 +400,29 @@ export function SimulationPage() {
     selectedRef.current = selectedNode;
   }, [selectedNode]);
 
+  useEffect(() => {
+    graphRef.current = graph;
+  }, [graph]);
+
+  // Periodic resync in case websocket events were dropped; only changes since
+  // the last known version are downloaded
+  useEffect(() => {
+    if (!simulationSlug) return undefined;
+    const timer = window.setInterval(async () => {
+      const current = graphRef.current;
+      if (!current || treeIdRef.current !== simulationSlug) return;
+      const diff = await getTreeGraph(simulationSlug, current).catch(() => null);
+      if (!diff || !Array.isArray(diff.nodes) || treeIdRef.current !== simulationSlug) return;
+      setGraph((prev) => applyGraphDiff(prev, diff));
+    }, GRAPH_RESYNC_MS);
+    return () => window.clearInterval(timer);
+  }, [simulationSlug]);
+
+  const runningCount = (graph?.running || []).length;
+  useEffect(() => {
+    if (runningCount === 0) setActiveJobs([]);
+  }, [runningCount]);
+
   useEffect(() => {
     if (eventsAutoScroll && eventsRef.current) {
       const el = eventsRef.current;
@@ -631,7 +662,8 @@ export function SimulationPage() {
                     onClick={async () => {
                       const tree = treeIdRef.current;
                       if (tree == null) return;
-                      await treeAdvanceFrontier(tree, frontierTurnsNum);
+                      const res = await treeAdvanceFrontier(tree, frontierTurnsNum);
+                      setActiveJobs((jobs) => [...jobs, res.job_id]);
                       await refreshSelected();
                     }}
                     disabled={treeIdRef.current == null}
@@ -652,7 +684,9 @@ export function SimulationPage() {
                     onClick={async () => {
                       const tree = treeIdRef.current;
                       if (tree == null || selectedNode == null) return;
-                      await treeAdvanceMulti(tree, selectedNode, multiTurnsNum, multiCountNum);
+                      const res = await treeAdvanceMulti(tree, selectedNode, multiTurnsNum, multiCountNum);
+                      const jobId = res.job_id;
+                      if (jobId) setActiveJobs((jobs) => [...jobs, jobId]);
                       await refreshSelected(tree, selectedNode);
                     }}
                     disabled={treeIdRef.current == null || selectedNode == null}
@@ -672,7 +706,8 @@ export function SimulationPage() {
                     onClick={async () => {
                       const tree = treeIdRef.current;
                       if (tree == null || selectedNode == null) return;
-                      await treeAdvanceChain(tree, selectedNode, chainTurnsNum);
+                      const res = await treeAdvanceChain(tree, selectedNode, chainTurnsNum);
+                      setActiveJobs((jobs) => [...jobs, res.job_id]);
                       await refreshSelected(tree, selectedNode);
                     }}
                     disabled={treeIdRef.current == null || selectedNode == null}
@@ -682,6 +717,22 @@ export function SimulationPage() {
                 </div>
               </div>
 
+              {activeJobs.length > 0 && (graph?.running || []).length > 0 && (
+                <button
+                  type="button"
+                  className="button small"
+                  onClick={async () => {
+                    const tree = treeIdRef.current;
+                    if (tree == null) return;
+                    const jobs = activeJobs;
+                    setActiveJobs([]);
+                    await Promise.all(jobs.map((jobId) => cancelTreeJob(tree, jobId).catch(() => null)));
+                  }}
+                >
+                  {t('sim.cancelRuns')}
+                </button>
+              )}
+
               <div>
                 <div className="panel-subtitle">{t('sim.broadcast')}</div>
                 <textarea className="input" value={broadcastText} onChange={(event) => setBroadcastText(event.target.value)} rows={2} />
@@ -0,0 +1,96 @@
+"""Compare the binary snapshot codec with the JSON path it replaced.
+
+Builds each scene the way the backend does, runs a few turns with the mock
+LLM so agents have memory, then times clone (deep copy) and encode/decode of
+the simulator snapshot, and reports encoded sizes with and without zlib.
+
+    python scripts/bench_codec.py --turns 10 --repeat 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+import zlib
+from copy import deepcopy
+from pathlib import Path
+from types import SimpleNamespace
+
+from socialsim4.backend.services.simtree_runtime import _build_tree_for_sim
+from socialsim4.core import codec
+from socialsim4.scenarios.basic import LLMSettings, make_clients
+
+NAMES = ["Alice", "Bob", "Carol", "Dave", "Erin", "Frank"]
+SCENES = {
+    "simple_chat_scene": {"initial_events": ["Welcome to the chat room."]},
+    "village_scene": {"map": json.loads((Path(__file__).parent / "default_map.json").read_text())},
+    "landlord_scene": {"seed": 7},
+    "werewolf_scene": {
+        "role_map": dict(zip(NAMES, ["werewolf", "werewolf", "seer", "witch", "villager", "villager"])),
+    },
+}
+
+
+def _timeit(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def _json_encode(snap: dict) -> bytes:
+    return json.dumps(snap, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def bench_scene(name: str, turns: int, repeat: int) -> None:
+    count = 4 if name == "landlord_scene" else len(NAMES)
+    record = SimpleNamespace(
+        id="BENCH",
+        name=name,
+        scene_type=name,
+        scene_config=SCENES[name],
+        agent_config={"agents": [{"name": n, "profile": f"{n} is a participant."} for n in NAMES[:count]]},
+    )
+    tree = _build_tree_for_sim(record, make_clients(LLMSettings(dialect="mock")))
+    sim = tree.get_sim(tree.root)
+    sim.run(max_turns=turns)
+    snap = sim.serialize()
+
+    as_json = _json_encode(snap)
+    as_bin = codec.encode(snap)
+    as_interned = codec.encode(snap, intern=True)
+    assert codec.decode(as_bin) == codec.decode(as_interned) == json.loads(as_json)
+
+    rows = [
+        ("clone deepcopy", _timeit(lambda: deepcopy(snap), repeat)),
+        ("clone json", _timeit(lambda: json.loads(json.dumps(snap)), repeat)),
+        ("clone codec", _timeit(lambda: codec.clone(snap), repeat)),
+        ("encode json", _timeit(lambda: _json_encode(snap), repeat)),
+        ("encode codec", _timeit(lambda: codec.encode(snap), repeat)),
+        ("encode interned", _timeit(lambda: codec.encode(snap, intern=True), repeat)),
+        ("decode json", _timeit(lambda: json.loads(as_json), repeat)),
+        ("decode codec", _timeit(lambda: codec.decode(as_bin), repeat)),
+        ("decode interned", _timeit(lambda: codec.decode(as_interned), repeat)),
+    ]
+    print(
+        f"{name}: json {len(as_json)} B ({len(zlib.compress(as_json, 6))} B zlib), "
+        f"codec {len(as_bin)} B ({len(zlib.compress(as_bin, 6))} B zlib), "
+        f"interned {len(as_interned)} B ({len(zlib.compress(as_interned, 6))} B zlib)"
+    )
+    for label, micros in rows:
+        print(f"  {label:<16} {micros:10.1f} us")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scene", action="append", choices=sorted(SCENES), help="Scene to benchmark (repeatable)")
+    parser.add_argument("--turns", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    for name in args.scene or ["simple_chat_scene", "village_scene", "landlord_scene", "werewolf_scene"]:
+        bench_scene(name, args.turns, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,458 @@
+"""End-to-end load test for the backend using the offline ``mock`` LLM provider.
+
+Provisions users (each with an active mock provider), creates one simulation
+per scene type for each user, opens tree websocket subscribers, then runs a
+weighted mix of operations from ``--concurrency`` workers for ``--duration``
+seconds:
+
+- advance_frontier / advance_multi / advance_chain: submit the job and poll it
+  until it finishes; both the submit call and the whole job are timed
+- graph: GET /tree/graph
+- state: GET /tree/sim/{node}/state for a random node
+- events: GET /tree/sim/{node}/events?since=... for a random node
+
+At the end it prints throughput, latency percentiles per operation,
+websocket traffic, and the server's RSS and CPU use (read from /metrics).
+
+By default the script starts its own server (uvicorn) on a fresh SQLite file,
+so it runs fully offline:
+
+    python scripts/load_test.py --users 4 --concurrency 32 --duration 60
+    python scripts/load_test.py --database-url postgresql+psycopg://user:pw@localhost/socialsim4_load
+    python scripts/load_test.py --executor process --mix advance_frontier=2,graph=5,state=3
+
+Pass ``--base-url`` to target a server that is already running. That server
+must have metrics enabled to get resource figures, and registration must not
+require email verification.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+import httpx
+import websockets
+
+MAP_FILE = Path(__file__).parent / "default_map.json"
+NAMES = ["Alice", "Bob", "Carol", "Dave", "Erin", "Frank"]
+DEFAULT_MIX = "advance_frontier=1,advance_multi=1,advance_chain=1,graph=6,state=4,events=3"
+
+
+def scene_payloads() -> dict[str, dict]:
+    def agents(n: int) -> dict:
+        return {"agents": [{"name": name, "profile": f"{name} is taking part."} for name in NAMES[:n]]}
+
+    return {
+        "simple_chat_scene": {"scene_config": {"initial_events": ["Welcome."]}, "agent_config": agents(3)},
+        "emotional_conflict_scene": {"scene_config": {"initial_events": ["Talk it through."]}, "agent_config": agents(2)},
+        "council_scene": {"scene_config": {"draft_text": "Fund the library."}, "agent_config": agents(4)},
+        "village_scene": {"scene_config": {"map": json.loads(MAP_FILE.read_text())}, "agent_config": agents(3)},
+        "landlord_scene": {"scene_config": {"seed": 7}, "agent_config": agents(4)},
+        "werewolf_scene": {
+            "scene_config": {
+                "role_map": dict(zip(NAMES, ["werewolf", "werewolf", "seer", "witch", "villager", "villager"]))
+            },
+            "agent_config": agents(6),
+        },
+    }
+
+
+def parse_mix(text: str) -> dict[str, float]:
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip():
+            mix[name.strip()] = float(weight or 1)
+    unknown = set(mix) - set(OPERATIONS)
+    if unknown:
+        raise SystemExit(f"Unknown operations in --mix: {', '.join(sorted(unknown))}")
+    return mix
+
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(q * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+class Stats:
+    def __init__(self) -> None:
+        self.latencies: dict[str, list[float]] = {}
+        self.errors: dict[str, int] = {}
+        self.ws_frames = 0
+        self.ws_bytes = 0
+        self.ws_disconnects = 0
+
+    def record(self, op: str, seconds: float, ok: bool = True) -> None:
+        self.latencies.setdefault(op, []).append(seconds)
+        if not ok:
+            self.errors[op] = self.errors.get(op, 0) + 1
+
+
+class Sim:
+    def __init__(self, sim_id: str, scene_type: str, client: httpx.AsyncClient, token: str):
+        self.id = sim_id
+        self.scene_type = scene_type
+        self.client = client
+        self.token = token
+        self.nodes = [0]
+        self.since: dict[int, int] = {}
+
+
+# --- server ------------------------------------------------------------------
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(args, workdir: str) -> tuple[subprocess.Popen, str]:
+    dist = Path(workdir) / "dist"
+    (dist / "assets").mkdir(parents=True)
+    (dist / "index.html").write_text("<!doctype html><title>load test</title>")
+    port = _free_port()
+    env = dict(os.environ)
+    env.update(
+        {
+            "SOCIALSIM4_DATABASE_URL": args.database_url or f"sqlite+aiosqlite:///{workdir}/load.db",
+            "SOCIALSIM4_FRONTEND_DIST_PATH": str(dist),
+            "SOCIALSIM4_BACKEND_ROOT_PATH": "/",
+            "SOCIALSIM4_REQUIRE_EMAIL_VERIFICATION": "false",
+            "SOCIALSIM4_METRICS_ENABLED": "true",
+            "SOCIALSIM4_SIM_EXECUTOR": args.executor,
+            "SOCIALSIM4_LOG_LEVEL": "WARNING",
+        }
+    )
+    cmd = [sys.executable, "-m", "uvicorn", "socialsim4.backend.main:app", "--port", str(port), "--log-level", "warning"]
+    proc = subprocess.Popen(cmd, env=env)
+    return proc, f"http://127.0.0.1:{port}"
+
+
+async def wait_ready(base_url: str, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get("/api/scenes/")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.25)
+    raise SystemExit(f"Server at {base_url} did not become ready")
+
+
+async def read_metrics(client: httpx.AsyncClient) -> dict[str, float]:
+    try:
+        # Same variable the server reads, so a protected endpoint can still be sampled
+        token = os.environ.get("SOCIALSIM4_METRICS_TOKEN")
+        resp = await client.get("/metrics", headers={"Authorization": f"Bearer {token}"} if token else None)
+    except httpx.TransportError:
+        return {}
+    if resp.status_code != 200:
+        return {}
+    out = {}
+    for line in resp.text.splitlines():
+        if line.startswith(("process_", "socialsim4_simtree_nodes_total", "socialsim4_jobs_active")):
+            name, _, value = line.rpartition(" ")
+            out[name] = float(value)
+    return out
+
+
+# --- provisioning --------------------------------------------------------------
+
+
+async def provision(base_url: str, args, stats: Stats) -> list[Sim]:
+    payloads = scene_payloads()
+    scene_types = args.scenes or list(payloads)
+    sims: list[Sim] = []
+    run = uuid.uuid4().hex[:6]
+    for index in range(args.users):
+        client = httpx.AsyncClient(base_url=base_url, timeout=args.timeout)
+        email = f"load-{run}-{index}@example.com"
+        password = "load-test-pw"
+        resp = await client.post(
+            "/api/auth/register",
+            json={
+                "email": email,
+                "username": f"load_{run}_{index}",
+                "full_name": f"Load {index}",
+                "phone_number": "+8613800138000",
+                "password": password,
+            },
+        )
+        resp.raise_for_status()
+        resp = await client.post("/api/auth/login", json={"email": email, "password": password})
+        resp.raise_for_status()
+        token = resp.json()["access_token"]
+        client.headers["Authorization"] = f"Bearer {token}"
+        resp = await client.post(
+            "/api/providers/", json={"name": "mock", "provider": "mock", "model": "mock", "base_url": "", "api_key": ""}
+        )
+        resp.raise_for_status()
+        (await client.post(f"/api/providers/{resp.json()['id']}/activate")).raise_for_status()
+        for scene_type in scene_types:
+            start = time.perf_counter()
+            resp = await client.post("/api/simulations/", json={"scene_type": scene_type, **payloads[scene_type]})
+            stats.record("create_simulation", time.perf_counter() - start, resp.status_code < 400)
+            resp.raise_for_status()
+            sims.append(Sim(resp.json()["id"], scene_type, client, token))
+    return sims
+
+
+# --- operations ----------------------------------------------------------------
+
+
+async def _timed(stats: Stats, op: str, request) -> httpx.Response | None:
+    start = time.perf_counter()
+    try:
+        resp = await request
+    except httpx.HTTPError:
+        stats.record(op, time.perf_counter() - start, ok=False)
+        return None
+    stats.record(op, time.perf_counter() - start, ok=resp.status_code < 400)
+    return resp if resp.status_code < 400 else None
+
+
+async def _run_job(sim: Sim, stats: Stats, op: str, path: str, body: dict, args) -> None:
+    start = time.perf_counter()
+    resp = await _timed(stats, op, sim.client.post(f"/api/simulations/{sim.id}/tree/{path}", json=body))
+    if resp is None:
+        return
+    job_id = resp.json()["job_id"]
+    while time.perf_counter() - start < args.job_timeout:
+        await asyncio.sleep(args.poll_interval)
+        try:
+            job = (await sim.client.get(f"/api/simulations/{sim.id}/jobs/{job_id}")).json()
+        except (httpx.HTTPError, ValueError):
+            continue
+        if job.get("status") in ("succeeded", "failed", "cancelled"):
+            sim.nodes.extend(int(n) for n in job.get("nodes") or [])
+            stats.record(f"{op}_job", time.perf_counter() - start, ok=job["status"] == "succeeded")
+            return
+    stats.record(f"{op}_job", time.perf_counter() - start, ok=False)
+
+
+async def op_advance_frontier(sim: Sim, stats: Stats, args) -> None:
+    await _run_job(sim, stats, "advance_frontier", "advance_frontier", {"turns": args.turns, "only_max_depth": True}, args)
+
+
+async def op_advance_multi(sim: Sim, stats: Stats, args) -> None:
+    body = {"parent": random.choice(sim.nodes), "turns": args.turns, "count": 2}
+    await _run_job(sim, stats, "advance_multi", "advance_multi", body, args)
+
+
+async def op_advance_chain(sim: Sim, stats: Stats, args) -> None:
+    body = {"parent": random.choice(sim.nodes), "turns": args.turns}
+    await _run_job(sim, stats, "advance_chain", "advance_chain", body, args)
+
+
+async def op_graph(sim: Sim, stats: Stats, args) -> None:
+    resp = await _timed(stats, "graph", sim.client.get(f"/api/simulations/{sim.id}/tree/graph"))
+    if resp is not None:
+        nodes = resp.json().get("nodes") or []
+        sim.nodes = [int(n["id"]) for n in nodes] or sim.nodes
+
+
+async def op_state(sim: Sim, stats: Stats, args) -> None:
+    node = random.choice(sim.nodes)
+    await _timed(stats, "state", sim.client.get(f"/api/simulations/{sim.id}/tree/sim/{node}/state", params={"tail": 20}))
+
+
+async def op_events(sim: Sim, stats: Stats, args) -> None:
+    node = random.choice(sim.nodes)
+    since = sim.since.get(node, 0)
+    resp = await _timed(
+        stats,
+        "events",
+        sim.client.get(f"/api/simulations/{sim.id}/tree/sim/{node}/events", params={"since": since, "limit": 200}),
+    )
+    if resp is not None:
+        sim.since[node] = int(resp.headers.get("X-Next-Since", since))
+
+
+OPERATIONS = {
+    "advance_frontier": op_advance_frontier,
+    "advance_multi": op_advance_multi,
+    "advance_chain": op_advance_chain,
+    "graph": op_graph,
+    "state": op_state,
+    "events": op_events,
+}
+
+
+async def worker(sims: list[Sim], mix: dict[str, float], stats: Stats, args, stop: float) -> None:
+    names = list(mix)
+    weights = [mix[n] for n in names]
+    while time.monotonic() < stop:
+        op = random.choices(names, weights)[0]
+        try:
+            await OPERATIONS[op](random.choice(sims), stats, args)
+        except (httpx.HTTPError, KeyError, ValueError):
+            stats.record(op, 0.0, ok=False)
+
+
+async def subscriber(base_url: str, sim: Sim, stats: Stats, stop: float) -> None:
+    url = base_url.replace("http", "ws", 1) + f"/api/simulations/{sim.id}/tree/events?token={sim.token}&batch=1"
+    try:
+        async with websockets.connect(url, max_size=None) as ws:
+            while time.monotonic() < stop:
+                try:
+                    frame = await asyncio.wait_for(ws.recv(), timeout=max(0.1, stop - time.monotonic()))
+                except asyncio.TimeoutError:
+                    break
+                stats.ws_frames += 1
+                stats.ws_bytes += len(frame)
+    except (websockets.WebSocketException, OSError):
+        stats.ws_disconnects += 1
+
+
+async def sample_resources(client: httpx.AsyncClient, samples: list[dict], stop: float, interval: float) -> None:
+    while time.monotonic() < stop:
+        metrics = await read_metrics(client)
+        if metrics:
+            samples.append(metrics)
+        await asyncio.sleep(interval)
+
+
+# --- report --------------------------------------------------------------------
+
+
+def report(stats: Stats, elapsed: float, samples: list[dict], args) -> dict:
+    rows = []
+    total = 0
+    for op in sorted(stats.latencies):
+        values = stats.latencies[op]
+        total += len(values) if not op.endswith("_job") and op != "create_simulation" else 0
+        rows.append(
+            {
+                "op": op,
+                "count": len(values),
+                "errors": stats.errors.get(op, 0),
+                "rps": len(values) / elapsed if elapsed else 0.0,
+                "p50_ms": percentile(values, 0.50) * 1000,
+                "p90_ms": percentile(values, 0.90) * 1000,
+                "p99_ms": percentile(values, 0.99) * 1000,
+                "max_ms": max(values) * 1000 if values else 0.0,
+            }
+        )
+    resources = {}
+    if len(samples) >= 2:
+        first, last = samples[0], samples[-1]
+        cpu = last.get("process_cpu_seconds_total", 0) - first.get("process_cpu_seconds_total", 0)
+        resources = {
+            "rss_max_mb": max(s.get("process_resident_memory_bytes", 0) for s in samples) / 2**20,
+            "rss_end_mb": last.get("process_resident_memory_bytes", 0) / 2**20,
+            "cpu_seconds": cpu,
+            "avg_cores": cpu / elapsed if elapsed else 0.0,
+            "tree_nodes_end": last.get("socialsim4_simtree_nodes_total", 0),
+        }
+
+    print(f"\n{args.users} users, concurrency {args.concurrency}, {elapsed:.1f}s, executor {args.executor}")
+    print(f"requests: {total} ({total / elapsed if elapsed else 0:.1f}/s)")
+    print(f"{'operation':<24}{'count':>8}{'errors':>8}{'rps':>9}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for r in rows:
+        print(
+            f"{r['op']:<24}{r['count']:>8}{r['errors']:>8}{r['rps']:>9.1f}"
+            f"{r['p50_ms']:>10.1f}{r['p90_ms']:>10.1f}{r['p99_ms']:>10.1f}{r['max_ms']:>10.1f}"
+        )
+    print(
+        f"websocket: {stats.ws_frames} frames, {stats.ws_bytes / 2**20:.1f} MiB, {stats.ws_disconnects} disconnects"
+    )
+    if resources:
+        print(
+            f"server: rss max {resources['rss_max_mb']:.0f} MiB (end {resources['rss_end_mb']:.0f} MiB), "
+            f"cpu {resources['cpu_seconds']:.1f}s ({resources['avg_cores']:.2f} cores), "
+            f"tree nodes {resources['tree_nodes_end']:.0f}"
+        )
+    else:
+        print("server: no /metrics samples (metrics disabled?)")
+    return {
+        "elapsed": elapsed,
+        "requests": total,
+        "operations": rows,
+        "websocket": {"frames": stats.ws_frames, "bytes": stats.ws_bytes, "disconnects": stats.ws_disconnects},
+        "server": resources,
+    }
+
+
+async def run(args) -> None:
+    proc = None
+    workdir = tempfile.mkdtemp(prefix="socialsim4-load-")
+    base_url = args.base_url
+    if base_url is None:
+        proc, base_url = start_server(args, workdir)
+    try:
+        await wait_ready(base_url)
+        stats = Stats()
+        sims = await provision(base_url, args, stats)
+        print(f"provisioned {len(sims)} simulations for {args.users} users at {base_url}")
+        mix = parse_mix(args.mix)
+
+        start = time.monotonic()
+        stop = start + args.duration
+        samples: list[dict] = []
+        async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout) as metrics_client:
+            tasks = [asyncio.create_task(sample_resources(metrics_client, samples, stop, args.sample_interval))]
+            tasks += [
+                asyncio.create_task(subscriber(base_url, sim, stats, stop)) for sim in sims for _ in range(args.ws_per_sim)
+            ]
+            tasks += [asyncio.create_task(worker(sims, mix, stats, args, stop)) for _ in range(args.concurrency)]
+            await asyncio.gather(*tasks)
+            final = await read_metrics(metrics_client)
+            if final:
+                samples.append(final)
+        result = report(stats, time.monotonic() - start, samples, args)
+        if args.json:
+            Path(args.json).write_text(json.dumps(result, indent=2))
+        for client in {id(s.client): s.client for s in sims}.values():
+            await client.aclose()
+    finally:
+        if proc is not None:
+            proc.terminate()
+            try:
+                proc.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Load-test the SocialSim4 backend with the mock LLM provider")
+    parser.add_argument("--base-url", help="Target a running server instead of starting one")
+    parser.add_argument("--database-url", help="Database for the started server (default: SQLite in a temp dir)")
+    parser.add_argument("--executor", choices=["thread", "process"], default="thread", help="sim_executor of the started server")
+    parser.add_argument("--users", type=int, default=4)
+    parser.add_argument("--scenes", action="append", choices=sorted(scene_payloads()), help="Scene types to create (repeatable)")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent request workers")
+    parser.add_argument("--ws-per-sim", type=int, default=1, help="Tree websocket subscribers per simulation")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to run the mix")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Weighted operations, e.g. graph=5,state=3,advance_chain=1")
+    parser.add_argument("--turns", type=int, default=1, help="Turns per advance")
+    parser.add_argument("--poll-interval", type=float, default=0.1, help="Job status poll interval")
+    parser.add_argument("--job-timeout", type=float, default=120.0)
+    parser.add_argument("--timeout", type=float, default=60.0, help="HTTP request timeout")
+    parser.add_argument("--sample-interval", type=float, default=2.0, help="Seconds between /metrics samples")
+    parser.add_argument("--json", help="Also write the report to this file")
+    return parser
+
+
+def main() -> None:
+    asyncio.run(run(build_parser().parse_args()))
+
+
+if __name__ == "__main__":
+    main()
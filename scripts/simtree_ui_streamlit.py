@@ -125,7 +125,7 @@ def main():
 
         st.markdown("Branch: Agent Ctx Append")
         # Read agent names from this node's sim
-        names = sorted(list(tree.nodes[sel]["sim"].agents.keys()))
+        names = sorted(list(tree.get_sim(sel).agents.keys()))
         ag_name = st.selectbox("agent", names, index=0, key="ag_name")
         role = st.selectbox(
             "role", ["system", "user", "assistant"], index=1, key="ag_role"
@@ -0,0 +1,61 @@
+"""Pre-encoded JSON responses for endpoints that return large payloads.
+
+Handlers that return dicts or pydantic models have their result converted and
+encoded by Litestar after the handler returns, on the event loop. The tree,
+log and snapshot endpoints instead encode with msgspec here and hand Litestar
+the bytes; big payloads are encoded in a worker thread. Values that are
+already JSON (log payloads read as text from the database) are embedded with
+``msgspec.Raw`` so they are never decoded and re-encoded.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import date, datetime
+from typing import Any
+
+import msgspec
+from litestar.enums import MediaType
+from litestar.response import Response
+
+# Payloads with more items than this are encoded off the event loop
+THREAD_THRESHOLD = 2_000
+
+
+def enc_hook(obj: Any) -> Any:
+    """msgspec ``enc_hook`` shared by every encoder that writes to clients."""
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump(mode="json")
+    # Fail loudly rather than send an object's repr to clients
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+_encoder = msgspec.json.Encoder(enc_hook=enc_hook)
+
+
+def encode_json(content: Any) -> bytes:
+    return _encoder.encode(content)
+
+
+def json_response(content: Any, headers: dict[str, str] | None = None, status_code: int = 200) -> Response:
+    return Response(content=encode_json(content), media_type=MediaType.JSON, headers=headers, status_code=status_code)
+
+
+async def json_response_async(
+    content: Any, size: int, headers: dict[str, str] | None = None, status_code: int = 200
+) -> Response:
+    """Like ``json_response``; ``size`` (items, nodes, ...) decides whether to encode in a thread."""
+    if size > THREAD_THRESHOLD:
+        body = await asyncio.to_thread(encode_json, content)
+    else:
+        body = encode_json(content)
+    return Response(content=body, media_type=MediaType.JSON, headers=headers, status_code=status_code)
+
+
+def raw_json(text: str | bytes | None) -> msgspec.Raw:
+    """Embed an already-encoded JSON document as-is."""
+    if text is None:
+        return msgspec.Raw(b"null")
+    return msgspec.Raw(text.encode("utf-8") if isinstance(text, str) else text)
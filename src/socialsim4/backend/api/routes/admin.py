@@ -1,28 +1,79 @@
-from datetime import date, datetime, timedelta
+import asyncio
+import base64
+import json
+import time
+from datetime import datetime, timedelta
 
 from litestar import Router, get, patch
 from litestar.connection import Request
 from litestar.exceptions import HTTPException
+from litestar.response import Response
 from pydantic import BaseModel
-from sqlalchemy import and_, func, select
+from sqlalchemy import and_, func, or_, select
 
 from ...core.database import get_session
-from ...dependencies import extract_bearer_token, resolve_current_user
+from ...dependencies import USER_CACHE, extract_bearer_token, resolve_current_user, settings
 from ...models.simulation import Simulation
 from ...models.user import User
-from ...schemas.simulation import SimulationBase
 from ...schemas.user import UserPublic
+from ...services.simtree_runtime import SIM_TREE_REGISTRY
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+# period -> (expires_at, stats); stats are approximate by nature, so a short TTL is fine
+_STATS_CACHE: dict[str, tuple[float, dict]] = {}
 
 
 class RoleUpdate(BaseModel):
     role: str
 
 
+class ActiveUpdate(BaseModel):
+    is_active: bool
+
+
 def _require_admin(user: UserPublic) -> None:
     if str(getattr(user, "role", "")) != "admin":
         raise HTTPException(status_code=403, detail="Admin only")
 
 
+def _encode_cursor(value, last_id) -> str:
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps([value, last_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def _decode_cursor(cursor: str, is_datetime: bool) -> tuple:
+    try:
+        value, last_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        if is_datetime:
+            value = datetime.fromisoformat(value)
+    except (ValueError, TypeError) as exc:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from exc
+    return value, last_id
+
+
+def _keyset(stmt, key, tiebreak, descending: bool, cursor: str | None, is_datetime: bool, limit: int):
+    """Order by (key, tiebreak) and start after ``cursor``; fetch one extra row to detect more pages."""
+    if cursor:
+        value, last_id = _decode_cursor(cursor, is_datetime)
+        if descending:
+            stmt = stmt.where(or_(key < value, and_(key == value, tiebreak < last_id)))
+        else:
+            stmt = stmt.where(or_(key > value, and_(key == value, tiebreak > last_id)))
+    if descending:
+        stmt = stmt.order_by(key.desc(), tiebreak.desc())
+    else:
+        stmt = stmt.order_by(key.asc(), tiebreak.asc())
+    return stmt.limit(limit + 1)
+
+
+def _page_limit(limit: int) -> int:
+    return max(1, min(int(limit), MAX_PAGE_SIZE))
+
+
 @get("/users")
 async def admin_list_users(
     request: Request,
@@ -31,7 +82,9 @@ async def admin_list_users(
     created_from: str | None = None,
     created_to: str | None = None,
     sort: str = "created_desc",
-) -> list[UserPublic]:
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: str | None = None,
+) -> Response[list[UserPublic]]:
     token = extract_bearer_token(request)
     async with get_session() as session:
         current_user = await resolve_current_user(session, token)
@@ -54,23 +107,22 @@ async def admin_list_users(
         if conditions:
             stmt = stmt.where(and_(*conditions))
 
-        name_expr = func.coalesce(User.full_name, User.username)
-        if sort == "name_asc":
-            stmt = stmt.order_by(name_expr.asc())
-        elif sort == "name_desc":
-            stmt = stmt.order_by(name_expr.desc())
-        elif sort == "org_asc":
-            stmt = stmt.order_by(User.organization.asc().nulls_last())
-        elif sort == "org_desc":
-            stmt = stmt.order_by(User.organization.desc().nulls_last())
-        elif sort == "created_asc":
-            stmt = stmt.order_by(User.created_at.asc())
+        if sort.startswith("name_"):
+            key, is_datetime = func.coalesce(User.full_name, User.username), False
+        elif sort.startswith("org_"):
+            key, is_datetime = func.coalesce(User.organization, ""), False
         else:
-            stmt = stmt.order_by(User.created_at.desc())
+            key, is_datetime = User.created_at, True
+        limit = _page_limit(limit)
+        stmt = _keyset(stmt, key, User.id, not sort.endswith("_asc"), cursor, is_datetime, limit)
 
-        result = await session.execute(stmt)
-        users = result.scalars().all()
-        return [UserPublic.model_validate(u) for u in users]
+        result = await session.execute(stmt.add_columns(key.label("sort_key")))
+        rows = result.all()
+        headers = {}
+        if len(rows) > limit:
+            rows = rows[:limit]
+            headers["X-Next-Cursor"] = _encode_cursor(rows[-1].sort_key, rows[-1][0].id)
+        return Response([UserPublic.model_validate(row[0]) for row in rows], headers=headers)
 
 
 @get("/simulations")
@@ -81,14 +133,24 @@ async def admin_list_simulations(
     created_from: str | None = None,
     created_to: str | None = None,
     sort: str = "created_desc",
-) -> list[dict]:
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: str | None = None,
+) -> Response[list[dict]]:
     token = extract_bearer_token(request)
     async with get_session() as session:
         current_user = await resolve_current_user(session, token)
         _require_admin(current_user)
-        stmt = select(Simulation, User.username).join(
-            User, Simulation.owner_id == User.id
-        )
+        # Metadata columns only; configs and latest_state can be large
+        stmt = select(
+            Simulation.id,
+            Simulation.owner_id,
+            Simulation.name,
+            Simulation.scene_type,
+            Simulation.status,
+            Simulation.created_at,
+            Simulation.updated_at,
+            User.username,
+        ).join(User, Simulation.owner_id == User.id)
         conditions = []
         if user:
             conditions.append(User.username.ilike(f"%{user}%"))
@@ -103,27 +165,89 @@ async def admin_list_simulations(
         if conditions:
             stmt = stmt.where(and_(*conditions))
 
-        if sort == "username_asc":
-            stmt = stmt.order_by(User.username.asc())
-        elif sort == "username_desc":
-            stmt = stmt.order_by(User.username.desc())
-        elif sort == "scene_asc":
-            stmt = stmt.order_by(Simulation.scene_type.asc())
-        elif sort == "scene_desc":
-            stmt = stmt.order_by(Simulation.scene_type.desc())
-        elif sort == "created_asc":
-            stmt = stmt.order_by(Simulation.created_at.asc())
+        if sort.startswith("username_"):
+            key, is_datetime = User.username, False
+        elif sort.startswith("scene_"):
+            key, is_datetime = Simulation.scene_type, False
         else:
-            stmt = stmt.order_by(Simulation.created_at.desc())
+            key, is_datetime = Simulation.created_at, True
+        limit = _page_limit(limit)
+        stmt = _keyset(stmt, key, Simulation.id, not sort.endswith("_asc"), cursor, is_datetime, limit)
 
-        result = await session.execute(stmt)
+        result = await session.execute(stmt.add_columns(key.label("sort_key")))
         rows = result.all()
+        headers = {}
+        if len(rows) > limit:
+            rows = rows[:limit]
+            headers["X-Next-Cursor"] = _encode_cursor(rows[-1].sort_key, rows[-1].id)
         out: list[dict] = []
-        for sim, username in rows:
-            data = SimulationBase.model_validate(sim).model_dump()
-            data["owner_username"] = username
-            out.append(data)
-        return out
+        for row in rows:
+            out.append(
+                {
+                    "id": row.id,
+                    "owner_id": row.owner_id,
+                    "name": row.name,
+                    "scene_type": row.scene_type,
+                    "status": row.status,
+                    "created_at": row.created_at,
+                    "updated_at": row.updated_at,
+                    "owner_username": row.username,
+                }
+            )
+        return Response(out, headers=headers)
+
+
+def _bucket_expr(dialect: str, period: str, column):
+    if dialect == "postgresql":
+        return func.date_trunc(period, column)
+    if period == "week":
+        # Monday of the row's week
+        return func.date(column, "weekday 0", "-6 days")
+    if period == "month":
+        return func.strftime("%Y-%m", column)
+    return func.date(column)
+
+
+def _bucket_key(period: str, value) -> str:
+    if isinstance(value, str):
+        return value[:7] if period == "month" else value[:10]
+    if isinstance(value, datetime):
+        value = value.date()
+    if period == "month":
+        return f"{value.year:04d}-{value.month:02d}"
+    return value.isoformat()
+
+
+def _period_buckets(period: str, now: datetime) -> tuple[list[str], datetime]:
+    """Bucket labels for the window ending at ``now`` and the window start."""
+    if period == "week":
+        monday = now.date() - timedelta(days=now.date().weekday())
+        weeks = [monday - timedelta(weeks=i) for i in range(11, -1, -1)]
+        return [w.isoformat() for w in weeks], datetime.combine(weeks[0], datetime.min.time())
+    if period == "month":
+        months = []
+        y, m = now.year, now.month
+        for _ in range(12):
+            months.append((y, m))
+            y, m = (y - 1, 12) if m == 1 else (y, m - 1)
+        months.reverse()
+        start = datetime(months[0][0], months[0][1], 1)
+        return [f"{y:04d}-{m:02d}" for (y, m) in months], start
+    days = [now.date() - timedelta(days=i) for i in range(29, -1, -1)]
+    return [d.isoformat() for d in days], datetime.combine(days[0], datetime.min.time())
+
+
+async def _count_by_bucket(session, dialect: str, period: str, column, start: datetime) -> dict[str, int]:
+    bucket = _bucket_expr(dialect, period, column).label("bucket")
+    result = await session.execute(
+        select(bucket, func.count()).where(column >= start).group_by(bucket)
+    )
+    counts: dict[str, int] = {}
+    for value, count in result.all():
+        if value is not None:
+            key = _bucket_key(period, value)
+            counts[key] = counts.get(key, 0) + int(count)
+    return counts
 
 
 @get("/stats")
@@ -132,108 +256,75 @@ async def admin_stats(request: Request, period: str = "day") -> dict:
     async with get_session() as session:
         current_user = await resolve_current_user(session, token)
         _require_admin(current_user)
-        now = datetime.now()
+        if period not in {"day", "week", "month"}:
+            period = "day"
+
+        cached = _STATS_CACHE.get(period)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
 
-        def _floor_day(dt: datetime) -> date:
-            return dt.date()
+        buckets, start = _period_buckets(period, datetime.now())
+        dialect = session.get_bind().dialect.name
+        sims = await _count_by_bucket(session, dialect, period, Simulation.created_at, start)
+        visits = await _count_by_bucket(session, dialect, period, User.last_login_at, start)
+        signups = await _count_by_bucket(session, dialect, period, User.created_at, start)
+        stats = {
+            "period": period,
+            "sim_runs": [{"date": k, "count": sims.get(k, 0)} for k in buckets],
+            "user_visits": [{"date": k, "count": visits.get(k, 0)} for k in buckets],
+            "user_signups": [{"date": k, "count": signups.get(k, 0)} for k in buckets],
+        }
+        if settings.admin_stats_cache_seconds > 0:
+            _STATS_CACHE[period] = (time.monotonic() + settings.admin_stats_cache_seconds, stats)
+        return stats
 
-        def _floor_week(dt: datetime) -> date:
-            d = dt.date()
-            return d - timedelta(days=d.weekday())
 
-        def _floor_month(dt: datetime) -> tuple[int, int]:
-            d = dt.date()
-            return (d.year, d.month)
+def _tree_memory(records: list, top_nodes: int) -> list[dict]:
+    trees = []
+    for key, record in records:
+        usage = record.tree.memory_usage(per_node=True)
+        per_node = usage.pop("nodes")
+        largest = sorted(per_node.items(), key=lambda item: item[1], reverse=True)[:top_nodes]
+        trees.append(
+            {
+                "simulation_id": key,
+                "nodes": len(per_node),
+                "running": len(record.running),
+                "bytes": usage,
+                "top_nodes": [{"node": nid, "bytes": size, "tier": record.tree.tier(nid)} for nid, size in largest],
+            }
+        )
+    return trees
 
-        users_q = await session.execute(select(User.created_at, User.last_login_at))
-        user_rows = users_q.all()
-        sims_q = await session.execute(select(Simulation.created_at))
-        sim_rows = sims_q.all()
 
-        if period not in {"day", "week", "month"}:
-            period = "day"
+@get("/memory")
+async def admin_memory(request: Request, limit: int = 20, top_nodes: int = 5) -> dict:
+    """Approximate memory of in-memory trees, largest first, with per-owner totals."""
+    token = extract_bearer_token(request)
+    async with get_session() as session:
+        current_user = await resolve_current_user(session, token)
+        _require_admin(current_user)
+        trees = await asyncio.to_thread(_tree_memory, SIM_TREE_REGISTRY.items(), max(0, int(top_nodes)))
+        ids = [t["simulation_id"] for t in trees]
+        owners: dict[str, int] = {}
+        if ids:
+            result = await session.execute(select(Simulation.id, Simulation.owner_id).where(Simulation.id.in_(ids)))
+            owners = {row[0]: row[1] for row in result.all()}
 
-        buckets: list[str] = []
-        if period == "day":
-            days = [now.date() - timedelta(days=i) for i in range(29, -1, -1)]
-            buckets = [d.isoformat() for d in days]
-            sim_map = {k: 0 for k in buckets}
-            visit_map = {k: 0 for k in buckets}
-            signup_map = {k: 0 for k in buckets}
-            for (created_at,) in sim_rows:
-                k = _floor_day(created_at).isoformat()
-                if k in sim_map:
-                    sim_map[k] += 1
-            for created_at, last_login_at in user_rows:
-                k = _floor_day(created_at).isoformat()
-                if k in signup_map:
-                    signup_map[k] += 1
-                if last_login_at is not None:
-                    v = _floor_day(last_login_at).isoformat()
-                    if v in visit_map:
-                        visit_map[v] += 1
-            return {
-                "period": period,
-                "sim_runs": [{"date": k, "count": sim_map[k]} for k in buckets],
-                "user_visits": [{"date": k, "count": visit_map[k]} for k in buckets],
-                "user_signups": [{"date": k, "count": signup_map[k]} for k in buckets],
-            }
-        if period == "week":
-            weeks = [_floor_week(now - timedelta(weeks=i)) for i in range(11, -1, -1)]
-            buckets = [w.isoformat() for w in weeks]
-            sim_map = {k: 0 for k in buckets}
-            visit_map = {k: 0 for k in buckets}
-            signup_map = {k: 0 for k in buckets}
-            for (created_at,) in sim_rows:
-                k = _floor_week(created_at).isoformat()
-                if k in sim_map:
-                    sim_map[k] += 1
-            for created_at, last_login_at in user_rows:
-                k = _floor_week(created_at).isoformat()
-                if k in signup_map:
-                    signup_map[k] += 1
-                if last_login_at is not None:
-                    v = _floor_week(last_login_at).isoformat()
-                    if v in visit_map:
-                        visit_map[v] += 1
-            return {
-                "period": period,
-                "sim_runs": [{"date": k, "count": sim_map[k]} for k in buckets],
-                "user_visits": [{"date": k, "count": visit_map[k]} for k in buckets],
-                "user_signups": [{"date": k, "count": signup_map[k]} for k in buckets],
-            }
-        months = []
-        cur = now
-        for _ in range(12):
-            months.append((cur.year, cur.month))
-            if cur.month == 1:
-                cur = cur.replace(year=cur.year - 1, month=12)
-            else:
-                cur = cur.replace(month=cur.month - 1)
-        months = list(reversed(months))
-        buckets = [f"{y:04d}-{m:02d}" for (y, m) in months]
-        sim_map = {k: 0 for k in buckets}
-        visit_map = {k: 0 for k in buckets}
-        signup_map = {k: 0 for k in buckets}
-        for (created_at,) in sim_rows:
-            key = f"{created_at.year:04d}-{created_at.month:02d}"
-            if key in sim_map:
-                sim_map[key] += 1
-        for created_at, last_login_at in user_rows:
-            key = f"{created_at.year:04d}-{created_at.month:02d}"
-            if key in signup_map:
-                signup_map[key] += 1
-            if last_login_at is not None:
-                v = last_login_at
-                vkey = f"{v.year:04d}-{v.month:02d}"
-                if vkey in visit_map:
-                    visit_map[vkey] += 1
-        return {
-            "period": period,
-            "sim_runs": [{"date": k, "count": sim_map[k]} for k in buckets],
-            "user_visits": [{"date": k, "count": visit_map[k]} for k in buckets],
-            "user_signups": [{"date": k, "count": signup_map[k]} for k in buckets],
-        }
+    users: dict[int, dict] = {}
+    for tree in trees:
+        owner = owners.get(tree["simulation_id"])
+        tree["owner_id"] = owner
+        if owner is not None:
+            entry = users.setdefault(owner, {"user_id": owner, "trees": 0, "bytes": 0})
+            entry["trees"] += 1
+            entry["bytes"] += tree["bytes"]["total"]
+    trees.sort(key=lambda t: t["bytes"]["total"], reverse=True)
+    return {
+        "total_bytes": sum(t["bytes"]["total"] for t in trees),
+        "trees": trees[: _page_limit(limit)],
+        "users": sorted(users.values(), key=lambda u: u["bytes"], reverse=True),
+    }
 
 
 @patch("/users/{user_id:int}/role")
@@ -252,6 +343,25 @@ async def admin_update_user_role(
             raise HTTPException(status_code=404, detail="User not found")
         db_user.role = role
         await session.commit()
+        USER_CACHE.invalidate(db_user.id)
+        await session.refresh(db_user)
+        return UserPublic.model_validate(db_user)
+
+
+@patch("/users/{user_id:int}/active")
+async def admin_update_user_active(
+    request: Request, user_id: int, data: ActiveUpdate
+) -> UserPublic:
+    token = extract_bearer_token(request)
+    async with get_session() as session:
+        current_user = await resolve_current_user(session, token)
+        _require_admin(current_user)
+        db_user = await session.get(User, int(user_id))
+        if db_user is None:
+            raise HTTPException(status_code=404, detail="User not found")
+        db_user.is_active = bool(data.is_active)
+        await session.commit()
+        USER_CACHE.invalidate(db_user.id)
         await session.refresh(db_user)
         return UserPublic.model_validate(db_user)
 
@@ -262,6 +372,8 @@ router = Router(
         admin_list_users,
         admin_list_simulations,
         admin_stats,
+        admin_memory,
         admin_update_user_role,
+        admin_update_user_active,
     ],
 )
@@ -9,7 +9,7 @@ from sqlalchemy import select
 from ...core.config import get_settings
 from ...core.database import get_session
 from ...core.security import create_access_token, create_refresh_token, hash_password, verify_password
-from ...dependencies import extract_bearer_token, get_email_sender, resolve_current_user
+from ...dependencies import USER_CACHE, extract_bearer_token, get_email_sender, resolve_current_user
 from ...models.token import RefreshToken
 from ...models.user import User
 from ...schemas.auth import (
@@ -89,6 +89,7 @@ async def login(data: LoginRequest) -> TokenPair:
         )
         user.last_login_at = datetime.now(timezone.utc)
         await session.commit()
+        USER_CACHE.invalidate(user.id)
 
         return TokenPair(
             access_token=access_token,
@@ -122,6 +123,7 @@ async def verify_email(data: VerificationRequest) -> Message:
         user.updated_at = datetime.now(timezone.utc)
         await session.delete(token)
         await session.commit()
+        USER_CACHE.invalidate(user.id)
 
         return Message(message="Email verified")
 
@@ -173,6 +175,26 @@ async def refresh_token(data: RefreshRequest) -> TokenPair:
         )
 
 
+@post("/logout")
+async def logout(request: Request, data: RefreshRequest | None = None) -> Message:
+    token = extract_bearer_token(request)
+    async with get_session() as session:
+        current_user = await resolve_current_user(session, token)
+        if data is not None:
+            token_q = await session.execute(
+                select(RefreshToken).where(
+                    RefreshToken.token == data.refresh_token,
+                    RefreshToken.user_id == current_user.id,
+                )
+            )
+            token_db = token_q.scalar_one_or_none()
+            if token_db is not None and token_db.revoked_at is None:
+                token_db.revoked_at = datetime.now(timezone.utc)
+                await session.commit()
+    USER_CACHE.invalidate(current_user.id)
+    return Message(message="Logged out")
+
+
 router = Router(
     path="/auth",
     route_handlers=[
@@ -181,5 +203,6 @@ router = Router(
         verify_email,
         read_me,
         refresh_token,
+        logout,
     ],
 )
@@ -0,0 +1,23 @@
+import hmac
+
+from litestar import Request, get
+from litestar.exceptions import HTTPException
+from litestar.response import Response
+
+from socialsim4.core.metrics import REGISTRY
+
+from ...core.config import get_settings
+
+from ...services import metrics as _runtime_metrics  # noqa: F401  (registers scrape-time collector)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@get("/metrics", include_in_schema=False)
+async def read_metrics(request: Request) -> Response:
+    expected = get_settings().metrics_token
+    if expected is not None:
+        header = request.headers.get("Authorization", "")
+        if not hmac.compare_digest(header.encode(), f"Bearer {expected.get_secret_value()}".encode()):
+            raise HTTPException(status_code=401, detail="Invalid metrics token")
+    return Response(content=REGISTRY.render(), media_type=PROMETHEUS_CONTENT_TYPE)
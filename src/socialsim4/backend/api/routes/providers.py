@@ -12,6 +12,7 @@ from ...dependencies import extract_bearer_token, resolve_current_user
 from ...models.user import ProviderConfig
 from ...schemas.common import Message
 from ...schemas.provider import ProviderBase, ProviderCreate, ProviderUpdate
+from ...services.clients import CLIENT_CACHE
 
 
 def _serialize_provider(provider: ProviderConfig) -> ProviderBase:
@@ -70,6 +71,7 @@ async def create_provider(request: Request, data: ProviderCreate) -> ProviderBas
         )
         session.add(provider)
         await session.commit()
+        CLIENT_CACHE.invalidate(current_user.id)
         await session.refresh(provider)
         return _serialize_provider(provider)
 
@@ -98,6 +100,7 @@ async def update_provider(
             provider.config = data.config
 
         await session.commit()
+        CLIENT_CACHE.invalidate(current_user.id)
         await session.refresh(provider)
         return _serialize_provider(provider)
 
@@ -111,6 +114,7 @@ async def delete_provider(request: Request, provider_id: int) -> None:
         assert provider is not None and provider.user_id == current_user.id
         await session.delete(provider)
         await session.commit()
+        CLIENT_CACHE.invalidate(current_user.id)
 
 
 @post("/{provider_id:int}/test")
@@ -161,6 +165,7 @@ async def activate_provider(request: Request, provider_id: int) -> Message:
             else:
                 p.config = {}
         await session.commit()
+        CLIENT_CACHE.invalidate(current_user.id)
         return Message(message="Activated provider")
 
 
@@ -3,7 +3,7 @@ from socialsim4.core.registry import SCENE_ACTIONS, SCENE_DESCRIPTIONS, SCENE_MA
 from litestar import Router, get
 
 
-PUBLIC_SCENE_KEYS = {key for key in SCENE_MAP.keys()} - {"village_scene"}
+HIDDEN_SCENE_KEYS = {"village_scene"}
 
 DEFAULT_SIMPLE_CHAT_NEWS = (
     "News: A new study suggests AI models now match human-level performance in creative writing benchmarks."
@@ -86,7 +86,7 @@ def scene_config_template(scene_key: str, scene_cls) -> dict:
 async def list_scenes() -> list[dict]:
     scenes: list[dict] = []
     for key, cls in SCENE_MAP.items():
-        if key not in PUBLIC_SCENE_KEYS:
+        if key in HIDDEN_SCENE_KEYS:
             continue
         scenes.append(scene_config_template(key, cls))
     return scenes
@@ -6,6 +6,7 @@ from ...core.database import get_session
 from ...dependencies import extract_bearer_token, resolve_current_user
 from ...models.user import SearchProviderConfig
 from ...schemas.search_provider import SearchProviderBase, SearchProviderCreate, SearchProviderUpdate
+from ...services.clients import CLIENT_CACHE
 
 
 def _serialize(provider: SearchProviderConfig) -> SearchProviderBase:
@@ -42,6 +43,7 @@ async def create_search_provider(request: Request, data: SearchProviderCreate) -
         )
         session.add(provider)
         await session.commit()
+        CLIENT_CACHE.invalidate(current_user.id)
         await session.refresh(provider)
         return _serialize(provider)
 
@@ -64,6 +66,7 @@ async def update_search_provider(request: Request, provider_id: int, data: Searc
             provider.config = data.config
 
         await session.commit()
+        CLIENT_CACHE.invalidate(current_user.id)
         await session.refresh(provider)
         return _serialize(provider)
 
@@ -77,6 +80,7 @@ async def delete_search_provider(request: Request, provider_id: int) -> None:
         assert provider is not None and provider.user_id == current_user.id
         await session.delete(provider)
         await session.commit()
+        CLIENT_CACHE.invalidate(current_user.id)
 
 
 router = Router(
@@ -1,22 +1,24 @@
 import asyncio
+import time
+from collections import OrderedDict
 from datetime import datetime, timezone
 
-from jose import JWTError, jwt
 from litestar import Router, delete, get, patch, post, websocket
 from litestar.connection import Request, WebSocket
-from sqlalchemy import select
+from litestar.enums import MediaType
+from litestar.exceptions import HTTPException
+from litestar.response import Response
+from sqlalchemy import Text, cast, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from socialsim4.core.llm import create_llm_client
-from socialsim4.core.llm_config import LLMConfig
-from socialsim4.core.search_config import SearchConfig
+from socialsim4.core.log import get_logger
+from socialsim4.core.node_tiers import pack, unpack
 from socialsim4.core.simtree import SimTree
-from socialsim4.core.tools.web.search import create_search_client
 
 from ...core.database import get_session
 from ...dependencies import extract_bearer_token, resolve_current_user, settings
 from ...models.simulation import Simulation, SimulationLog, SimulationSnapshot
-from ...models.user import ProviderConfig, SearchProviderConfig, User
+from ...models.user import ProviderConfig
 from ...schemas.common import Message
 from ...schemas.simtree import (
     SimulationTreeAdvanceChainPayload,
@@ -31,9 +33,20 @@ from ...schemas.simulation import (
     SimulationUpdate,
     SnapshotBase,
     SnapshotCreate,
+    SnapshotDetail,
 )
-from ...services.simtree_runtime import SIM_TREE_REGISTRY, SimTreeRecord
+from ...schemas.user import UserPublic
+from ...services.clients import CLIENT_CACHE
+from ...services.event_stream import EventSubscriber, FrameEncoder
+from ...services import simtree_store
+from ...services.jobs import JOB_MANAGER, Job
+from ...services.log_writer import LOG_WRITER
+from ...services.node_executor import NODE_EXECUTOR
+from ...services.simtree_runtime import SIM_TREE_REGISTRY, SimTreeRecord, wire_tree_events
 from ...services.simulations import generate_simulation_id, generate_simulation_name
+from ..responses import encode_json, json_response, json_response_async, raw_json
+
+log = get_logger("backend.simulations")
 
 
 async def _get_simulation_for_owner(
@@ -52,51 +65,17 @@ async def _get_simulation_for_owner(
 async def _get_tree_record(
     sim: Simulation, session: AsyncSession, user_id: int
 ) -> SimTreeRecord:
-    result = await session.execute(
-        select(ProviderConfig).where(ProviderConfig.user_id == user_id)
-    )
-    items = result.scalars().all()
-    active = [p for p in items if (p.config or {}).get("active")]
-    if len(active) != 1:
-        raise RuntimeError("Active LLM provider not selected")
-    provider = active[0]
-    dialect = (provider.provider or "").lower()
-    if dialect not in {"openai", "gemini", "mock"}:
-        raise RuntimeError("Invalid LLM provider dialect")
-    if dialect != "mock" and not provider.api_key:
-        raise RuntimeError("LLM API key required")
-    if not provider.model:
-        raise RuntimeError("LLM model required")
-
-    cfg = LLMConfig(
-        dialect=dialect,
-        api_key=provider.api_key or "",
-        model=provider.model,
-        base_url=provider.base_url,
-        temperature=0.7,
-        top_p=1.0,
-        frequency_penalty=0.0,
-        presence_penalty=0.0,
-        max_tokens=1024,
-    )
-    llm_client = create_llm_client(cfg)
-
-    result_s = await session.execute(
-        select(SearchProviderConfig).where(SearchProviderConfig.user_id == user_id)
-    )
-    sprov = result_s.scalars().first()
-    if sprov is None:
-        s_cfg = SearchConfig(dialect="ddg", api_key="", base_url=None, params={})
-    else:
-        s_cfg = SearchConfig(
-            dialect=(sprov.provider or "ddg"),
-            api_key=sprov.api_key or "",
-            base_url=sprov.base_url,
-            params=sprov.config or {},
-        )
-    search_client = create_search_client(s_cfg)
-    clients = {"chat": llm_client, "default": llm_client, "search": search_client}
-    return await SIM_TREE_REGISTRY.get_or_create_from_sim(sim, clients)
+    clients = await CLIENT_CACHE.get(session, user_id)
+    record = SIM_TREE_REGISTRY.get(sim.id)
+    if record is None:
+        # A cold load waits on the registry lock and then needs a connection of its
+        # own; release ours first so concurrent cold loads cannot drain the pool
+        await session.commit()
+        record = await SIM_TREE_REGISTRY.get_or_create_from_sim(sim, clients)
+    # Trees loaded before a provider change still hold the old clients
+    if record.tree.clients is not clients:
+        record.tree.set_clients(clients)
+    return record
 
 
 async def _get_simulation_and_tree(
@@ -109,27 +88,30 @@ async def _get_simulation_and_tree(
     return sim, record
 
 
-async def _resolve_user_from_token(token: str, session: AsyncSession) -> User | None:
+async def _resolve_user_from_token(token: str, session: AsyncSession) -> UserPublic | None:
     if not token:
         return None
     try:
-        payload = jwt.decode(
-            token,
-            settings.jwt_signing_key.get_secret_value(),
-            algorithms=[settings.jwt_algorithm],
-        )
-    except JWTError:
-        return None
-    subject = payload.get("sub")
-    if subject is None:
+        return await resolve_current_user(session, token)
+    except HTTPException:
         return None
-    user = await session.get(User, int(subject))
-    if user is None or not user.is_active:
-        return None
-    return user
+
+
+async def _persist_nodes(record: SimTreeRecord, node_ids, tree: SimTree | None = None) -> None:
+    tree = tree or record.tree
+    if tree is not record.tree:
+        # The record's tree was replaced (resume from a snapshot); these nodes went with it
+        return
+    if record.simulation_id is not None:
+        await simtree_store.save_nodes(record.simulation_id, tree, node_ids)
+    # Interior nodes that are not running no longer need a live simulator
+    await asyncio.to_thread(tree.compact, set(record.running))
 
 
 def _broadcast(record: SimTreeRecord, event: dict) -> None:
+    # Deliver node events still buffered from worker threads first so that
+    # lifecycle events (run_finish, ...) never overtake them
+    record.tree.flush_events()
     for queue in list(record.subs):
         queue.put_nowait(event)
 
@@ -222,7 +204,58 @@ async def delete_simulation(request: Request, simulation_id: str) -> None:
         sim = await _get_simulation_for_owner(session, current_user.id, simulation_id)
         await session.delete(sim)
         await session.commit()
+        JOB_MANAGER.cancel_all(sim.id)
         SIM_TREE_REGISTRY.remove(simulation_id)
+        LOG_WRITER.forget(sim.id)
+
+
+def _snapshot_state(snapshot: SimulationSnapshot) -> dict:
+    if snapshot.state_blob is not None:
+        return unpack(snapshot.state_blob)
+    return snapshot.state or {}
+
+
+# Snapshots split into per-node JSON, so paging through one unpacks it once and
+# the cache holds encoded bytes (bounded in total) rather than decoded trees.
+# Snapshots never change; created_at is part of the key in case an id is reused.
+_SNAPSHOT_PAGES: "OrderedDict[tuple[int, datetime], tuple[float, dict, int]]" = OrderedDict()
+_SNAPSHOT_PAGES_MAX_BYTES = 16 * 1024 * 1024
+_SNAPSHOT_PAGES_TTL = 60.0
+
+
+def _snapshot_pages(snapshot: SimulationSnapshot) -> tuple[dict, int]:
+    state = _snapshot_state(snapshot)
+    nodes = [encode_json(node) for node in state.get("nodes") or []]
+    pages = {"root": state.get("root"), "seq": int(state.get("seq", 0)), "nodes": nodes}
+    return pages, sum(len(node) for node in nodes)
+
+
+async def _cached_snapshot_pages(snapshot: SimulationSnapshot) -> dict:
+    key = (snapshot.id, snapshot.created_at)
+    now = time.monotonic()
+    entry = _SNAPSHOT_PAGES.get(key)
+    if entry is not None and entry[0] > now:
+        _SNAPSHOT_PAGES.move_to_end(key)
+        return entry[1]
+    pages, size = await asyncio.to_thread(_snapshot_pages, snapshot)
+    if size <= _SNAPSHOT_PAGES_MAX_BYTES:
+        _SNAPSHOT_PAGES[key] = (now + _SNAPSHOT_PAGES_TTL, pages, size)
+        _SNAPSHOT_PAGES.move_to_end(key)
+        total = sum(item[2] for item in _SNAPSHOT_PAGES.values())
+        while total > _SNAPSHOT_PAGES_MAX_BYTES:
+            total -= _SNAPSHOT_PAGES.popitem(last=False)[1][2]
+    return pages
+
+
+def _pack_tree_state(tree: SimTree, node_ids: list[int]) -> tuple[bytes, int]:
+    tree_state = tree.serialize(node_ids)
+    max_turns = 0
+    for node in tree_state.get("nodes", []):
+        sim_snap = node.get("sim") or {}
+        t = int(sim_snap.get("turns", 0)) if isinstance(sim_snap, dict) else 0
+        if t > max_turns:
+            max_turns = t
+    return pack(tree_state), max_turns
 
 
 @post("/{simulation_id:str}/save", status_code=201)
@@ -236,18 +269,18 @@ async def create_snapshot(
         record = SIM_TREE_REGISTRY.get(simulation_id)
         if record is None:
             record = await _get_tree_record(sim, session, current_user.id)
-        tree_state = record.tree.serialize()
-        max_turns = 0
-        for node in tree_state.get("nodes", []):
-            sim_snap = node.get("sim") or {}
-            t = int(sim_snap.get("turns", 0)) if isinstance(sim_snap, dict) else 0
-            if t > max_turns:
-                max_turns = t
+        with SIM_TREE_REGISTRY.lease(record):
+            # Serializing and compressing a large tree is CPU-bound; keep it off the loop.
+            # The node set is fixed here, on the loop that attaches and deletes nodes;
+            # children still being created (no depth yet) are left out.
+            node_ids = [nid for nid, node in record.tree.nodes.items() if node.get("depth") is not None]
+            blob, max_turns = await asyncio.to_thread(_pack_tree_state, record.tree, node_ids)
         label = data.label or f"Snapshot {datetime.now(timezone.utc).isoformat()}"
         snapshot = SimulationSnapshot(
             simulation_id=sim.id,
             label=label,
-            state=tree_state,
+            state={},
+            state_blob=blob,
             turns=max_turns,
         )
         session.add(snapshot)
@@ -257,36 +290,96 @@ async def create_snapshot(
 
 
 @get("/{simulation_id:str}/snapshots")
-async def list_snapshots(request: Request, simulation_id: str) -> list[SnapshotBase]:
+async def list_snapshots(
+    request: Request, simulation_id: str, limit: int | None = None
+) -> list[SnapshotBase]:
     token = extract_bearer_token(request)
     async with get_session() as session:
         current_user = await resolve_current_user(session, token)
         sim = await _get_simulation_for_owner(session, current_user.id, simulation_id)
-        result = await session.execute(
-            select(SimulationSnapshot)
+        # Metadata columns only: the stored tree state never leaves the database here
+        stmt = (
+            select(
+                SimulationSnapshot.id,
+                SimulationSnapshot.label,
+                SimulationSnapshot.turns,
+                SimulationSnapshot.created_at,
+            )
             .where(SimulationSnapshot.simulation_id == sim.id)
             .order_by(SimulationSnapshot.created_at.desc())
         )
-        snapshots = result.scalars().all()
-        return [SnapshotBase.model_validate(s) for s in snapshots]
+        if limit is not None:
+            stmt = stmt.limit(max(1, int(limit)))
+        result = await session.execute(stmt)
+        return [SnapshotBase.model_validate(row) for row in result.all()]
+
+
+@get("/{simulation_id:str}/snapshots/{snapshot_id:int}")
+async def read_snapshot(
+    request: Request,
+    simulation_id: str,
+    snapshot_id: int,
+    offset: int = 0,
+    limit: int | None = None,
+) -> Response[SnapshotDetail]:
+    token = extract_bearer_token(request)
+    async with get_session() as session:
+        current_user = await resolve_current_user(session, token)
+        sim = await _get_simulation_for_owner(session, current_user.id, simulation_id)
+        snapshot = await session.get(SimulationSnapshot, snapshot_id)
+        if snapshot is None or snapshot.simulation_id != sim.id:
+            raise HTTPException(status_code=404, detail="Snapshot not found")
+
+        # The encoded nodes are cached briefly, so a page costs one slice, not a full unpack
+        tree_state = await _cached_snapshot_pages(snapshot)
+
+        def _page() -> bytes:
+            # Node states are embedded as encoded; no SnapshotDetail validation or re-encoding
+            nodes = tree_state["nodes"]
+            start = max(0, int(offset))
+            end = len(nodes) if limit is None else min(len(nodes), start + max(1, int(limit)))
+            return encode_json(
+                {
+                    "id": snapshot.id,
+                    "label": snapshot.label,
+                    "turns": snapshot.turns,
+                    "created_at": snapshot.created_at,
+                    "root": tree_state["root"],
+                    "seq": tree_state["seq"],
+                    "nodes": [raw_json(node) for node in nodes[start:end]],
+                    "total_nodes": len(nodes),
+                    "next_offset": end if end < len(nodes) else None,
+                }
+            )
+
+        return Response(content=await asyncio.to_thread(_page), media_type=MediaType.JSON)
 
 
 @get("/{simulation_id:str}/logs")
 async def list_logs(
     request: Request, simulation_id: str, limit: int = 200
-) -> list[SimulationLogEntry]:
+) -> Response[list[SimulationLogEntry]]:
     token = extract_bearer_token(request)
     async with get_session() as session:
         current_user = await resolve_current_user(session, token)
         sim = await _get_simulation_for_owner(session, current_user.id, simulation_id)
+        # Payloads are read as JSON text and written into the response unparsed
         result = await session.execute(
-            select(SimulationLog)
+            select(
+                SimulationLog.id,
+                SimulationLog.event_type,
+                cast(SimulationLog.payload, Text),
+                SimulationLog.created_at,
+            )
             .where(SimulationLog.simulation_id == sim.id)
             .order_by(SimulationLog.sequence.desc())
             .limit(limit)
         )
-        logs = list(reversed(result.scalars().all()))
-        return [SimulationLogEntry.model_validate(log) for log in logs]
+        out = [
+            {"id": row[0], "event_type": row[1], "payload": raw_json(row[2]), "created_at": row[3]}
+            for row in reversed(result.all())
+        ]
+        return await json_response_async(out, len(out))
 
 
 @post("/{simulation_id:str}/start")
@@ -312,22 +405,17 @@ async def resume_simulation(
         record = await _get_tree_record(sim, session, current_user.id)
 
         if snapshot_id is not None:
-            snapshot = await session.get(SimulationSnapshot, snapshot_id)
-            assert snapshot is not None and snapshot.simulation_id == sim.id
-            tree_state = snapshot.state
-            new_tree = SimTree.deserialize(tree_state, record.tree.clients)
-            loop = asyncio.get_running_loop()
-            new_tree.attach_event_loop(loop)
-
-            def _fanout(event: dict) -> None:
-                if int(event.get("node", -1)) not in record.running:
-                    return
-                for q in list(record.subs):
-                    loop.call_soon_threadsafe(q.put_nowait, event)
-
-            new_tree.set_tree_broadcast(_fanout)
-            record.running.clear()
-            record.tree = new_tree
+            with SIM_TREE_REGISTRY.lease(record):
+                snapshot = await session.get(SimulationSnapshot, snapshot_id)
+                assert snapshot is not None and snapshot.simulation_id == sim.id
+                tree_state = await asyncio.to_thread(_snapshot_state, snapshot)
+                # Runs on the old tree stop at their next step and do not write into the new one
+                JOB_MANAGER.cancel_all(sim.id)
+                new_tree = SimTree.deserialize(tree_state, record.tree.clients)
+                wire_tree_events(record, new_tree)
+                record.running.clear()
+                record.tree = new_tree
+                await simtree_store.replace_tree(sim.id, new_tree)
 
         sim.status = "running"
         sim.updated_at = datetime.now(timezone.utc)
@@ -359,7 +447,12 @@ async def copy_simulation(request: Request, simulation_id: str) -> SimulationBas
 
 
 @get("/{simulation_id:str}/tree/graph")
-async def simulation_tree_graph(request: Request, simulation_id: str) -> dict:
+async def simulation_tree_graph(
+    request: Request,
+    simulation_id: str,
+    since: int | None = None,
+    epoch: str | None = None,
+) -> Response[dict]:
     try:
         token = extract_bearer_token(request)
         async with get_session() as session:
@@ -367,46 +460,48 @@ async def simulation_tree_graph(request: Request, simulation_id: str) -> dict:
             sim, record = await _get_simulation_and_tree(
                 session, current_user.id, simulation_id
             )
-            tree = record.tree
-            attached_ids = {
-                int(nid)
-                for nid, node in tree.nodes.items()
-                if node.get("depth") is not None
-            }
-            nodes = [
-                {"id": int(node["id"]), "depth": int(node["depth"])}
-                for node in tree.nodes.values()
-                if node.get("depth") is not None
-            ]
-            edges = []
-            for pid, children in tree.children.items():
-                if pid not in attached_ids:
-                    continue
-                for cid in children:
-                    if cid not in attached_ids:
-                        continue
-                    et = tree.nodes[cid]["edge_type"]
-                    edges.append({"from": int(pid), "to": int(cid), "type": et})
-            depth_map = {
-                int(node["id"]): int(node["depth"])
-                for node in tree.nodes.values()
-                if node.get("depth") is not None
-            }
-            outdeg = {i: 0 for i in depth_map}
-            for edge in edges:
-                outdeg[edge["from"]] = outdeg.get(edge["from"], 0) + 1
-            leaves = [i for i, degree in outdeg.items() if degree == 0]
-            max_depth = max(depth_map.values()) if depth_map else 0
-            frontier = [i for i in leaves if depth_map.get(i) == max_depth]
-            return {
-                "root": int(tree.root) if tree.root is not None else None,
-                "frontier": frontier,
-                "running": [int(n) for n in record.running],
-                "nodes": nodes,
-                "edges": edges,
-            }
+            # Full graph, or only the nodes/edges added and removed after ``since``
+            graph = record.tree.graph(since=since, epoch=epoch)
+            graph["running"] = [int(n) for n in record.running]
+            return await json_response_async(graph, len(graph["nodes"]))
     except Exception as e:
-        return {"error": str(e)}
+        return json_response({"error": str(e)})
+
+
+def _start_child(record: SimTreeRecord, tree: SimTree, parent: int, cid: int, turns: int) -> None:
+    tree.attach(parent, [{"op": "advance", "turns": turns}], cid)
+    node = tree.nodes[cid]
+    _broadcast(
+        record,
+        {
+            "type": "attached",
+            "data": {
+                "node": int(cid),
+                "parent": int(parent),
+                "depth": int(node["depth"]),
+                "edge_type": node["edge_type"],
+                "ops": node["ops"],
+            },
+        },
+    )
+    record.running.add(cid)
+    _broadcast(record, {"type": "run_start", "data": {"node": int(cid)}})
+
+
+async def _run_child(record: SimTreeRecord, tree: SimTree, job: Job, cid: int, turns: int) -> None:
+    try:
+        await NODE_EXECUTOR.run(
+            tree,
+            cid,
+            turns,
+            cancel=job.cancel_event,
+            on_turn=job.turn_callback(cid),
+        )
+    finally:
+        # Node ids of a replaced tree mean nothing to the new one
+        if record.tree is tree:
+            _broadcast(record, {"type": "run_finish", "data": {"node": int(cid)}})
+            record.running.discard(cid)
 
 
 @post("/{simulation_id:str}/tree/advance_frontier")
@@ -415,50 +510,34 @@ async def simulation_tree_advance_frontier(
     simulation_id: str,
     data: SimulationTreeAdvanceFrontierPayload,
 ) -> dict:
+    # Backpressure: hold new runs while the log writer is far behind
+    await LOG_WRITER.wait_for_capacity()
     token = extract_bearer_token(request)
     async with get_session() as session:
         current_user = await resolve_current_user(session, token)
-        _, record = await _get_simulation_and_tree(
+        sim, record = await _get_simulation_and_tree(
             session, current_user.id, simulation_id
         )
-        tree = record.tree
-        parents = tree.frontier(True) if data.only_max_depth else tree.leaves()
-        turns = int(data.turns)
-        allocations = {pid: tree.copy_sim(pid) for pid in parents}
-        for pid, cid in allocations.items():
-            tree.attach(pid, [{"op": "advance", "turns": turns}], cid)
-            node = tree.nodes[cid]
-            _broadcast(
-                record,
-                {
-                    "type": "attached",
-                    "data": {
-                        "node": int(cid),
-                        "parent": int(pid),
-                        "depth": int(node["depth"]),
-                        "edge_type": node["edge_type"],
-                        "ops": node["ops"],
-                    },
-                },
-            )
-            record.running.add(cid)
-            _broadcast(record, {"type": "run_start", "data": {"node": int(cid)}})
-        await asyncio.sleep(0)
-
-        async def _run(parent_id: int) -> tuple[int, int, bool]:
-            child_id = allocations[parent_id]
-            simulator = tree.nodes[child_id]["sim"]
-            await asyncio.to_thread(simulator.run, max_turns=turns)
-            return parent_id, child_id, False
-
-        results = await asyncio.gather(*[_run(pid) for pid in parents])
-        produced: list[int] = []
-        for *_pid, cid, _err in results:
-            produced.append(cid)
-            if cid in record.running:
-                record.running.remove(cid)
-            _broadcast(record, {"type": "run_finish", "data": {"node": int(cid)}})
-        return {"children": [int(c) for c in produced]}
+        with SIM_TREE_REGISTRY.lease(record):
+            # Persisting children opens sessions of its own; give this connection back
+            await session.commit()
+            tree = record.tree
+            parents = tree.frontier(True) if data.only_max_depth else tree.leaves()
+            turns = int(data.turns)
+            allocations = {pid: tree.copy_sim(pid) for pid in parents}
+            for pid, cid in allocations.items():
+                _start_child(record, tree, pid, cid, turns)
+            children = [int(c) for c in allocations.values()]
+            await _persist_nodes(record, children, tree)
+
+            async def _body(job: Job) -> dict:
+                job.nodes.extend(children)
+                await asyncio.gather(*[_run_child(record, tree, job, cid, turns) for cid in children])
+                await _persist_nodes(record, children, tree)
+                return {"children": children}
+
+            job = JOB_MANAGER.submit(sim.id, "advance_frontier", record, turns * len(children), _body)
+    return {"job_id": job.id, "children": children}
 
 
 @post("/{simulation_id:str}/tree/advance_multi")
@@ -467,52 +546,35 @@ async def simulation_tree_advance_multi(
     simulation_id: str,
     data: SimulationTreeAdvanceMultiPayload,
 ) -> dict:
+    await LOG_WRITER.wait_for_capacity()
     token = extract_bearer_token(request)
     async with get_session() as session:
         current_user = await resolve_current_user(session, token)
         sim, record = await _get_simulation_and_tree(
             session, current_user.id, simulation_id
         )
-        tree = record.tree
         parent = int(data.parent)
         count = int(data.count)
         if count <= 0:
-            return {"children": []}
+            return {"job_id": None, "children": []}
         turns = int(data.turns)
-        children = [tree.copy_sim(parent) for _ in range(count)]
-        for cid in children:
-            tree.attach(parent, [{"op": "advance", "turns": turns}], cid)
-            node = tree.nodes[cid]
-            _broadcast(
-                record,
-                {
-                    "type": "attached",
-                    "data": {
-                        "node": int(cid),
-                        "parent": int(parent),
-                        "depth": int(node["depth"]),
-                        "edge_type": node["edge_type"],
-                        "ops": node["ops"],
-                    },
-                },
-            )
-            record.running.add(cid)
-            _broadcast(record, {"type": "run_start", "data": {"node": int(cid)}})
-        await asyncio.sleep(0)
-
-        async def _run(child_id: int) -> tuple[int, bool]:
-            simulator = tree.nodes[child_id]["sim"]
-            await asyncio.to_thread(simulator.run, max_turns=turns)
-            return child_id, False
-
-        finished = await asyncio.gather(*[_run(cid) for cid in children])
-        result_children: list[int] = []
-        for cid, _err in finished:
-            result_children.append(cid)
-            if cid in record.running:
-                record.running.remove(cid)
-            _broadcast(record, {"type": "run_finish", "data": {"node": int(cid)}})
-        return {"children": [int(c) for c in result_children]}
+        with SIM_TREE_REGISTRY.lease(record):
+            # Persisting children opens sessions of its own; give this connection back
+            await session.commit()
+            tree = record.tree
+            children = [int(tree.copy_sim(parent)) for _ in range(count)]
+            for cid in children:
+                _start_child(record, tree, parent, cid, turns)
+            await _persist_nodes(record, children, tree)
+
+            async def _body(job: Job) -> dict:
+                job.nodes.extend(children)
+                await asyncio.gather(*[_run_child(record, tree, job, cid, turns) for cid in children])
+                await _persist_nodes(record, children, tree)
+                return {"children": children}
+
+            job = JOB_MANAGER.submit(sim.id, "advance_multi", record, turns * count, _body)
+    return {"job_id": job.id, "children": children}
 
 
 @post("/{simulation_id:str}/tree/advance_chain")
@@ -521,45 +583,68 @@ async def simulation_tree_advance_chain(
     simulation_id: str,
     data: SimulationTreeAdvanceChainPayload,
 ) -> dict:
+    await LOG_WRITER.wait_for_capacity()
     token = extract_bearer_token(request)
     async with get_session() as session:
         current_user = await resolve_current_user(session, token)
         sim, record = await _get_simulation_and_tree(
             session, current_user.id, simulation_id
         )
-        tree = record.tree
-        parent = int(data.parent)
-        steps = max(1, int(data.turns))
-        last = parent
-        for _ in range(steps):
-            cid = tree.copy_sim(last)
-            tree.attach(last, [{"op": "advance", "turns": 1}], cid)
-            node = tree.nodes[cid]
-            _broadcast(
-                record,
-                {
-                    "type": "attached",
-                    "data": {
-                        "node": int(cid),
-                        "parent": int(last),
-                        "depth": int(node["depth"]),
-                        "edge_type": node["edge_type"],
-                        "ops": node["ops"],
-                    },
-                },
-            )
-            record.running.add(cid)
-            _broadcast(record, {"type": "run_start", "data": {"node": int(cid)}})
-            await asyncio.sleep(0)
+        with SIM_TREE_REGISTRY.lease(record):
+            tree = record.tree
+            parent = int(data.parent)
+            steps = max(1, int(data.turns))
+
+            async def _body(job: Job) -> dict:
+                last = parent
+                for _ in range(steps):
+                    # A resume from a snapshot replaces the tree; the chain ends with it
+                    if job.cancelled or record.tree is not tree:
+                        break
+                    cid = tree.copy_sim(last)
+                    _start_child(record, tree, last, cid, 1)
+                    job.nodes.append(int(cid))
+                    await _persist_nodes(record, [cid], tree)
+                    await _run_child(record, tree, job, cid, 1)
+                    await _persist_nodes(record, [cid], tree)
+                    last = cid
+                return {"child": int(last)}
+
+            job = JOB_MANAGER.submit(sim.id, "advance_chain", record, steps, _body)
+    return {"job_id": job.id}
+
+
+async def _get_owned_job(request: Request, simulation_id: str, job_id: str) -> Job:
+    token = extract_bearer_token(request)
+    async with get_session() as session:
+        current_user = await resolve_current_user(session, token)
+        sim = await _get_simulation_for_owner(session, current_user.id, simulation_id)
+    job = JOB_MANAGER.get(sim.id, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
 
-            simulator = tree.nodes[cid]["sim"]
-            await asyncio.to_thread(simulator.run, max_turns=1)
 
-            if cid in record.running:
-                record.running.remove(cid)
-            _broadcast(record, {"type": "run_finish", "data": {"node": int(cid)}})
-            last = cid
-        return {"child": int(last)}
+@get("/{simulation_id:str}/jobs")
+async def list_jobs(request: Request, simulation_id: str) -> list[dict]:
+    token = extract_bearer_token(request)
+    async with get_session() as session:
+        current_user = await resolve_current_user(session, token)
+        sim = await _get_simulation_for_owner(session, current_user.id, simulation_id)
+    return [job.to_dict() for job in JOB_MANAGER.list(sim.id)]
+
+
+@get("/{simulation_id:str}/jobs/{job_id:str}")
+async def read_job(request: Request, simulation_id: str, job_id: str) -> dict:
+    job = await _get_owned_job(request, simulation_id, job_id)
+    return job.to_dict()
+
+
+@post("/{simulation_id:str}/jobs/{job_id:str}/cancel")
+async def cancel_job(request: Request, simulation_id: str, job_id: str) -> dict:
+    job = await _get_owned_job(request, simulation_id, job_id)
+    JOB_MANAGER.cancel(job.simulation_id, job.id)
+    return job.to_dict()
 
 
 @post("/{simulation_id:str}/tree/branch")
@@ -574,23 +659,25 @@ async def simulation_tree_branch(
         _, record = await _get_simulation_and_tree(
             session, current_user.id, simulation_id
         )
-        tree = record.tree
-        cid = tree.branch(int(data.parent), [dict(op) for op in data.ops])
-        node = tree.nodes[cid]
-        _broadcast(
-            record,
-            {
-                "type": "attached",
-                "data": {
-                    "node": int(cid),
-                    "parent": int(node["parent"]),
-                    "depth": int(node["depth"]),
-                    "edge_type": node["edge_type"],
-                    "ops": node["ops"],
+        with SIM_TREE_REGISTRY.lease(record):
+            tree = record.tree
+            cid = tree.branch(int(data.parent), [dict(op) for op in data.ops])
+            node = tree.nodes[cid]
+            _broadcast(
+                record,
+                {
+                    "type": "attached",
+                    "data": {
+                        "node": int(cid),
+                        "parent": int(node["parent"]),
+                        "depth": int(node["depth"]),
+                        "edge_type": node["edge_type"],
+                        "ops": node["ops"],
+                    },
                 },
-            },
-        )
-        return {"child": int(cid)}
+            )
+            await _persist_nodes(record, [cid])
+            return {"child": int(cid)}
 
 
 @delete("/{simulation_id:str}/tree/node/{node_id:int}")
@@ -605,56 +692,181 @@ async def simulation_tree_delete_subtree(
         _, record = await _get_simulation_and_tree(
             session, current_user.id, simulation_id
         )
-        record.tree.delete_subtree(int(node_id))
-        _broadcast(record, {"type": "deleted", "data": {"node": int(node_id)}})
+        with SIM_TREE_REGISTRY.lease(record):
+            removed = record.tree.delete_subtree(int(node_id))
+            _broadcast(record, {"type": "deleted", "data": {"node": int(node_id)}})
+            if record.simulation_id is not None:
+                await simtree_store.delete_nodes(record.simulation_id, removed)
+
+
+def _not_modified(request: Request, etag: str) -> bool:
+    header = request.headers.get("If-None-Match")
+    return header is not None and etag in {tag.strip() for tag in header.split(",")}
+
+
+def _split_param(value: str | None) -> set[str] | None:
+    if not value:
+        return None
+    return {item.strip() for item in value.split(",") if item.strip()}
+
+
+def _tree_node(tree: SimTree, node_id: int) -> dict:
+    node = tree.nodes.get(int(node_id))
+    if node is None:
+        raise HTTPException(status_code=404, detail="Node not found")
+    return node
+
+
+def _events_etag(tree: SimTree, node_id: int, since: int, limit: int | None, types: str | None) -> str:
+    # Entries are append-only, so the count identifies the content
+    total = len(_tree_node(tree, node_id).get("logs", []))
+    return f'W/"{tree.graph_epoch}-{int(node_id)}-{total}-{max(0, int(since))}-{limit}-{types or ""}"'
+
+
+def _events_page(
+    tree: SimTree, node_id: int, since: int, limit: int | None, types: str | None
+) -> tuple[list, int]:
+    """Entries from index ``since`` on and the ``since`` of the next page."""
+    logs = _tree_node(tree, node_id).get("logs", [])
+    total = len(logs)
+    start = max(0, int(since))
+    wanted = _split_param(types)
+    out: list = []
+    next_since = total
+    for index in range(start, total):
+        entry = logs[index]
+        if wanted is not None and entry.get("type") not in wanted:
+            continue
+        if limit is not None and len(out) >= max(1, int(limit)):
+            next_since = index
+            break
+        out.append(entry)
+    return out, max(start, next_since)
+
+
+def _state_etag(tree: SimTree, node_id: int, agents: str | None, tail: int | None) -> str:
+    node = _tree_node(tree, node_id)
+    # Agent state only changes while the node runs, which also appends to its logs
+    version = f"{tree.node_turns(int(node_id))}-{len(node.get('logs', []))}"
+    return f'W/"{tree.graph_epoch}-{int(node_id)}-{version}-{agents or ""}-{tail}"'
+
+
+def _state_view(tree: SimTree, node_id: int, agents: str | None, tail: int | None) -> dict:
+    _tree_node(tree, node_id)
+    simulator = tree.get_sim(int(node_id))
+    selected = _split_param(agents)
+    items = []
+    for name, agent in simulator.agents.items():
+        if selected is not None and name not in selected:
+            continue
+        memory = agent.short_memory.get_all()
+        if tail is not None:
+            memory = memory[len(memory) - max(0, int(tail)) :] if tail > 0 else []
+        items.append(
+            {
+                "name": name,
+                "role": agent.properties.get("role"),
+                "emotion": agent.emotion,
+                "plan_state": agent.plan_state,
+                "short_memory": memory,
+                "memory_size": len(agent.short_memory),
+            }
+        )
+    return {"turns": simulator.turns, "agents": items}
 
 
 @get("/{simulation_id:str}/tree/sim/{node_id:int}/events")
 async def simulation_tree_events(
-    request: Request, simulation_id: str, node_id: int
-) -> list:
+    request: Request,
+    simulation_id: str,
+    node_id: int,
+    since: int = 0,
+    limit: int | None = None,
+    types: str | None = None,
+) -> Response[list]:
+    """Node log entries from index ``since`` on, optionally filtered by type.
+
+    X-Next-Since is the index to pass as ``since`` for the next page. Entries
+    are append-only, so the ETag only changes when the node logs something.
+    """
     token = extract_bearer_token(request)
     async with get_session() as session:
         current_user = await resolve_current_user(session, token)
         _, record = await _get_simulation_and_tree(
             session, current_user.id, simulation_id
         )
-        node = record.tree.nodes.get(int(node_id))
-        assert node is not None
-        return node.get("logs", [])
+        etag = _events_etag(record.tree, node_id, since, limit, types)
+        if _not_modified(request, etag):
+            return Response(content=None, status_code=304, headers={"ETag": etag})
+        out, next_since = _events_page(record.tree, node_id, since, limit, types)
+        return await json_response_async(
+            out, len(out), headers={"ETag": etag, "X-Next-Since": str(next_since)}
+        )
 
 
 @get("/{simulation_id:str}/tree/sim/{node_id:int}/state")
 async def simulation_tree_state(
-    request: Request, simulation_id: str, node_id: int
-) -> dict:
+    request: Request,
+    simulation_id: str,
+    node_id: int,
+    agents: str | None = None,
+    tail: int | None = None,
+) -> Response[dict]:
+    """Node turn count and agent state; ``agents`` selects names, ``tail`` keeps the last N memory entries."""
     token = extract_bearer_token(request)
     async with get_session() as session:
         current_user = await resolve_current_user(session, token)
         _, record = await _get_simulation_and_tree(
             session, current_user.id, simulation_id
         )
-        node = record.tree.nodes.get(int(node_id))
-        assert node is not None
-        simulator = node["sim"]
-        agents = []
-        for name, agent in simulator.agents.items():
-            agents.append(
-                {
-                    "name": name,
-                    "role": agent.properties.get("role"),
-                    "emotion": agent.emotion,
-                    "plan_state": agent.plan_state,
-                    "short_memory": agent.short_memory.get_all(),
-                }
-            )
-        return {"turns": simulator.turns, "agents": agents}
+        etag = _state_etag(record.tree, node_id, agents, tail)
+        if _not_modified(request, etag):
+            return Response(content=None, status_code=304, headers={"ETag": etag})
+        return json_response(_state_view(record.tree, node_id, agents, tail), headers={"ETag": etag})
+
+
+def _open_stream(socket: WebSocket) -> tuple[EventSubscriber, FrameEncoder] | None:
+    """Subscriber and framing from query params: policy, format, compress, batch."""
+    params = socket.query_params
+    try:
+        subscriber = EventSubscriber(
+            maxsize=settings.ws_queue_maxsize,
+            policy=params.get("policy") or settings.ws_queue_policy,
+        )
+        encoder = FrameEncoder(
+            fmt=params.get("format") or "json",
+            compress=params.get("compress") or "none",
+            batched=params.get("batch") in ("1", "true"),
+        )
+    except ValueError:
+        return None
+    return subscriber, encoder
+
+
+async def _pump_events(socket: WebSocket, subscriber: EventSubscriber, encoder: FrameEncoder) -> None:
+    mode = "binary" if encoder.binary else "text"
+    while True:
+        events = await subscriber.get_many()
+        if subscriber.overflowed:
+            # disconnect policy: tell the client what it missed, then drop it
+            events.append(subscriber.resync_hint())
+        for frame in encoder.encode(events):
+            await socket.send_data(frame, mode=mode)
+        if subscriber.overflowed:
+            log.warning("ws subscriber overflowed", dropped=subscriber.dropped)
+            await socket.close(code=1013)
+            return
 
 
 @websocket("/{simulation_id:str}/tree/events")
 async def simulation_tree_events_ws(socket: WebSocket, simulation_id: str) -> None:
-    print("incoming conn!!!!")
+    log.debug("tree ws connect", simulation=simulation_id)
     token = socket.query_params.get("token")
+    stream = _open_stream(socket)
+    if stream is None:
+        await socket.close(code=1008)
+        return
+    subscriber, encoder = stream
     async with get_session() as session:
         user = await _resolve_user_from_token(token or "", session)
         if user is None:
@@ -662,17 +874,15 @@ async def simulation_tree_events_ws(socket: WebSocket, simulation_id: str) -> No
             return
         sim = await _get_simulation_for_owner(session, user.id, simulation_id)
         record = await _get_tree_record(sim, session, user.id)
-    await socket.accept()
-    queue: asyncio.Queue = asyncio.Queue()
-    record.subs.append(queue)
-    print("sub added, record accepted")
+        # Subscribe before the next await: a subscribed tree is never evicted
+        record.subs.append(subscriber)
+    log.debug("tree ws subscribed", simulation=simulation_id, subscribers=len(record.subs))
     try:
-        while True:
-            event = await queue.get()
-            await socket.send_json(event)
+        await socket.accept()
+        await _pump_events(socket, subscriber, encoder)
     finally:
-        if queue in record.subs:
-            record.subs.remove(queue)
+        if subscriber in record.subs:
+            record.subs.remove(subscriber)
 
 
 @websocket("/{simulation_id:str}/tree/{node_id:int}/events")
@@ -681,8 +891,13 @@ async def simulation_tree_node_events_ws(
     simulation_id: str,
     node_id: int,
 ) -> None:
-    print("incoming conn!!!!")
+    log.debug("node ws connect", simulation=simulation_id, node=node_id)
     token = socket.query_params.get("token")
+    stream = _open_stream(socket)
+    if stream is None:
+        await socket.close(code=1008)
+        return
+    subscriber, encoder = stream
     async with get_session() as session:
         user = await _resolve_user_from_token(token or "", session)
         if user is None:
@@ -690,19 +905,17 @@ async def simulation_tree_node_events_ws(
             return
         sim = await _get_simulation_for_owner(session, user.id, simulation_id)
         record = await _get_tree_record(sim, session, user.id)
+        tree = record.tree
 
-        if int(node_id) not in record.tree.nodes:
+        if int(node_id) not in tree.nodes:
             await socket.close(code=1008)
             return
-    await socket.accept()
-    queue: asyncio.Queue = asyncio.Queue()
-    record.tree.add_node_sub(int(node_id), queue)
+        tree.add_node_sub(int(node_id), subscriber)
     try:
-        while True:
-            event = await queue.get()
-            await socket.send_json(event)
+        await socket.accept()
+        await _pump_events(socket, subscriber, encoder)
     finally:
-        record.tree.remove_node_sub(int(node_id), queue)
+        tree.remove_node_sub(int(node_id), subscriber)
 
 
 router = Router(
@@ -715,6 +928,7 @@ router = Router(
         delete_simulation,
         create_snapshot,
         list_snapshots,
+        read_snapshot,
         list_logs,
         start_simulation,
         resume_simulation,
@@ -723,6 +937,9 @@ router = Router(
         simulation_tree_advance_frontier,
         simulation_tree_advance_multi,
         simulation_tree_advance_chain,
+        list_jobs,
+        read_job,
+        cancel_job,
         simulation_tree_branch,
         simulation_tree_delete_subtree,
         simulation_tree_events,
@@ -26,6 +26,8 @@ class Settings(BaseSettings):
     jwt_algorithm: str = "HS256"
     access_token_exp_minutes: int = 15
     refresh_token_exp_minutes: int = 60 * 24 * 14
+    # Resolved users are cached in-process for this long (0 = always load from the DB)
+    user_cache_ttl_seconds: float = 30.0
 
     email_smtp_host: str | None = None
     email_smtp_port: int | None = None
@@ -41,6 +43,47 @@ class Settings(BaseSettings):
 
     allowed_origins: list[str] = []
     admin_emails: list[str] = []
+    # Admin dashboard aggregates are recomputed at most this often (0 = every request)
+    admin_stats_cache_seconds: float = 60.0
+
+    # Structured logging: level, quiet mode (warnings/errors only) and "text" | "json"
+    log_level: str = "INFO"
+    log_quiet: bool = False
+    log_format: str = "text"
+
+    # Prometheus-style /metrics endpoint at the server root; when a token is set,
+    # scrapers must send it as "Authorization: Bearer <token>"
+    metrics_enabled: bool = True
+    metrics_token: SecretStr | None = None
+
+    # Per-websocket event queue bound and overflow policy: drop_oldest | coalesce | disconnect
+    ws_queue_maxsize: int = 1000
+    ws_queue_policy: str = "drop_oldest"
+    # Worker-thread events are handed to the loop in batches: every N ms or at M events
+    ws_flush_interval_ms: int = 20
+    ws_flush_max_batch: int = 256
+
+    # In-memory tree budget; idle trees beyond it are dropped and reloaded from sim_tree_nodes (0 = no limit)
+    simtree_registry_max_trees: int = 64
+    simtree_registry_max_bytes: int = 0
+    # Node advances run in worker threads ("thread") or a process pool ("process");
+    # sim_executor_workers sizes the pool (0 = one per CPU)
+    sim_executor: str = "thread"
+    sim_executor_workers: int = 0
+    # Root snapshots kept per (scene, config) so new trees for the same configuration are clones (0 = off)
+    sim_template_cache_size: int = 128
+
+    # Idle interior tree nodes drop their live simulator for compressed bytes (warm),
+    # spilling to a file under simtree_cold_dir (cold) past the per-tree warm budget
+    simtree_tiers_enabled: bool = True
+    simtree_warm_budget_bytes: int = 32 * 1024 * 1024
+    simtree_cold_dir: str | None = None
+
+    # Node events are persisted to simulation_logs in batches by a background writer
+    log_writer_enabled: bool = True
+    log_writer_batch_size: int = 500
+    log_writer_flush_interval_ms: int = 500
+    log_writer_max_buffer: int = 50_000
 
     model_config = SettingsConfigDict(
         extra="ignore",
@@ -1,3 +1,4 @@
+import time
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
 
@@ -7,6 +8,8 @@ from sqlalchemy.ext.asyncio import (
     create_async_engine,
 )
 
+from socialsim4.core.metrics import REGISTRY
+
 from .config import get_settings
 
 
@@ -30,7 +33,19 @@ engine = create_async_engine(settings.database_url, **engine_kwargs)
 SessionLocal = async_sessionmaker(engine, expire_on_commit=False)
 
 
+DB_SESSION_SECONDS = REGISTRY.histogram(
+    "socialsim4_db_session_duration_seconds", "Time a database session stays open, in seconds."
+)
+DB_SESSIONS_ACTIVE = REGISTRY.gauge("socialsim4_db_sessions_active", "Database sessions currently open.")
+
+
 @asynccontextmanager
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
-    async with SessionLocal() as session:
-        yield session
+    start = time.perf_counter()
+    DB_SESSIONS_ACTIVE.inc()
+    try:
+        async with SessionLocal() as session:
+            yield session
+    finally:
+        DB_SESSIONS_ACTIVE.dec()
+        DB_SESSION_SECONDS.observe(time.perf_counter() - start)
@@ -8,10 +8,13 @@ from .core.database import get_session
 from .models.user import User
 from .schemas.user import UserPublic
 from .services.email import EmailSender
+from .services.user_cache import UserCache
 
 
 settings = get_settings()
 
+USER_CACHE = UserCache(settings.user_cache_ttl_seconds)
+
 
 def get_email_sender() -> EmailSender:
     return EmailSender(settings)
@@ -43,7 +46,15 @@ async def resolve_current_user(session: AsyncSession, token: str) -> UserPublic:
     if subject is None:
         raise HTTPException(status_code=401, detail="Invalid token subject")
 
-    user = await session.get(User, int(subject))
+    try:
+        user_id = int(subject)
+    except (TypeError, ValueError) as exc:
+        raise HTTPException(status_code=401, detail="Invalid token subject") from exc
+    cached = USER_CACHE.get(user_id)
+    if cached is not None:
+        return cached
+
+    user = await session.get(User, user_id)
     if user is None or not user.is_active:
         raise HTTPException(status_code=401, detail="Inactive user")
-    return UserPublic.model_validate(user)
+    return USER_CACHE.put(UserPublic.model_validate(user))
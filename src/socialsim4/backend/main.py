@@ -10,10 +10,17 @@ from litestar.openapi import OpenAPIConfig
 from litestar.response import File, Response
 from litestar.static_files import create_static_files_router
 
+from socialsim4.core.log import configure_logging, get_logger
+
 from .api.routes import router as api_router
+from .api.routes.metrics import read_metrics
 from .core.config import get_settings
 from .core.database import engine
 from .db.base import Base
+from .services.log_writer import LOG_WRITER
+from .services.node_executor import NODE_EXECUTOR
+
+log = get_logger("backend")
 
 
 async def _prepare_database() -> None:
@@ -31,6 +38,7 @@ def internal_error_handler(request: Request, exc: Exception) -> Response:
 
 def create_app() -> Litestar:
     settings = get_settings()
+    configure_logging(settings.log_level, quiet=settings.log_quiet, json_output=settings.log_format == "json")
 
     cors_config = None
     if settings.allowed_origins:
@@ -39,6 +47,7 @@ def create_app() -> Litestar:
             allow_credentials=True,
             allow_methods=["*"],
             allow_headers=["*"],
+            expose_headers=["ETag", "X-Next-Cursor", "X-Next-Since"],
         )
 
     root_dir = Path(__file__).resolve().parents[3]
@@ -82,11 +91,17 @@ def create_app() -> Litestar:
     def _log_routes(app: Litestar) -> None:
         for route in sorted(app.routes, key=lambda r: r.path):
             methods = route.methods or ["WS"]
-            print(f"[litestar] {sorted(methods)} {route.path}")
+            log.debug("route", methods=sorted(methods), path=route.path)
+
+    route_handlers: list = [base_router]
+    if settings.metrics_enabled:
+        # Served at the server root so scrapers do not depend on backend_root_path
+        route_handlers.append(read_metrics)
 
     app_kwargs: dict = {
-        "route_handlers": [base_router],
-        "on_startup": [_prepare_database, _log_routes],
+        "route_handlers": route_handlers,
+        "on_startup": [_prepare_database, _log_routes, LOG_WRITER.start],
+        "on_shutdown": [LOG_WRITER.stop, NODE_EXECUTOR.shutdown],
         "cors_config": cors_config,
         "debug": settings.debug,
         "openapi_config": OpenAPIConfig(title=settings.app_name, version="1.0.0"),
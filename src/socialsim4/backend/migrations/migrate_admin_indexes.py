@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+import asyncio
+
+from sqlalchemy import text
+
+from socialsim4.backend.core.database import engine
+
+INDEXES = {
+    "ix_users_created_at_id": "users (created_at, id)",
+    "ix_users_last_login_at": "users (last_login_at)",
+    "ix_simulations_created_at_id": "simulations (created_at, id)",
+    "ix_simulations_scene_type_id": "simulations (scene_type, id)",
+}
+
+
+async def migrate() -> list[str]:
+    """Create the composite indexes behind admin keyset pagination and stats on existing databases."""
+    async with engine.begin() as conn:
+        for name, target in INDEXES.items():
+            await conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {target}"))
+    return list(INDEXES)
+
+
+async def _main() -> None:
+    created = await migrate()
+    print(f"ensured index(es): {', '.join(created)}")
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import asyncio
+
+from sqlalchemy import inspect, text
+
+from socialsim4.backend.core.database import engine
+from socialsim4.backend.db.base import Base
+
+
+async def migrate() -> list[str]:
+    """Add the tree-local node_id/parent_node_id columns to sim_tree_nodes
+    and the tree_seq column to simulations.
+
+    The table predates per-node persistence and was never written to, so the
+    new columns are added nullable and the unique index is created directly.
+    """
+    import socialsim4.backend.models  # noqa: F401
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        columns = await conn.run_sync(lambda sync_conn: {c["name"] for c in inspect(sync_conn).get_columns("sim_tree_nodes")})
+        added: list[str] = []
+        for name in ("node_id", "parent_node_id"):
+            if name not in columns:
+                await conn.execute(text(f"ALTER TABLE sim_tree_nodes ADD COLUMN {name} INTEGER"))
+                added.append(name)
+        columns = await conn.run_sync(lambda sync_conn: {c["name"] for c in inspect(sync_conn).get_columns("simulations")})
+        if "tree_seq" not in columns:
+            await conn.execute(text("ALTER TABLE simulations ADD COLUMN tree_seq INTEGER NOT NULL DEFAULT 0"))
+            added.append("tree_seq")
+        await conn.execute(
+            text(
+                "CREATE UNIQUE INDEX IF NOT EXISTS uq_sim_tree_nodes_simulation_node "
+                "ON sim_tree_nodes (simulation_id, node_id)"
+            )
+        )
+    return added
+
+
+async def _main() -> None:
+    added = await migrate()
+    print(f"added column(s): {', '.join(added) or 'none'}")
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
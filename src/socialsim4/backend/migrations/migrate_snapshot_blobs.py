@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import asyncio
+
+from sqlalchemy import inspect, select, text
+
+from socialsim4.backend.core.database import engine, get_session
+from socialsim4.backend.models.simulation import SimulationSnapshot
+from socialsim4.core.node_tiers import pack
+
+
+async def migrate() -> int:
+    """Add simulation_snapshots.state_blob and move existing JSON states into it compressed.
+
+    Rows are converted one at a time so that large trees are never all in memory.
+    Returns the number of converted snapshots.
+    """
+    async with engine.begin() as conn:
+        columns = await conn.run_sync(
+            lambda sync_conn: {c["name"] for c in inspect(sync_conn).get_columns("simulation_snapshots")}
+        )
+        if "state_blob" not in columns:
+            blob_type = "BYTEA" if conn.dialect.name == "postgresql" else "BLOB"
+            await conn.execute(text(f"ALTER TABLE simulation_snapshots ADD COLUMN state_blob {blob_type}"))
+
+    async with get_session() as session:
+        result = await session.execute(
+            select(SimulationSnapshot.id).where(SimulationSnapshot.state_blob.is_(None))
+        )
+        ids = list(result.scalars().all())
+    converted = 0
+    for snapshot_id in ids:
+        async with get_session() as session:
+            snapshot = await session.get(SimulationSnapshot, snapshot_id)
+            if snapshot is None or not snapshot.state:
+                continue
+            snapshot.state_blob = await asyncio.to_thread(pack, snapshot.state)
+            snapshot.state = {}
+            await session.commit()
+            converted += 1
+    return converted
+
+
+async def _main() -> None:
+    converted = await migrate()
+    print(f"compressed {converted} snapshot(s)")
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
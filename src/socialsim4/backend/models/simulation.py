@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from sqlalchemy import ForeignKey, Integer, String, Text
+from sqlalchemy import ForeignKey, Index, Integer, LargeBinary, String, Text
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -11,6 +11,11 @@ from .user import User
 
 class Simulation(TimestampMixin, Base):
     __tablename__ = "simulations"
+    # Admin listing (keyset on created_at/scene_type, id) and stats bucketing
+    __table_args__ = (
+        Index("ix_simulations_created_at_id", "created_at", "id"),
+        Index("ix_simulations_scene_type_id", "scene_type", "id"),
+    )
 
     id: Mapped[str] = mapped_column(String(16), primary_key=True)
     owner_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id", ondelete="CASCADE"), index=True)
@@ -20,6 +25,8 @@ class Simulation(TimestampMixin, Base):
     agent_config: Mapped[dict] = mapped_column(JSONB, default=dict)
     latest_state: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
     status: Mapped[str] = mapped_column(String(32), default="draft")
+    # Next tree node id (SimTree.seq), so ids of deleted nodes are not handed out again
+    tree_seq: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
     notes: Mapped[str | None] = mapped_column(Text())
 
     owner: Mapped["User"] = relationship(back_populates="simulations")
@@ -42,7 +49,10 @@ class SimulationSnapshot(TimestampMixin, Base):
         String(16), ForeignKey("simulations.id", ondelete="CASCADE"), index=True
     )
     label: Mapped[str] = mapped_column(String(128))
-    state: Mapped[dict] = mapped_column(JSONB)
+    # Legacy rows keep the tree in ``state``; new rows leave it empty and store the
+    # tree zlib-compressed in ``state_blob``. Listings select neither column.
+    state: Mapped[dict] = mapped_column(JSONB, default=dict)
+    state_blob: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True)
     turns: Mapped[int] = mapped_column(Integer, default=0)
     meta: Mapped[dict] = mapped_column(JSONB, default=dict)
 
@@ -51,15 +61,19 @@ class SimulationSnapshot(TimestampMixin, Base):
 
 class SimTreeNode(TimestampMixin, Base):
     __tablename__ = "sim_tree_nodes"
+    __table_args__ = (Index("uq_sim_tree_nodes_simulation_node", "simulation_id", "node_id", unique=True),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     simulation_id: Mapped[str] = mapped_column(
         String(16), ForeignKey("simulations.id", ondelete="CASCADE"), index=True
     )
+    # Tree-local ids as used by SimTree and the /tree API
+    node_id: Mapped[int] = mapped_column(Integer)
+    parent_node_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
     parent_id: Mapped[int | None] = mapped_column(Integer, ForeignKey("sim_tree_nodes.id", ondelete="CASCADE"))
     depth: Mapped[int] = mapped_column(Integer)
     edge_type: Mapped[str] = mapped_column(String(32))
-    ops: Mapped[dict] = mapped_column(JSONB, default=dict)
+    ops: Mapped[list] = mapped_column(JSONB, default=list)
     state: Mapped[dict] = mapped_column(JSONB)
 
     simulation: Mapped[Simulation] = relationship(back_populates="tree_nodes")
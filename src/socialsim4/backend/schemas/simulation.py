@@ -42,7 +42,6 @@ class SnapshotBase(BaseModel):
     id: int
     label: str
     turns: int
-    state: dict
     created_at: datetime
 
     class Config:
@@ -50,6 +49,16 @@ class SnapshotBase(BaseModel):
         json_encoders = {datetime: lambda v: v.isoformat() if v else None}
 
 
+class SnapshotDetail(SnapshotBase):
+    """One snapshot's tree state; ``nodes`` is the requested page of the tree's nodes."""
+
+    root: int | None
+    seq: int
+    nodes: list[dict]
+    total_nodes: int
+    next_offset: int | None = None
+
+
 class SnapshotCreate(BaseModel):
     label: str | None = None
 
@@ -0,0 +1,97 @@
+"""Per-user cache of LLM and search clients.
+
+Building clients means two provider queries plus a new HTTP client (OpenAI)
+or a ``genai.configure`` call, so tree requests reuse the clients built for
+the user's current provider configuration. Each user has a version counter
+that the provider routes bump on every create/update/activate/delete; an
+entry is only served while its version is current, and clients built from a
+read that raced with an invalidation are never stored.
+"""
+
+from __future__ import annotations
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from socialsim4.core.llm import create_llm_client
+from socialsim4.core.llm_config import LLMConfig
+from socialsim4.core.metrics import REGISTRY
+from socialsim4.core.search_config import SearchConfig
+from socialsim4.core.tools.web.search import create_search_client
+
+from ..models.user import ProviderConfig, SearchProviderConfig
+
+CLIENT_CACHE_HITS = REGISTRY.counter("socialsim4_client_cache_hits_total", "Tree requests served with cached clients.")
+CLIENT_CACHE_MISSES = REGISTRY.counter("socialsim4_client_cache_misses_total", "Tree requests that built new clients.")
+
+
+async def build_user_clients(session: AsyncSession, user_id: int) -> dict:
+    result = await session.execute(select(ProviderConfig).where(ProviderConfig.user_id == user_id))
+    items = result.scalars().all()
+    active = [p for p in items if (p.config or {}).get("active")]
+    if len(active) != 1:
+        raise RuntimeError("Active LLM provider not selected")
+    provider = active[0]
+    dialect = (provider.provider or "").lower()
+    if dialect not in {"openai", "gemini", "mock"}:
+        raise RuntimeError("Invalid LLM provider dialect")
+    if dialect != "mock" and not provider.api_key:
+        raise RuntimeError("LLM API key required")
+    if not provider.model:
+        raise RuntimeError("LLM model required")
+
+    cfg = LLMConfig(
+        dialect=dialect,
+        api_key=provider.api_key or "",
+        model=provider.model,
+        base_url=provider.base_url,
+        temperature=0.7,
+        top_p=1.0,
+        frequency_penalty=0.0,
+        presence_penalty=0.0,
+        max_tokens=1024,
+    )
+    llm_client = create_llm_client(cfg)
+
+    result_s = await session.execute(select(SearchProviderConfig).where(SearchProviderConfig.user_id == user_id))
+    sprov = result_s.scalars().first()
+    if sprov is None:
+        s_cfg = SearchConfig(dialect="ddg", api_key="", base_url=None, params={})
+    else:
+        s_cfg = SearchConfig(
+            dialect=(sprov.provider or "ddg"),
+            api_key=sprov.api_key or "",
+            base_url=sprov.base_url,
+            params=sprov.config or {},
+        )
+    search_client = create_search_client(s_cfg)
+    return {"chat": llm_client, "default": llm_client, "search": search_client}
+
+
+class ClientCache:
+    def __init__(self) -> None:
+        self._versions: dict[int, int] = {}
+        self._entries: dict[int, tuple[int, dict]] = {}
+
+    def version(self, user_id: int) -> int:
+        return self._versions.get(user_id, 0)
+
+    def invalidate(self, user_id: int) -> None:
+        self._versions[user_id] = self.version(user_id) + 1
+        self._entries.pop(user_id, None)
+
+    async def get(self, session: AsyncSession, user_id: int) -> dict:
+        version = self.version(user_id)
+        entry = self._entries.get(user_id)
+        if entry is not None and entry[0] == version:
+            CLIENT_CACHE_HITS.inc()
+            return entry[1]
+        CLIENT_CACHE_MISSES.inc()
+        clients = await build_user_clients(session, user_id)
+        # Skip storing if the config changed while we were reading it
+        if self.version(user_id) == version:
+            self._entries[user_id] = (version, clients)
+        return clients
+
+
+CLIENT_CACHE = ClientCache()
@@ -0,0 +1,249 @@
+"""Bounded per-subscriber event queues for the tree websocket endpoints.
+
+Producers (the tree log handler and route-level lifecycle broadcasts) only
+ever call ``put_nowait`` on the event loop thread. When a subscriber falls
+behind, the configured policy decides what to give up:
+
+- ``drop_oldest``: discard the oldest queued event.
+- ``coalesce``: merge consecutive ``agent_ctx_delta`` entries for the same
+  node/agent/role (the same merge ShortTermMemory applies), falling back to
+  drop_oldest when nothing can be merged.
+- ``disconnect``: stop queueing and let the socket close with a resync hint.
+
+Dropped node events are summarized as ``{node: first missed seq}`` so the
+client can catch up through ``/tree/sim/{node}/events``.
+
+FrameEncoder turns drained events into websocket frames. Each event is
+encoded at most once per format, however many sockets it goes out on, and
+batches are built by concatenating the cached per-event encodings.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import struct
+import zlib
+from collections import OrderedDict, deque
+
+import msgspec
+
+from socialsim4.core.metrics import REGISTRY
+
+from ..api.responses import enc_hook
+
+POLICIES = ("drop_oldest", "coalesce", "disconnect")
+FORMATS = ("json", "msgpack")
+COMPRESSIONS = ("none", "deflate")
+
+EVENTS_DROPPED = REGISTRY.counter(
+    "socialsim4_ws_events_dropped_total", "Events dropped from slow websocket subscribers.", ["policy"]
+)
+EVENTS_COALESCED = REGISTRY.counter(
+    "socialsim4_ws_events_coalesced_total", "agent_ctx_delta events merged for slow subscribers."
+)
+FRAME_BYTES = REGISTRY.counter(
+    "socialsim4_ws_frame_bytes_total", "Websocket payload bytes sent for tree events.", ["format"]
+)
+
+
+def _mergeable(a: dict, b: dict) -> bool:
+    if a.get("type") != "agent_ctx_delta" or b.get("type") != "agent_ctx_delta":
+        return False
+    da = a.get("data") or {}
+    db = b.get("data") or {}
+    return a.get("node") == b.get("node") and da.get("agent") == db.get("agent") and da.get("role") == db.get("role")
+
+
+def _merge(a: dict, b: dict) -> dict:
+    data = dict(a.get("data") or {})
+    data["content"] = f"{data.get('content', '')}\n{(b.get('data') or {}).get('content', '')}"
+    merged = dict(a)
+    merged["data"] = data
+    return merged
+
+
+class EventSubscriber:
+    def __init__(self, maxsize: int = 1000, policy: str = "drop_oldest"):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown subscriber policy: {policy}")
+        self.maxsize = max(1, int(maxsize))
+        self.policy = policy
+        self._items: deque[dict] = deque()
+        self._ready = asyncio.Event()
+        self.overflowed = False
+        self.dropped = 0
+        self.coalesced = 0
+        # Lag not yet reported to the client: node -> first missed seq
+        self._missed: dict[int, int] = {}
+        self._missed_graph = False
+        self._pending_dropped = 0
+
+    def qsize(self) -> int:
+        return len(self._items)
+
+    def empty(self) -> bool:
+        return not self._items
+
+    def _record_missed(self, event: dict) -> None:
+        self.dropped += 1
+        self._pending_dropped += 1
+        EVENTS_DROPPED.inc(policy=self.policy)
+        node = event.get("node")
+        seq = event.get("seq")
+        if node is None or seq is None:
+            # Lifecycle event (attached/deleted/run_*): the client should refetch the graph
+            self._missed_graph = True
+            return
+        prev = self._missed.get(int(node))
+        if prev is None or int(seq) < prev:
+            self._missed[int(node)] = int(seq)
+
+    def _try_coalesce(self, event: dict) -> bool:
+        if self._items and _mergeable(self._items[-1], event):
+            self._items[-1] = _merge(self._items[-1], event)
+            self.coalesced += 1
+            EVENTS_COALESCED.inc()
+            return True
+        # Make room by merging the first adjacent mergeable pair already queued
+        items = self._items
+        for i in range(len(items) - 1):
+            if _mergeable(items[i], items[i + 1]):
+                items[i] = _merge(items[i], items[i + 1])
+                del items[i + 1]
+                self.coalesced += 1
+                EVENTS_COALESCED.inc()
+                items.append(event)
+                return True
+        return False
+
+    def put_nowait(self, event: dict) -> None:
+        if self.overflowed:
+            self._record_missed(event)
+            return
+        if len(self._items) < self.maxsize:
+            self._items.append(event)
+        elif self.policy == "disconnect":
+            self.overflowed = True
+            for queued in self._items:
+                self._record_missed(queued)
+            self._items.clear()
+            self._record_missed(event)
+        elif self.policy == "coalesce" and self._try_coalesce(event):
+            pass
+        else:
+            self._record_missed(self._items.popleft())
+            self._items.append(event)
+        self._ready.set()
+
+    def lag(self) -> dict:
+        """Unreported lag since the last delivered batch."""
+        return {
+            "dropped": self._pending_dropped,
+            "nodes": {str(k): v for k, v in sorted(self._missed.items())},
+            "graph": self._missed_graph,
+        }
+
+    def _take_lag_notice(self) -> dict | None:
+        if not self._pending_dropped:
+            return None
+        notice = {"type": "lag", "data": self.lag()}
+        self._missed = {}
+        self._missed_graph = False
+        self._pending_dropped = 0
+        return notice
+
+    async def get_many(self) -> list[dict]:
+        """Wait for and drain everything queued, prefixed by a lag notice if events were dropped."""
+        while not self._items and not self.overflowed:
+            self._ready.clear()
+            await self._ready.wait()
+        batch = list(self._items)
+        self._items.clear()
+        if not self.overflowed:
+            notice = self._take_lag_notice()
+            if notice is not None:
+                batch.insert(0, notice)
+        return batch
+
+    def resync_hint(self) -> dict:
+        return {"type": "resync", "data": self.lag()}
+
+
+_ENCODERS = {
+    "json": msgspec.json.Encoder(enc_hook=enc_hook),
+    "msgpack": msgspec.msgpack.Encoder(enc_hook=enc_hook),
+}
+
+
+class _EncodeCache:
+    """Small identity-keyed cache of encoded events.
+
+    The same event dict is queued to every subscriber, so keying on id() and
+    holding a reference to the event (which keeps the id from being reused)
+    is enough to share one encoding across sockets.
+    """
+
+    def __init__(self, capacity: int = 4096):
+        self.capacity = capacity
+        self._entries: OrderedDict[tuple[str, int], tuple[dict, bytes]] = OrderedDict()
+
+    def encode(self, event: dict, fmt: str) -> bytes:
+        key = (fmt, id(event))
+        hit = self._entries.get(key)
+        if hit is not None and hit[0] is event:
+            return hit[1]
+        data = _ENCODERS[fmt].encode(event)
+        self._entries[key] = (event, data)
+        if len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+        return data
+
+
+_CACHE = _EncodeCache()
+
+
+def _msgpack_array_header(n: int) -> bytes:
+    if n < 16:
+        return bytes((0x90 | n,))
+    if n < 1 << 16:
+        return b"\xdc" + struct.pack(">H", n)
+    return b"\xdd" + struct.pack(">I", n)
+
+
+class FrameEncoder:
+    """Per-connection framing: json text or msgpack binary, optional batching and deflate.
+
+    With ``compress="deflate"`` every frame is binary raw deflate (wbits -15)
+    from one compressor kept across frames and sync-flushed per frame, so a
+    client inflates the stream with one decompressor and repeated message
+    text is compressed against earlier frames.
+    """
+
+    def __init__(self, fmt: str = "json", compress: str = "none", batched: bool = False):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown frame format: {fmt}")
+        if compress not in COMPRESSIONS:
+            raise ValueError(f"Unknown frame compression: {compress}")
+        self.fmt = fmt
+        self.batched = batched
+        self._deflate = zlib.compressobj(6, zlib.DEFLATED, -15) if compress == "deflate" else None
+
+    @property
+    def binary(self) -> bool:
+        return self.fmt == "msgpack" or self._deflate is not None
+
+    def _join(self, parts: list[bytes]) -> bytes:
+        if self.fmt == "json":
+            return b"[" + b",".join(parts) + b"]"
+        return _msgpack_array_header(len(parts)) + b"".join(parts)
+
+    def encode(self, events: list[dict]) -> list[bytes]:
+        parts = [_CACHE.encode(event, self.fmt) for event in events]
+        if not parts:
+            return []
+        payloads = [self._join(parts)] if self.batched else parts
+        if self._deflate is not None:
+            payloads = [self._deflate.compress(p) + self._deflate.flush(zlib.Z_SYNC_FLUSH) for p in payloads]
+        for payload in payloads:
+            FRAME_BYTES.inc(len(payload), format=self.fmt)
+        return payloads
@@ -0,0 +1,169 @@
+"""Background jobs for long-running tree operations (advance frontier/multi/chain).
+
+An advance endpoint prepares the child nodes, submits a job and returns its id
+straight away. The job runs on the event loop as an asyncio task and drives
+the simulators in worker threads. Progress and status changes are pushed to
+the tree websocket subscribers as ``job_progress`` events, and cancelling a
+job sets a threading.Event that ``Simulator.run`` checks at every step
+boundary.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+import uuid
+from typing import Awaitable, Callable
+
+from socialsim4.core.log import get_logger
+from socialsim4.core.metrics import REGISTRY
+
+from .simtree_runtime import SimTreeRecord
+
+log = get_logger("backend.jobs")
+
+JOBS_TOTAL = REGISTRY.counter("socialsim4_jobs_total", "Tree jobs by kind and final status.", ["kind", "status"])
+JOBS_ACTIVE = REGISTRY.gauge("socialsim4_jobs_active", "Tree jobs queued or running.")
+
+FINISHED = ("succeeded", "failed", "cancelled")
+
+
+class Job:
+    def __init__(self, simulation_id: str, kind: str, record: SimTreeRecord, total_turns: int):
+        self.id = uuid.uuid4().hex[:12]
+        self.simulation_id = simulation_id
+        self.kind = kind
+        self.record = record
+        self.status = "queued"
+        self.total_turns = int(total_turns)
+        self.done_turns = 0
+        self.nodes: list[int] = []
+        self.result: dict | None = None
+        self.error: str | None = None
+        self.cancel_event = threading.Event()
+        self.created_at = time.time()
+        self.finished_at: float | None = None
+        self.task: asyncio.Task | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "simulation_id": self.simulation_id,
+            "kind": self.kind,
+            "status": self.status,
+            "done_turns": self.done_turns,
+            "total_turns": self.total_turns,
+            "nodes": list(self.nodes),
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+    def _notify(self, node: int | None = None) -> None:
+        data = {
+            "job": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "done_turns": self.done_turns,
+            "total_turns": self.total_turns,
+        }
+        if node is not None:
+            data["node"] = int(node)
+        event = {"type": "job_progress", "data": data}
+        # Node events of the turns counted here may still be buffered; send them first
+        self.record.tree.flush_events()
+        for queue in list(self.record.subs):
+            queue.put_nowait(event)
+
+    def turn_callback(self, node_id: int) -> Callable[[int], None]:
+        """Per-simulator on_turn hook; runs in the worker thread."""
+        loop = self._loop
+        last = [0]
+
+        def _on_turn(turns: int) -> None:
+            delta = turns - last[0]
+            last[0] = turns
+            if loop is not None:
+                loop.call_soon_threadsafe(self._advance, delta, node_id)
+
+        return _on_turn
+
+    def _advance(self, delta: int, node_id: int) -> None:
+        self.done_turns += delta
+        self._notify(node_id)
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+
+class JobManager:
+    def __init__(self, keep_finished: int = 200):
+        self.keep_finished = keep_finished
+        self._jobs: dict[str, Job] = {}
+
+    def submit(
+        self,
+        simulation_id: str,
+        kind: str,
+        record: SimTreeRecord,
+        total_turns: int,
+        body: Callable[[Job], Awaitable[dict]],
+    ) -> Job:
+        job = Job(simulation_id, kind, record, total_turns)
+        job._loop = asyncio.get_running_loop()
+        self._jobs[job.id] = job
+        record.active_jobs += 1
+        JOBS_ACTIVE.inc()
+        job.task = asyncio.create_task(self._run(job, body), name=f"job-{job.id}")
+        self._prune()
+        return job
+
+    async def _run(self, job: Job, body: Callable[[Job], Awaitable[dict]]) -> None:
+        job.status = "running"
+        job._notify()
+        try:
+            job.result = await body(job)
+            job.status = "cancelled" if job.cancelled else "succeeded"
+        except Exception as exc:
+            job.status = "failed"
+            job.error = str(exc)
+            log.exception("job failed", job=job.id, kind=job.kind, simulation=job.simulation_id)
+        finally:
+            job.record.active_jobs -= 1
+            job.finished_at = time.time()
+            JOBS_ACTIVE.dec()
+            JOBS_TOTAL.inc(kind=job.kind, status=job.status)
+            job._notify()
+
+    def get(self, simulation_id: str, job_id: str) -> Job | None:
+        job = self._jobs.get(job_id)
+        if job is None or job.simulation_id.upper() != simulation_id.upper():
+            return None
+        return job
+
+    def list(self, simulation_id: str) -> list[Job]:
+        key = simulation_id.upper()
+        return [job for job in self._jobs.values() if job.simulation_id.upper() == key]
+
+    def cancel(self, simulation_id: str, job_id: str) -> Job | None:
+        job = self.get(simulation_id, job_id)
+        if job is not None and job.status not in FINISHED:
+            job.cancel_event.set()
+        return job
+
+    def cancel_all(self, simulation_id: str) -> None:
+        for job in self.list(simulation_id):
+            if job.status not in FINISHED:
+                job.cancel_event.set()
+
+    def _prune(self) -> None:
+        finished = [job for job in self._jobs.values() if job.status in FINISHED]
+        for job in finished[: max(0, len(finished) - self.keep_finished)]:
+            del self._jobs[job.id]
+
+
+JOB_MANAGER = JobManager()
@@ -0,0 +1,235 @@
+"""Buffered, batched persistence of node events into ``simulation_logs``.
+
+Node log events reach the event loop through the tree's EventChannel; the
+runtime hands each one to ``LOG_WRITER.submit`` there, which only appends to
+an in-memory buffer. A background task drains the buffer every
+``log_writer_flush_interval_ms`` (or sooner once a batch is full) and writes
+rows with one executemany INSERT, which SQLAlchemy sends as multi-row
+``INSERT ... VALUES`` on both SQLite and Postgres.
+
+Sequence numbers are assigned at flush time, per simulation, continuing
+from ``max(sequence)`` already stored. ``tree_node_id`` is looked up at flush
+time too, from the ``sim_tree_nodes`` rows of the batch's nodes; events of a
+node that has no stored row yet keep it NULL (the node id is always in the
+payload). The buffer is bounded: events arriving
+while it is full are dropped and counted, and request handlers that start new
+runs can ``await wait_for_capacity()`` to hold off while the database catches
+up. Simulation threads never touch any of this.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+from socialsim4.core.log import get_logger
+from socialsim4.core.metrics import REGISTRY
+
+from ..core.config import get_settings
+from ..core.database import get_session
+from ..models.simulation import Simulation, SimTreeNode, SimulationLog
+
+log = get_logger("backend.log_writer")
+
+LOG_ROWS_WRITTEN = REGISTRY.counter("socialsim4_log_rows_written_total", "Simulation log rows inserted.")
+LOG_ROWS_DROPPED = REGISTRY.counter(
+    "socialsim4_log_rows_dropped_total", "Simulation log events dropped because the write buffer was full."
+)
+LOG_BUFFERED = REGISTRY.gauge("socialsim4_log_rows_buffered", "Simulation log events waiting to be written.")
+LOG_FLUSH_SECONDS = REGISTRY.histogram("socialsim4_log_flush_duration_seconds", "Time spent writing one log batch.")
+
+
+class SimulationLogWriter:
+    def __init__(
+        self,
+        max_buffer: int = 50_000,
+        batch_size: int = 500,
+        flush_interval: float = 0.5,
+        enabled: bool = True,
+    ):
+        self.max_buffer = max(1, int(max_buffer))
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval = float(flush_interval)
+        self.enabled = enabled
+        # (simulation_id, event) in arrival order; only touched on the loop thread
+        self._buffer: deque[tuple[str, dict]] = deque()
+        self._next_seq: dict[str, int] = {}
+        self._wake: asyncio.Event | None = None
+        self._drained: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+        self._flush_lock: asyncio.Lock | None = None
+        self.dropped = 0
+
+    # --- producer side (loop thread) ---------------------------------------
+    def submit(self, simulation_id: str, event: dict) -> bool:
+        if not self.enabled:
+            return False
+        if len(self._buffer) >= self.max_buffer:
+            self.dropped += 1
+            LOG_ROWS_DROPPED.inc()
+            return False
+        self._buffer.append((simulation_id, event))
+        LOG_BUFFERED.set(len(self._buffer))
+        if len(self._buffer) >= self.batch_size and self._wake is not None:
+            self._wake.set()
+        return True
+
+    def forget(self, simulation_id: str) -> None:
+        """Drop buffered events of a deleted simulation."""
+        self._buffer = deque(item for item in self._buffer if item[0] != simulation_id)
+        self._next_seq.pop(simulation_id, None)
+        LOG_BUFFERED.set(len(self._buffer))
+
+    def pending(self) -> int:
+        return len(self._buffer)
+
+    async def wait_for_capacity(self, timeout: float | None = 30.0) -> None:
+        """Backpressure: wait while the buffer is above 80% full."""
+        if len(self._buffer) < self.max_buffer * 0.8 or self._drained is None:
+            return
+        self._drained.clear()
+        if self._wake is not None:
+            self._wake.set()
+        try:
+            await asyncio.wait_for(self._drained.wait(), timeout)
+        except asyncio.TimeoutError:
+            log.warning("log writer still behind", buffered=len(self._buffer))
+
+    # --- lifecycle ---------------------------------------------------------
+    async def start(self) -> None:
+        if not self.enabled or self._task is not None:
+            return
+        self._wake = asyncio.Event()
+        self._drained = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task = asyncio.create_task(self._run(), name="simulation-log-writer")
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        while self._buffer:
+            if not await self.flush():
+                log.error("log writer dropped events on shutdown", buffered=len(self._buffer))
+                break
+
+    async def _run(self) -> None:
+        assert self._wake is not None
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            while self._buffer:
+                if not await self.flush():
+                    # Database unavailable: keep the buffer and retry on the next tick
+                    break
+
+    # --- consumer side -----------------------------------------------------
+    async def _seed_sequences(self, session, simulation_ids: set[str]) -> None:
+        missing = [sid for sid in simulation_ids if sid not in self._next_seq]
+        if not missing:
+            return
+        result = await session.execute(
+            select(SimulationLog.simulation_id, func.max(SimulationLog.sequence))
+            .where(SimulationLog.simulation_id.in_(missing))
+            .group_by(SimulationLog.simulation_id)
+        )
+        found = {sid: int(seq) for sid, seq in result.all()}
+        for sid in missing:
+            self._next_seq[sid] = found.get(sid, -1) + 1
+
+    async def _node_rows(self, session, batch: list[tuple[str, dict]]) -> dict[tuple[str, int], int]:
+        """Row ids in sim_tree_nodes of the (simulation, node) pairs in ``batch``."""
+        sims = {sid for sid, _ in batch}
+        nodes = {int(event["node"]) for _, event in batch if event.get("node") is not None}
+        if not nodes:
+            return {}
+        result = await session.execute(
+            select(SimTreeNode.simulation_id, SimTreeNode.node_id, SimTreeNode.id).where(
+                SimTreeNode.simulation_id.in_(sims), SimTreeNode.node_id.in_(nodes)
+            )
+        )
+        return {(sid, node_id): row_id for sid, node_id, row_id in result.all()}
+
+    def _rows(self, batch: list[tuple[str, dict]], node_rows: dict[tuple[str, int], int]) -> list[dict]:
+        rows = []
+        for sid, event in batch:
+            seq = self._next_seq[sid]
+            self._next_seq[sid] = seq + 1
+            node = event.get("node")
+            rows.append(
+                {
+                    "simulation_id": sid,
+                    "tree_node_id": node_rows.get((sid, int(node))) if node is not None else None,
+                    "sequence": seq,
+                    "event_type": str(event.get("type", "")),
+                    "payload": {"node": event.get("node"), "seq": event.get("seq"), "data": event.get("data")},
+                }
+            )
+        return rows
+
+    async def flush(self) -> bool:
+        """Write up to one batch. Returns False if the database write failed."""
+        if not self._buffer:
+            return True
+        lock = self._flush_lock or asyncio.Lock()
+        async with lock:
+            if not self._buffer:
+                return True
+            count = min(len(self._buffer), self.batch_size)
+            batch = [self._buffer.popleft() for _ in range(count)]
+            start = time.perf_counter()
+            try:
+                async with get_session() as session:
+                    await self._seed_sequences(session, {sid for sid, _ in batch})
+                    rows = self._rows(batch, await self._node_rows(session, batch))
+                    try:
+                        await session.execute(insert(SimulationLog), rows)
+                        await session.commit()
+                    except IntegrityError:
+                        # A simulation was deleted while its events were buffered
+                        await session.rollback()
+                        result = await session.execute(
+                            select(Simulation.id).where(Simulation.id.in_({r["simulation_id"] for r in rows}))
+                        )
+                        alive = set(result.scalars().all())
+                        rows = [r for r in rows if r["simulation_id"] in alive]
+                        if rows:
+                            await session.execute(insert(SimulationLog), rows)
+                            await session.commit()
+            except (SQLAlchemyError, OSError):
+                log.exception("log writer flush failed", rows=len(batch))
+                # Put the batch back in front; sequences get re-seeded from the table
+                self._buffer.extendleft(reversed(batch))
+                for sid in {sid for sid, _ in batch}:
+                    self._next_seq.pop(sid, None)
+                return False
+            LOG_FLUSH_SECONDS.observe(time.perf_counter() - start)
+            LOG_ROWS_WRITTEN.inc(len(rows))
+            LOG_BUFFERED.set(len(self._buffer))
+            if self._drained is not None and len(self._buffer) < self.max_buffer * 0.5:
+                self._drained.set()
+            return True
+
+
+def _from_settings() -> SimulationLogWriter:
+    settings = get_settings()
+    return SimulationLogWriter(
+        max_buffer=settings.log_writer_max_buffer,
+        batch_size=settings.log_writer_batch_size,
+        flush_interval=settings.log_writer_flush_interval_ms / 1000.0,
+        enabled=settings.log_writer_enabled,
+    )
+
+
+LOG_WRITER = _from_settings()
@@ -0,0 +1,103 @@
+"""Scrape-time runtime gauges for the backend (trees, nodes, subscribers, process)."""
+
+from __future__ import annotations
+
+import os
+import resource
+import sys
+import time
+
+from socialsim4.core.metrics import REGISTRY
+
+from .simtree_runtime import SIM_TREE_REGISTRY
+
+TREES = REGISTRY.gauge("socialsim4_simtrees", "Simulation trees held in the in-memory registry.")
+TREE_BYTES = REGISTRY.gauge("socialsim4_simtree_memory_bytes", "Approximate memory held by all trees, in bytes.")
+TREE_BYTES_MAX = REGISTRY.gauge("socialsim4_simtree_memory_bytes_max", "Approximate memory held by the largest tree, in bytes.")
+TREE_BYTES_BY_KIND = REGISTRY.gauge(
+    "socialsim4_simtree_memory_bytes_by_kind",
+    "Approximate bytes across all trees: agents, logs, scene, stored (warm) and cold (spill file).",
+    ["kind"],
+)
+SIMULATORS = REGISTRY.gauge("socialsim4_simulators_live", "Live Simulator objects across all trees.")
+NODES_BY_TIER = REGISTRY.gauge("socialsim4_simtree_nodes_by_tier", "Nodes across all trees by storage tier.", ["tier"])
+NODES_TOTAL = REGISTRY.gauge("socialsim4_simtree_nodes_total", "Nodes across all trees.")
+RUNNING_TOTAL = REGISTRY.gauge("socialsim4_simtree_running_nodes_total", "Running nodes across all trees.")
+WS_SUBSCRIBERS = REGISTRY.gauge("socialsim4_ws_subscribers", "Websocket subscribers by scope.", ["scope"])
+WS_QUEUE_DEPTH = REGISTRY.gauge("socialsim4_ws_queue_depth", "Pending events queued for websocket subscribers.", ["scope"])
+WS_QUEUE_DEPTH_MAX = REGISTRY.gauge("socialsim4_ws_queue_depth_max", "Largest single subscriber queue.", ["scope"])
+PROCESS_RSS = REGISTRY.gauge("process_resident_memory_bytes", "Resident memory size in bytes.")
+PROCESS_CPU = REGISTRY.counter("process_cpu_seconds_total", "Total user and system CPU time spent in seconds.")
+PROCESS_START = REGISTRY.gauge("process_start_time_seconds", "Start time of the process since unix epoch in seconds.")
+
+_STARTED_AT = time.time()
+
+
+def _qsize(queue) -> int:
+    size = getattr(queue, "qsize", None)
+    return int(size()) if callable(size) else 0
+
+
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as fh:
+            pages = int(fh.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        # ru_maxrss is the peak, in KiB on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def collect_runtime_metrics() -> None:
+    for gauge in (WS_SUBSCRIBERS, WS_QUEUE_DEPTH, WS_QUEUE_DEPTH_MAX):
+        gauge.clear()
+
+    records = SIM_TREE_REGISTRY.items()
+    nodes_total = 0
+    running_total = 0
+    simulators = 0
+    tiers = {"hot": 0, "warm": 0, "cold": 0}
+    kinds = {"agents": 0, "logs": 0, "scene": 0, "stored": 0, "cold": 0}
+    bytes_total = 0
+    bytes_max = 0
+    depth = {"tree": [], "node": []}
+    # Aggregates only: the endpoint is unauthenticated by default, so no simulation ids
+    for _key, record in records:
+        tree = record.tree
+        nodes = len(tree.nodes)
+        nodes_total += nodes
+        running_total += len(record.running)
+        simulators += sum(1 for n in tree.nodes.values() if n.get("sim") is not None)
+        for n in tree.nodes.values():
+            tiers[n.get("tier", "hot")] += 1
+        usage = tree.memory_usage()
+        bytes_total += usage["total"]
+        bytes_max = max(bytes_max, usage["total"])
+        for kind in kinds:
+            kinds[kind] += usage[kind]
+        depth["tree"].extend(_qsize(q) for q in list(record.subs))
+        depth["node"].extend(_qsize(q) for q in tree.node_subscribers())
+
+    TREES.set(len(records))
+    NODES_TOTAL.set(nodes_total)
+    RUNNING_TOTAL.set(running_total)
+    SIMULATORS.set(simulators)
+    TREE_BYTES.set(bytes_total)
+    TREE_BYTES_MAX.set(bytes_max)
+    for tier, count in tiers.items():
+        NODES_BY_TIER.set(count, tier=tier)
+    for kind, value in kinds.items():
+        TREE_BYTES_BY_KIND.set(value, kind=kind)
+    for scope, sizes in depth.items():
+        WS_SUBSCRIBERS.set(len(sizes), scope=scope)
+        WS_QUEUE_DEPTH.set(sum(sizes), scope=scope)
+        WS_QUEUE_DEPTH_MAX.set(max(sizes) if sizes else 0, scope=scope)
+
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    PROCESS_CPU.set_total(usage.ru_utime + usage.ru_stime)
+    PROCESS_RSS.set(_rss_bytes())
+    PROCESS_START.set(_STARTED_AT)
+
+
+REGISTRY.add_collector(collect_runtime_metrics)
@@ -0,0 +1,313 @@
+"""Where SimTree node advances run: worker threads or worker processes.
+
+``thread`` (the default) runs ``Simulator.run`` in ``asyncio.to_thread`` as
+before. ``process`` ships the node's encoded state (core.codec) and the
+configs of its LLM/search clients to a process pool. The worker rebuilds the
+simulator and its clients, runs the turns, and returns the final state, which
+replaces the node's simulator. Prompt building, parsing and scene logic then
+run outside the server's GIL.
+
+While a remote run is in progress its events and turn counts come back over
+one multiprocessing queue. A drain thread feeds them to the node's log
+handler, so node logs, websocket fan-out and job progress behave as with
+threads. Cancellation goes the other way through a shared byte per running
+task, which the worker's cancel flag reads at each step boundary. Workers
+send their pending events at every step boundary, and the drain thread
+copies the job's cancel event into the byte whenever a message arrives, so
+nothing polls.
+
+At most ``max_workers`` runs are in flight; further runs wait before their
+state is encoded.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable
+
+from socialsim4.core import codec
+from socialsim4.core.llm import LLMClient, create_llm_client
+from socialsim4.core.log import get_logger
+from socialsim4.core.metrics import REGISTRY
+from socialsim4.core.simtree import SimTree
+from socialsim4.core.simulator import Simulator
+from socialsim4.core.tools.web.search import SearchClient, create_search_client
+
+from ..core.config import get_settings
+
+log = get_logger("backend.executor")
+
+REMOTE_RUNS = REGISTRY.counter("socialsim4_remote_runs_total", "Node advances run in worker processes.", ["status"])
+
+# Events are sent back in batches of this size, or at the end of every turn
+_EVENT_BATCH = 64
+_CANCEL_SLOTS = 4096
+
+
+class ThreadNodeExecutor:
+    name = "thread"
+
+    async def run(
+        self,
+        tree: SimTree,
+        node_id: int,
+        turns: int,
+        cancel: threading.Event | None = None,
+        on_turn: Callable[[int], None] | None = None,
+    ) -> None:
+        simulator = tree.get_sim(node_id)
+        await asyncio.to_thread(simulator.run, max_turns=turns, cancel=cancel, on_turn=on_turn)
+
+    def shutdown(self) -> None:
+        pass
+
+
+def client_specs(clients: dict) -> dict:
+    """Picklable description of a clients dict; ValueError if a client cannot be rebuilt elsewhere."""
+    specs = {}
+    for key, client in clients.items():
+        if isinstance(client, LLMClient):
+            specs[key] = ("llm", client.provider)
+        elif isinstance(client, SearchClient) and hasattr(client, "config"):
+            specs[key] = ("search", client.config)
+        else:
+            raise ValueError(f"client {key!r} ({type(client).__name__}) cannot be rebuilt in a worker process")
+    return specs
+
+
+# --- worker process side ---------------------------------------------------
+
+_worker_queue = None
+_worker_flags = None
+_worker_clients: dict[bytes, dict] = {}
+
+
+def _init_worker(queue, flags) -> None:
+    global _worker_queue, _worker_flags
+    _worker_queue = queue
+    _worker_flags = flags
+
+
+class _SlotFlag:
+    """Event-like view of one shared cancel byte; checked at every step boundary."""
+
+    def __init__(self, flags, slot: int, on_check: Callable[[], None]):
+        self._flags = flags
+        self._slot = slot
+        self._on_check = on_check
+
+    def is_set(self) -> bool:
+        # Report the step so far; the server answers a cancel when it sees a message
+        self._on_check()
+        return bool(self._flags[self._slot])
+
+
+def _worker_clients_for(specs: dict) -> dict:
+    key = repr(sorted((k, kind, repr(cfg)) for k, (kind, cfg) in specs.items())).encode()
+    clients = _worker_clients.get(key)
+    if clients is None:
+        # The same LLMClient is shared across keys in the server ("chat"/"default"); keep that
+        built: dict[int, object] = {}
+        clients = {}
+        for name, (kind, cfg) in specs.items():
+            cid = id(cfg)
+            if cid not in built:
+                built[cid] = create_llm_client(cfg) if kind == "llm" else create_search_client(cfg)
+            clients[name] = built[cid]
+        _worker_clients[key] = clients
+    return clients
+
+
+def _run_remote(token: int, slot: int, state: bytes, specs: dict, turns: int) -> bytes:
+    queue = _worker_queue
+    pending: list = []
+
+    def _flush() -> None:
+        if pending:
+            queue.put((token, "events", list(pending)))
+            pending.clear()
+
+    def _emit(kind, data) -> None:
+        pending.append((kind, data))
+        if len(pending) >= _EVENT_BATCH:
+            _flush()
+
+    def _on_turn(done: int) -> None:
+        _flush()
+        queue.put((token, "turn", done))
+
+    try:
+        sim = Simulator.deserialize(codec.decode(state), _worker_clients_for(specs), log_handler=None)
+        sim.log_event = _emit
+        for agent in sim.agents.values():
+            agent.log_event = _emit
+        sim.run(max_turns=turns, cancel=_SlotFlag(_worker_flags, slot, _flush), on_turn=_on_turn)
+        return codec.encode(sim.serialize())
+    finally:
+        _flush()
+        queue.put((token, "done", None))
+
+
+# --- server side -------------------------------------------------------------
+
+
+class _RemoteTask:
+    def __init__(
+        self,
+        handler: Callable,
+        on_turn: Callable[[int], None] | None,
+        slot: int,
+        cancel: threading.Event | None,
+    ):
+        self.handler = handler
+        self.on_turn = on_turn
+        self.slot = slot
+        self.cancel = cancel
+        self.done = threading.Event()
+
+
+class ProcessNodeExecutor:
+    name = "process"
+
+    def __init__(self, max_workers: int = 0):
+        self.max_workers = min(max_workers or os.cpu_count() or 1, _CANCEL_SLOTS)
+        self._pool: ProcessPoolExecutor | None = None
+        self._queue = None
+        self._flags = None
+        self._drain: threading.Thread | None = None
+        self._tasks: dict[int, _RemoteTask] = {}
+        self._free_slots = list(range(_CANCEL_SLOTS))
+        self._tokens = itertools.count(1)
+        self._lock = threading.Lock()
+        # Held from before a run's state is encoded until its worker is done with
+        # the cancel slot, so there is always a free slot
+        self._limit = asyncio.Semaphore(self.max_workers)
+
+    def _ensure_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # spawn: forking a process that runs an event loop and worker threads is unsafe
+                ctx = multiprocessing.get_context("spawn")
+                self._queue = ctx.Queue()
+                self._flags = ctx.Array("b", _CANCEL_SLOTS, lock=False)
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=ctx,
+                    initializer=_init_worker,
+                    initargs=(self._queue, self._flags),
+                )
+                self._drain = threading.Thread(target=self._drain_loop, name="node-executor-drain", daemon=True)
+                self._drain.start()
+            return self._pool
+
+    def _drain_loop(self) -> None:
+        queue = self._queue
+        while True:
+            msg = queue.get()
+            if msg is None:
+                return
+            token, kind, payload = msg
+            task = self._tasks.get(token)
+            if task is None:
+                continue
+            if task.cancel is not None and task.cancel.is_set():
+                self._flags[task.slot] = 1
+            try:
+                if kind == "events":
+                    for event_kind, data in payload:
+                        task.handler(event_kind, data)
+                elif kind == "turn":
+                    if task.on_turn is not None:
+                        task.on_turn(payload)
+                elif kind == "done":
+                    task.done.set()
+            except Exception:
+                log.exception("dispatching remote node event failed", kind=kind)
+
+    async def run(
+        self,
+        tree: SimTree,
+        node_id: int,
+        turns: int,
+        cancel: threading.Event | None = None,
+        on_turn: Callable[[int], None] | None = None,
+    ) -> None:
+        try:
+            specs = client_specs(tree.clients)
+        except ValueError as exc:
+            log.warning("running node in a thread", node=node_id, reason=str(exc))
+            await ThreadNodeExecutor().run(tree, node_id, turns, cancel=cancel, on_turn=on_turn)
+            return
+
+        pool = self._ensure_pool()
+        loop = asyncio.get_running_loop()
+        await self._limit.acquire()
+        with self._lock:
+            slot = self._free_slots.pop()
+        self._flags[slot] = 1 if cancel is not None and cancel.is_set() else 0
+        token = next(self._tokens)
+        submitted = False
+        status = "failed"
+        try:
+            # Read the stored snapshot: a warm or cold node is not rebuilt just to ship it
+            state = await asyncio.to_thread(lambda: codec.encode(tree.snapshot(node_id)))
+            task = _RemoteTask(tree.log_handler(node_id), on_turn, slot, cancel)
+            self._tasks[token] = task
+            future = pool.submit(_run_remote, token, slot, state, specs, int(turns))
+            submitted = True
+            # The slot stays taken until the worker is done with it, even if we stop waiting
+            future.add_done_callback(lambda _f: self._release_from_pool(loop, slot))
+            try:
+                result = await asyncio.wrap_future(future)
+            except asyncio.CancelledError:
+                self._flags[slot] = 1
+                status = "cancelled"
+                raise
+            # The result can overtake the last queued events; wait for the worker's end marker
+            await asyncio.to_thread(task.done.wait, 10.0)
+            await asyncio.to_thread(tree.load_state, node_id, codec.decode(result))
+            status = "succeeded"
+        finally:
+            REMOTE_RUNS.inc(status=status)
+            self._tasks.pop(token, None)
+            if not submitted:
+                self._release(slot)
+
+    def _release(self, slot: int) -> None:
+        with self._lock:
+            self._free_slots.append(slot)
+        self._limit.release()
+
+    def _release_from_pool(self, loop: asyncio.AbstractEventLoop, slot: int) -> None:
+        try:
+            loop.call_soon_threadsafe(self._release, slot)
+        except RuntimeError:
+            # Loop already closed (shutdown); nothing waits for the slot any more
+            pass
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is None:
+            return
+        # Called on the loop at app shutdown: do not wait for runs still in a worker.
+        # Queued runs are cancelled; workers exit once their current run ends.
+        pool.shutdown(wait=False, cancel_futures=True)
+        self._queue.put(None)
+
+
+def create_node_executor(kind: str, max_workers: int = 0):
+    kind = (kind or "thread").lower()
+    if kind == "thread":
+        return ThreadNodeExecutor()
+    if kind == "process":
+        return ProcessNodeExecutor(max_workers)
+    raise ValueError(f"Unknown sim_executor: {kind}")
+
+
+NODE_EXECUTOR = create_node_executor(get_settings().sim_executor, get_settings().sim_executor_workers)
@@ -0,0 +1,70 @@
+"""Cache of ready root snapshots for simulation configurations.
+
+Building a root simulator parses the scene config (a whole ``GameMap`` for
+village scenes), deserializes every agent, builds the ordering and
+broadcasts the initial events. Trees for the same configuration (copied
+simulations, re-created drafts) start from an identical root, so the
+serialized root is kept here under a hash of the configuration and new trees
+are cloned from it. The simulation name is not part of the key; callers set
+it on the cloned scene. Trees that already have stored nodes are loaded from
+those and never reach this cache.
+
+Snapshots are stored as returned by ``Simulator.serialize`` and never
+mutated; ``Simulator.deserialize`` copies its input.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+from socialsim4.core.metrics import REGISTRY
+
+TEMPLATE_HITS = REGISTRY.counter("socialsim4_sim_template_hits_total", "Tree builds cloned from a cached root.")
+TEMPLATE_MISSES = REGISTRY.counter("socialsim4_sim_template_misses_total", "Tree builds that built the root.")
+
+
+def template_key(scene_type: str, scene_config: dict | None, agent_config: dict | None) -> str:
+    payload = json.dumps(
+        [scene_type, scene_config or {}, agent_config or {}],
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SimTemplateCache:
+    def __init__(self, max_entries: int = 128) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, dict] = OrderedDict()
+        # Trees are built in worker threads
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> dict | None:
+        with self._lock:
+            snap = self._entries.get(key)
+            if snap is None:
+                TEMPLATE_MISSES.inc()
+                return None
+            self._entries.move_to_end(key)
+        TEMPLATE_HITS.inc()
+        return snap
+
+    def put(self, key: str, snap: dict) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = snap
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
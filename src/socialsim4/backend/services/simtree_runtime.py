@@ -1,22 +1,91 @@
 from __future__ import annotations
 
 import asyncio
-from typing import Dict
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Iterator
 
 from socialsim4.core.agent import Agent
 from socialsim4.core.event import PublicEvent
-from socialsim4.core.ordering import ControlledOrdering, CycledOrdering, SequentialOrdering
+from socialsim4.core.log import get_logger
+from socialsim4.core.metrics import REGISTRY
+from socialsim4.core.ordering import ControlledOrdering, CycledOrdering, EventDrivenOrdering, SequentialOrdering
 from socialsim4.core.registry import ACTION_SPACE_MAP, SCENE_ACTIONS, SCENE_MAP
 from socialsim4.core.simtree import SimTree
 from socialsim4.core.simulator import Simulator
-from socialsim4.scenarios.basic import make_clients_from_env
+
+from ..core.config import get_settings
+from . import simtree_store
+from .log_writer import LOG_WRITER
+from .sim_templates import SimTemplateCache, template_key
+
+log = get_logger("backend.registry")
+
+SIM_TEMPLATES = SimTemplateCache(get_settings().sim_template_cache_size)
+
+REGISTRY_HITS = REGISTRY.counter("socialsim4_simtree_registry_hits_total", "Tree lookups served from memory.")
+REGISTRY_MISSES = REGISTRY.counter(
+    "socialsim4_simtree_registry_misses_total", "Tree lookups that built or reloaded a tree."
+)
+REGISTRY_EVICTIONS = REGISTRY.counter(
+    "socialsim4_simtree_registry_evictions_total", "Idle trees dropped from memory to meet the budget.", ["reason"]
+)
 
 
 class SimTreeRecord:
-    def __init__(self, tree: SimTree):
+    def __init__(self, tree: SimTree, simulation_id: str | None = None):
         self.tree = tree
-        self.subs: list[asyncio.Queue] = []
+        # Set for trees backed by a Simulation row; enables log persistence
+        self.simulation_id = simulation_id
+        # EventSubscriber instances (anything with put_nowait) fed on the loop thread
+        self.subs: list = []
         self.running: set[int] = set()
+        # Background jobs (advance frontier/multi/chain) currently working on this tree
+        self.active_jobs = 0
+        # Requests holding the record between lookup and handing it to a job;
+        # see SimTreeRegistry.lease
+        self.leases = 0
+
+
+def approx_tree_bytes(tree: SimTree) -> int:
+    """In-memory bytes of a tree from its incremental accounting (SimTree.memory_usage)."""
+    return tree.memory_usage()["total"]
+
+
+def wire_tree_events(record: SimTreeRecord, tree: SimTree) -> None:
+    """Attach the running loop to ``tree`` and forward node log events of running nodes to ``record.subs``.
+
+    Also applies the configured node storage tiers to the tree.
+    """
+    settings = get_settings()
+    tree.configure_tiers(
+        enabled=settings.simtree_tiers_enabled,
+        warm_budget_bytes=settings.simtree_warm_budget_bytes,
+        cold_dir=settings.simtree_cold_dir,
+    )
+    tree.attach_event_loop(
+        asyncio.get_running_loop(),
+        flush_interval=settings.ws_flush_interval_ms / 1000.0,
+        max_batch=settings.ws_flush_max_batch,
+    )
+
+    # Runs on the loop thread, once per event of each flushed batch
+    def _fanout(event: dict) -> None:
+        if record.simulation_id is not None:
+            LOG_WRITER.submit(record.simulation_id, event)
+        if int(event.get("node", -1)) not in record.running:
+            return
+        for q in list(record.subs):
+            q.put_nowait(event)
+
+    tree.set_tree_broadcast(_fanout)
+
+
+def _env_clients() -> dict:
+    # scenarios.basic imports every scene module; only pay for it when needed
+    from socialsim4.scenarios.basic import make_clients_from_env
+
+    return make_clients_from_env()
 
 
 def _quiet_logger(event_type: str, data: dict) -> None:
@@ -27,7 +96,7 @@ def _build_tree_for_scene(scene_type: str, clients: dict | None = None) -> SimTr
     scene_cls = SCENE_MAP.get(scene_type)
     if scene_cls is None:
         raise ValueError(f"Unsupported scene type: {scene_type}")
-    active = clients or make_clients_from_env()
+    active = clients or _env_clients()
     scene = scene_cls("preview", "")
     agents = [
         # minimal placeholder agent; real agents come from agent_config at runtime
@@ -93,9 +162,30 @@ def _build_tree_for_sim(sim_record, clients: dict | None = None) -> SimTree:
     scene_cls = SCENE_MAP.get(scene_type)
     if scene_cls is None:
         raise ValueError(f"Unsupported scene type: {scene_type}")
+    active = clients or _env_clients()
 
     cfg = getattr(sim_record, "scene_config", {}) or {}
     name = getattr(sim_record, "name", scene_type)
+    key = None
+    # An unseeded landlord deck is shuffled per build, so those roots are not shared
+    if not (scene_type == "landlord_scene" and cfg.get("seed") is None):
+        key = template_key(scene_type, cfg, getattr(sim_record, "agent_config", {}))
+        snap = SIM_TEMPLATES.get(key)
+        if snap is not None:
+            tree = SimTree.from_snapshot(snap, active)
+            # Copies share the template but keep their own name
+            tree.get_sim(tree.root).scene.name = name
+            return tree
+    snap = _build_root_sim(sim_record, scene_cls, active).serialize()
+    if key is not None:
+        SIM_TEMPLATES.put(key, snap)
+    return SimTree.from_snapshot(snap, active)
+
+
+def _build_root_sim(sim_record, scene_cls, clients: dict) -> Simulator:
+    scene_type = sim_record.scene_type
+    cfg = getattr(sim_record, "scene_config", {}) or {}
+    name = getattr(sim_record, "name", scene_type)
 
 
     # Build scene via constructor based on type
@@ -205,11 +295,13 @@ def _build_tree_for_sim(sim_record, clients: dict | None = None) -> SimTree:
         seers = [n for n in names if roles.get(n) == "seer"]
         seq = wolves + wolves + seers + witches + names + names + ["Moderator"]
         ordering = CycledOrdering(seq)
+    elif cfg.get("ordering") == EventDrivenOrdering.NAME:
+        ordering = EventDrivenOrdering(max_idle=cfg.get("max_idle_turns"))
 
     sim = Simulator(
         built_agents,
         scene,
-        clients or make_clients_from_env(),
+        clients,
         event_handler=_quiet_logger,
         ordering=ordering,
         max_steps_per_turn=3 if scene_type == "landlord_scene" else 5,
@@ -224,69 +316,132 @@ def _build_tree_for_sim(sim_record, clients: dict | None = None) -> SimTree:
         draft = str(cfg.get("draft_text") or "").strip()
         if draft:
             sim.broadcast(PublicEvent(f"The chamber will now consider the following draft for debate and vote:\n{draft}"))
-    return SimTree.new(sim, sim.clients)
+    return sim
 
 
 class SimTreeRegistry:
-    def __init__(self) -> None:
-        self._records: Dict[str, SimTreeRecord] = {}
+    """In-memory trees keyed by simulation id, bounded by tree count and approximate bytes.
+
+    Records are kept in LRU order. When a budget is exceeded, the least
+    recently used idle trees (no running nodes, jobs, subscribers or leases)
+    are dropped.
+    Only trees backed by a Simulation row are evicted: their nodes are written
+    through to sim_tree_nodes as they change, so the next request reloads them
+    via get_or_create_from_sim. A budget of 0 disables that limit.
+    """
+
+    def __init__(self, max_trees: int = 0, max_bytes: int = 0) -> None:
+        self._records: OrderedDict[str, SimTreeRecord] = OrderedDict()
         self._lock = asyncio.Lock()
+        self.max_trees = max_trees
+        self.max_bytes = max_bytes
+
+    def _hit(self, key: str) -> SimTreeRecord | None:
+        record = self._records.get(key)
+        if record is not None:
+            self._records.move_to_end(key)
+            REGISTRY_HITS.inc()
+        return record
 
     async def get_or_create(self, simulation_id: str, scene_type: str, clients: dict | None = None) -> SimTreeRecord:
         key = simulation_id.upper()
-        record = self._records.get(key)
+        record = self._hit(key)
         if record is not None:
             return record
         async with self._lock:
-            record = self._records.get(key)
+            record = self._hit(key)
             if record is not None:
                 return record
+            REGISTRY_MISSES.inc()
             tree = await asyncio.to_thread(_build_tree_for_scene, scene_type, clients)
             record = SimTreeRecord(tree)
-            # Wire event loop for thread-safe fanout
-            loop = asyncio.get_running_loop()
-            tree.attach_event_loop(loop)
-
-            # Forward all node log events to tree-level subscribers (only for running nodes)
-            def _fanout(event: dict) -> None:
-                if int(event.get("node", -1)) not in record.running:
-                    return
-                for q in list(record.subs):
-                    loop.call_soon_threadsafe(q.put_nowait, event)
-
-            tree.set_tree_broadcast(_fanout)
+            wire_tree_events(record, tree)
             self._records[key] = record
+            self._enforce_budget(keep=key)
             return record
 
     async def get_or_create_from_sim(self, sim_record, clients: dict | None = None) -> SimTreeRecord:
         key = sim_record.id.upper()
-        record = self._records.get(key)
+        record = self._hit(key)
         if record is not None:
             return record
         async with self._lock:
-            record = self._records.get(key)
+            record = self._hit(key)
             if record is not None:
                 return record
-            tree = await asyncio.to_thread(_build_tree_for_sim, sim_record, clients)
-            record = SimTreeRecord(tree)
-            loop = asyncio.get_running_loop()
-            tree.attach_event_loop(loop)
-
-            def _fanout(event: dict) -> None:
-                if int(event.get("node", -1)) not in record.running:
-                    return
-                for q in list(record.subs):
-                    loop.call_soon_threadsafe(q.put_nowait, event)
-
-            tree.set_tree_broadcast(_fanout)
+            REGISTRY_MISSES.inc()
+            # Rehydrate from persisted nodes when available, else start a fresh tree
+            tree = await simtree_store.load_tree(sim_record.id, clients or _env_clients())
+            if tree is None:
+                tree = await asyncio.to_thread(_build_tree_for_sim, sim_record, clients)
+                await simtree_store.save_nodes(sim_record.id, tree, [tree.root])
+            record = SimTreeRecord(tree, simulation_id=sim_record.id)
+            wire_tree_events(record, tree)
             self._records[key] = record
+            self._enforce_budget(keep=key)
             return record
 
+    @staticmethod
+    @contextmanager
+    def lease(record: SimTreeRecord) -> Iterator[SimTreeRecord]:
+        """Keep ``record`` from being evicted while the block runs.
+
+        Take it right after the lookup, before the next await; jobs keep the
+        record through ``active_jobs`` once submitted.
+        """
+        record.leases += 1
+        try:
+            yield record
+        finally:
+            record.leases -= 1
+
+    @staticmethod
+    def _evictable(record: SimTreeRecord) -> bool:
+        return (
+            record.simulation_id is not None
+            and not record.leases
+            and not record.running
+            and not record.active_jobs
+            and not record.subs
+            and not record.tree.has_subscribers()
+        )
+
+    def _enforce_budget(self, keep: str) -> None:
+        if self.max_trees > 0:
+            for key in [k for k, r in self._records.items() if k != keep and self._evictable(r)]:
+                if len(self._records) <= self.max_trees:
+                    break
+                self._evict(key, "count")
+        if self.max_bytes > 0:
+            sizes = {k: approx_tree_bytes(r.tree) for k, r in self._records.items()}
+            total = sum(sizes.values())
+            for key in [k for k, r in self._records.items() if k != keep and self._evictable(r)]:
+                if total <= self.max_bytes:
+                    break
+                total -= sizes[key]
+                self._evict(key, "bytes")
+
+    def _evict(self, key: str, reason: str) -> None:
+        record = self._records.pop(key)
+        # Deliver anything still buffered (goes to the log writer) before dropping the tree
+        record.tree.flush_events()
+        record.tree.close()
+        REGISTRY_EVICTIONS.inc(reason=reason)
+        log.info("tree evicted", simulation=key, reason=reason, nodes=len(record.tree.nodes))
+
     def remove(self, simulation_id: str) -> None:
-        self._records.pop(simulation_id.upper(), None)
+        record = self._records.pop(simulation_id.upper(), None)
+        if record is not None:
+            record.tree.close()
 
     def get(self, simulation_id: str) -> SimTreeRecord | None:
-        return self._records.get(simulation_id.upper())
+        return self._hit(simulation_id.upper())
+
+    def items(self) -> list[tuple[str, SimTreeRecord]]:
+        return list(self._records.items())
 
 
-SIM_TREE_REGISTRY = SimTreeRegistry()
+SIM_TREE_REGISTRY = SimTreeRegistry(
+    max_trees=get_settings().simtree_registry_max_trees,
+    max_bytes=get_settings().simtree_registry_max_bytes,
+)
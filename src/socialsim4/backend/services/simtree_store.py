@@ -0,0 +1,149 @@
+"""Per-node persistence of simulation trees in ``sim_tree_nodes``.
+
+Every node is stored as its own row keyed by (simulation_id, node_id), so
+attaching a node or finishing a run only writes the nodes involved. A row's
+``state`` holds the serialized simulator plus the node's *own* log entries;
+inherited entries are rebuilt from the parent chain on load, which keeps each
+row proportional to what the node itself produced. Rows link to their
+parent's row through ``parent_id``, and the tree's next node id is kept in
+``simulations.tree_seq`` so ids of deleted nodes are not reused after a reload.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Iterable
+
+from sqlalchemy import delete, select, update
+
+from socialsim4.core.simtree import SimTree
+
+from ..core.database import get_session
+from ..models.simulation import Simulation, SimTreeNode
+
+
+def _node_state(tree: SimTree, nid: int) -> dict:
+    node = tree.nodes[nid]
+    own_logs = [entry for entry in node.get("logs", []) if entry.get("node") == nid]
+    return {
+        "node_id": int(nid),
+        "parent_node_id": node["parent"],
+        "depth": int(node["depth"] or 0),
+        "edge_type": node.get("edge_type") or "root",
+        "ops": list(node.get("ops") or []),
+        "state": {"sim": tree.snapshot(nid), "logs": own_logs},
+    }
+
+
+async def _write_rows(session, simulation_id: str, states: list[dict], existing: dict[int, SimTreeNode]) -> None:
+    """Add or update a row per state; ``existing`` maps node ids to stored rows (and parents)."""
+    written = []
+    for values in states:
+        row = existing.get(values["node_id"])
+        if row is None:
+            row = SimTreeNode(simulation_id=simulation_id, **values)
+            session.add(row)
+        else:
+            for key, value in values.items():
+                setattr(row, key, value)
+        written.append(row)
+    # New rows get their ids on flush; link children to parent rows afterwards
+    await session.flush()
+    rows = {**existing, **{row.node_id: row for row in written}}
+    for row in written:
+        parent = rows.get(row.parent_node_id)
+        row.parent_id = parent.id if parent is not None else None
+
+
+async def _store_seq(session, simulation_id: str, seq: int, replace: bool = False) -> None:
+    stmt = update(Simulation).where(Simulation.id == simulation_id).values(tree_seq=int(seq))
+    if not replace:
+        # Concurrent saves may finish out of order; never move the counter back
+        stmt = stmt.where(Simulation.tree_seq < int(seq))
+    await session.execute(stmt)
+
+
+async def save_nodes(simulation_id: str, tree: SimTree, node_ids: Iterable[int]) -> None:
+    """Insert or update the given nodes. Call only for nodes that are not running."""
+    ids = [int(n) for n in node_ids if int(n) in tree.nodes]
+    if not ids:
+        return
+    # Serializing simulators deep-copies agent state; keep it off the loop
+    states = await asyncio.to_thread(lambda: [_node_state(tree, nid) for nid in ids])
+    seq = tree.seq
+    parents = {values["parent_node_id"] for values in states if values["parent_node_id"] is not None}
+    async with get_session() as session:
+        result = await session.execute(
+            select(SimTreeNode).where(
+                SimTreeNode.simulation_id == simulation_id, SimTreeNode.node_id.in_(set(ids) | parents)
+            )
+        )
+        rows = {row.node_id: row for row in result.scalars().all()}
+        await _write_rows(session, simulation_id, states, rows)
+        await _store_seq(session, simulation_id, seq)
+        await session.commit()
+
+
+async def delete_nodes(simulation_id: str, node_ids: Iterable[int]) -> None:
+    ids = [int(n) for n in node_ids]
+    if not ids:
+        return
+    async with get_session() as session:
+        await session.execute(
+            delete(SimTreeNode).where(SimTreeNode.simulation_id == simulation_id, SimTreeNode.node_id.in_(ids))
+        )
+        await session.commit()
+
+
+async def replace_tree(simulation_id: str, tree: SimTree) -> None:
+    """Replace all stored nodes of a simulation with ``tree`` (e.g. on resume).
+
+    The delete and the inserts share one transaction, so a failure leaves the
+    previously stored tree in place.
+    """
+    ids = sorted(tree.nodes.keys())
+    states = await asyncio.to_thread(lambda: [_node_state(tree, nid) for nid in ids])
+    async with get_session() as session:
+        await session.execute(delete(SimTreeNode).where(SimTreeNode.simulation_id == simulation_id))
+        await _write_rows(session, simulation_id, states, {})
+        await _store_seq(session, simulation_id, tree.seq, replace=True)
+        await session.commit()
+
+
+async def load_tree(simulation_id: str, clients: dict) -> SimTree | None:
+    """Rebuild a tree from its stored nodes, or None if nothing was stored."""
+    async with get_session() as session:
+        result = await session.execute(
+            select(SimTreeNode).where(SimTreeNode.simulation_id == simulation_id).order_by(SimTreeNode.node_id)
+        )
+        rows = result.scalars().all()
+        stored_seq = await session.scalar(select(Simulation.tree_seq).where(Simulation.id == simulation_id))
+    if not rows:
+        return None
+
+    root = None
+    full_logs: dict[int, list] = {}
+    nodes: list[dict] = []
+    # Parents always have smaller ids than their children
+    for row in rows:
+        state = row.state or {}
+        parent = row.parent_node_id
+        if parent is None:
+            root = row.node_id
+        inherited = full_logs.get(parent, []) if parent is not None else []
+        logs = inherited + list(state.get("logs") or [])
+        full_logs[row.node_id] = logs
+        nodes.append(
+            {
+                "id": row.node_id,
+                "parent": parent,
+                "depth": row.depth,
+                "edge_type": row.edge_type,
+                "ops": row.ops or [],
+                "sim": state.get("sim") or {},
+                "logs": logs,
+            }
+        )
+    # Rows written before tree_seq existed only bound it by the largest id
+    data = {"root": root, "seq": max(int(stored_seq or 0), rows[-1].node_id + 1), "nodes": nodes}
+    return await asyncio.to_thread(SimTree.deserialize, data, clients)
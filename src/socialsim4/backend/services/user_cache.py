@@ -0,0 +1,51 @@
+"""Short-lived cache of authenticated users keyed by token subject.
+
+Every API call resolves its bearer token to a user; polling endpoints do so
+several times a second. Active users are kept here for a few seconds so that
+resolution is a JWT decode plus a dict lookup. Routes that change what a
+cached record says (role, activation, verification, login, logout) call
+``invalidate``; anything else is picked up once the entry expires.
+"""
+
+from __future__ import annotations
+
+import time
+
+from socialsim4.core.metrics import REGISTRY
+
+from ..schemas.user import UserPublic
+
+USER_CACHE_HITS = REGISTRY.counter("socialsim4_user_cache_hits_total", "Token resolutions served from the user cache.")
+USER_CACHE_MISSES = REGISTRY.counter("socialsim4_user_cache_misses_total", "Token resolutions that loaded the user.")
+
+
+class UserCache:
+    def __init__(self, ttl_seconds: float = 30.0, max_entries: int = 10_000) -> None:
+        self.ttl = float(ttl_seconds)
+        self.max_entries = max_entries
+        self._entries: dict[int, tuple[float, UserPublic]] = {}
+
+    def get(self, user_id: int) -> UserPublic | None:
+        entry = self._entries.get(user_id)
+        if entry is None or entry[0] < time.monotonic():
+            USER_CACHE_MISSES.inc()
+            return None
+        USER_CACHE_HITS.inc()
+        return entry[1]
+
+    def put(self, user: UserPublic) -> UserPublic:
+        if self.ttl <= 0:
+            return user
+        now = time.monotonic()
+        if len(self._entries) >= self.max_entries:
+            self._entries = {k: v for k, v in self._entries.items() if v[0] >= now}
+            if len(self._entries) >= self.max_entries:
+                self._entries.clear()
+        self._entries[user.id] = (now + self.ttl, user)
+        return user
+
+    def invalidate(self, user_id: int) -> None:
+        self._entries.pop(int(user_id), None)
+
+    def clear(self) -> None:
+        self._entries.clear()
@@ -8,6 +8,7 @@ from typing import Iterable
 
 from socialsim4.core.llm import create_llm_client
 from socialsim4.core.llm_config import LLMConfig
+from socialsim4.core.log import configure_logging
 from socialsim4.scenarios import SCENES, console_logger
 
 
@@ -84,6 +85,9 @@ def run_scenario(args: argparse.Namespace) -> None:
 
 def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(prog="socialsim4", description="SocialSim4 command-line interface")
+    parser.add_argument("--log-level", help="Engine log level (default: SOCIALSIM4_LOG_LEVEL or INFO)")
+    parser.add_argument("--quiet", action="store_true", help="Only log warnings and errors")
+    parser.add_argument("--log-json", action="store_true", help="Emit one JSON object per log line")
     subparsers = parser.add_subparsers(dest="command")
 
     serve_parser = subparsers.add_parser("serve", help="Start the FastAPI backend server")
@@ -111,6 +115,7 @@ def build_parser() -> argparse.ArgumentParser:
 def main(argv: Iterable[str] | None = None) -> int:
     parser = build_parser()
     args = parser.parse_args(list(argv) if argv is not None else None)
+    configure_logging(args.log_level, quiet=args.quiet or None, json_output=args.log_json or None)
 
     if args.command == "serve":
         serve_backend(args.host, args.port, args.reload)
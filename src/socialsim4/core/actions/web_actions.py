@@ -1,10 +1,11 @@
 import re
 
-import httpx
-
 from socialsim4.core.action import Action
+from socialsim4.core.log import get_logger
 from socialsim4.core.tools.web import view_page as tool_view_page
 
+log = get_logger("actions.web")
+
 
 class WebSearchAction(Action):
     NAME = "web_search"
@@ -14,8 +15,8 @@ class WebSearchAction(Action):
 """
 
     def handle(self, action_data, agent, simulator, scene):
-        print(f"{agent.name} Searching {action_data}")
         query = action_data["query"]
+        log.debug("web search", agent=agent.name, query=query)
         max_results = int((action_data or {}).get("max_results", 5))
         max_results = max(1, min(10, max_results))
 
@@ -58,6 +59,8 @@ class ViewPageAction(Action):
         max_chars = int((action_data or {}).get("max_chars", 4000))
         max_chars = max(500, min(20000, max_chars))
 
+        import httpx
+
         try:
             data = tool_view_page(url, max_chars)
         except httpx.HTTPError as e:
@@ -1,10 +1,13 @@
-import json
 import re
 import xml.etree.ElementTree as ET
 
+from socialsim4.core import codec
 from socialsim4.core.config import MAX_REPEAT
+from socialsim4.core.log import get_logger
 from socialsim4.core.memory import ShortTermMemory
 
+log = get_logger("agent")
+
 # 假设的最大上下文字符长度（可调整，根据模型实际上下文窗口）
 MAX_CONTEXT_CHARS = 100000000
 SUMMARY_THRESHOLD = int(MAX_CONTEXT_CHARS * 0.7)  # 70% 阈值
@@ -36,6 +39,8 @@ class Agent:
         self.max_repeat = max_repeat
         self.properties = kwargs
         self.log_event = event_handler
+        # Set by the Simulator so its ordering can see which agents have new input
+        self.on_feedback = None
         self.emotion = kwargs.get("emotion", "neutral")
         self.emotion_enabled = bool(kwargs.get("emotion_enabled", False))
 
@@ -244,7 +249,7 @@ History:
         # 替换personal_history：用总结作为新的user消息起点
         self.short_memory.clear()
         self.short_memory.append("user", f"Summary: {summary}")
-        print(f"{self.name} summarized history.")
+        log.info("summarized history", agent=self.name)
 
     def _parse_full_response(self, full_response):
         """Extracts thoughts, plan, action block, and optional plan update from the response."""
@@ -501,10 +506,9 @@ History:
             except Exception as e:
                 last_exc = e
                 if i < attempts - 1:
-                    print(f"{self.name} action parse error: {e}; retry {i + 1}/{attempts - 1}...")
+                    log.warning("action parse error, retrying", agent=self.name, error=str(e), retry=f"{i + 1}/{attempts - 1}")
                     continue
-                print(f"{self.name} action parse error after {attempts} attempts: {e}")
-                print(f"LLM output (last):\n{llm_output}\n{'-' * 40}")
+                log.error("action parse failed", agent=self.name, attempts=attempts, error=str(e), llm_output=llm_output)
                 raise e
         if plan_update:
             self._apply_plan_update(plan_update)
@@ -532,6 +536,8 @@ History:
                 "agent_ctx_delta",
                 {"agent": self.name, "role": "user", "content": content},
             )
+        if self.on_feedback:
+            self.on_feedback(self.name)
 
     def append_env_message(self, content):
         """Deprecated: use add_env_feedback(). Kept for compatibility."""
@@ -540,8 +546,8 @@ History:
     def serialize(self):
         # Deep-copy dict/list fields to avoid sharing across snapshots
         mem = [{"role": m.get("role"), "content": m.get("content")} for m in self.short_memory.get_all()]
-        props = json.loads(json.dumps(self.properties))
-        plan = json.loads(json.dumps(self.plan_state))
+        props = codec.clone(self.properties)
+        plan = codec.clone(self.plan_state)
         return {
             "name": self.name,
             "user_profile": self.user_profile,
@@ -563,7 +569,7 @@ History:
     def deserialize(cls, data, event_handler=None):
         from .registry import ACTION_SPACE_MAP
 
-        props = json.loads(json.dumps(data.get("properties", {})))
+        props = codec.clone(data.get("properties", {}))
         agent = cls(
             name=data["name"],
             user_profile=data["user_profile"],
@@ -581,19 +587,17 @@ History:
             agent.emotion_enabled = data["emotion_enabled"]
         else:
             agent.emotion_enabled = props["emotion_enabled"]
-        agent.short_memory.history = json.loads(json.dumps(data.get("short_memory", [])))
+        agent.short_memory.history = codec.clone(data.get("short_memory", []))
         agent.last_history_length = data.get("last_history_length", 0)
-        agent.plan_state = json.loads(
-            json.dumps(
-                data.get(
-                    "plan_state",
-                    {
-                        "goals": [],
-                        "milestones": [],
-                        "strategy": "",
-                        "notes": "",
-                    },
-                )
+        agent.plan_state = codec.clone(
+            data.get(
+                "plan_state",
+                {
+                    "goals": [],
+                    "milestones": [],
+                    "strategy": "",
+                    "notes": "",
+                },
             )
         )
         return agent
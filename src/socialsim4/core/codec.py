@@ -0,0 +1,116 @@
+"""Binary codec for Simulator/Agent/Scene snapshots.
+
+Snapshots are plain dicts/lists of JSON-compatible values. ``encode`` writes
+them as msgpack behind a small versioned header::
+
+    b"SS4" | version (1 byte) | table length (4 bytes, big endian) | table | payload
+
+With ``intern=True``, ``table`` is a msgpack array of short string values
+that occur more than once in the snapshot (agent names, roles, action names,
+event types); in the payload each occurrence is an ext value holding its
+index, and the decoded strings are ``sys.intern``-ed. Dict keys are written
+as-is (msgspec already caches short keys while decoding). Interning costs a
+pass over the snapshot in Python and does not beat zlib on size for the
+current scenes (see scripts/bench_codec.py), so it is off by default and the
+table is then empty.
+
+``decode`` also accepts the JSON (utf-8) snapshots written before this codec
+existed. ``clone`` is the isolation copy used by serialize/deserialize and
+node copies: a plain msgpack round trip without the string table.
+"""
+
+from __future__ import annotations
+
+import json
+import struct
+import sys
+from typing import Any
+
+import msgspec
+
+MAGIC = b"SS4"
+VERSION = 1
+_HEADER = struct.Struct(">3sBI")
+_EXT_STR = 1
+# Only short strings are worth a table slot; long texts are rarely repeated
+_INTERN_MAX_LEN = 64
+
+_encoder = msgspec.msgpack.Encoder()
+_decoder = msgspec.msgpack.Decoder()
+# Accounting should never fail on an odd value; size unknown types by their str()
+_sizer = msgspec.msgpack.Encoder(enc_hook=str)
+
+
+class CodecError(ValueError):
+    pass
+
+
+def _count_strings(obj: Any, counts: dict[str, int]) -> None:
+    if isinstance(obj, str):
+        if len(obj) <= _INTERN_MAX_LEN:
+            counts[obj] = counts.get(obj, 0) + 1
+    elif isinstance(obj, dict):
+        for v in obj.values():
+            _count_strings(v, counts)
+    elif isinstance(obj, (list, tuple)):
+        for v in obj:
+            _count_strings(v, counts)
+
+
+def _replace_strings(obj: Any, index: dict[str, msgspec.msgpack.Ext]) -> Any:
+    if isinstance(obj, str):
+        return index.get(obj, obj)
+    if isinstance(obj, dict):
+        return {k: _replace_strings(v, index) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_replace_strings(v, index) for v in obj]
+    return obj
+
+
+def encode(obj: Any, intern: bool = False) -> bytes:
+    table: list[str] = []
+    if intern:
+        counts: dict[str, int] = {}
+        _count_strings(obj, counts)
+        table = [s for s, n in counts.items() if n > 1]
+    if table:
+        index = {s: msgspec.msgpack.Ext(_EXT_STR, struct.pack(">I", i)) for i, s in enumerate(table)}
+        obj = _replace_strings(obj, index)
+    head = _encoder.encode(table)
+    return _HEADER.pack(MAGIC, VERSION, len(head)) + head + _encoder.encode(obj)
+
+
+def decode(data: bytes | bytearray | memoryview | str) -> Any:
+    if isinstance(data, str):
+        return json.loads(data)
+    data = bytes(data)
+    if not data.startswith(MAGIC):
+        # Snapshots written before the binary codec are JSON
+        return json.loads(data.decode("utf-8"))
+    if len(data) < _HEADER.size:
+        raise CodecError("truncated snapshot header")
+    _, version, head_len = _HEADER.unpack_from(data)
+    if version > VERSION:
+        raise CodecError(f"unsupported snapshot version {version} (this build reads up to {VERSION})")
+    start = _HEADER.size
+    table = [sys.intern(s) for s in _decoder.decode(data[start : start + head_len])]
+    payload = data[start + head_len :]
+    if not table:
+        return _decoder.decode(payload)
+
+    def _ext_hook(code: int, raw: memoryview) -> Any:
+        if code != _EXT_STR:
+            raise CodecError(f"unknown ext type {code}")
+        return table[struct.unpack(">I", raw)[0]]
+
+    return msgspec.msgpack.decode(payload, ext_hook=_ext_hook)
+
+
+def encoded_size(obj: Any) -> int:
+    """Size of ``obj`` as msgpack; the basis of SimTree memory accounting."""
+    return len(_sizer.encode(obj))
+
+
+def clone(obj: Any) -> Any:
+    """Deep copy of a JSON-compatible value (tuples come back as lists)."""
+    return _decoder.decode(_encoder.encode(obj))
@@ -0,0 +1,78 @@
+"""Batched handoff of events from simulation worker threads to an asyncio loop.
+
+Simulators run in worker threads (asyncio.to_thread) and may emit thousands of
+events per turn. Scheduling one loop callback per event per subscriber floods
+the loop with wakeups, so EventChannel buffers events under a lock and hands
+them over in batches: the first event of a batch arms a timer on the loop, and
+the batch is flushed when the timer fires or when ``max_batch`` events are
+waiting, whichever comes first. ``deliver`` always runs on the loop thread.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import Callable, List
+
+
+class EventChannel:
+    def __init__(
+        self,
+        deliver: Callable[[List[dict]], None],
+        loop: asyncio.AbstractEventLoop,
+        flush_interval: float = 0.02,
+        max_batch: int = 256,
+    ):
+        self._deliver = deliver
+        self._loop = loop
+        self.flush_interval = max(0.0, float(flush_interval))
+        self.max_batch = max(1, int(max_batch))
+        self._lock = threading.Lock()
+        self._buffer: List[dict] = []
+        self._armed = False
+        self._urgent = False
+        self.batches = 0
+        self.events = 0
+
+    def publish(self, event: dict) -> None:
+        """Queue an event from any thread."""
+        with self._lock:
+            self._buffer.append(event)
+            if not self._armed:
+                self._armed = True
+                schedule = self._arm
+            elif len(self._buffer) >= self.max_batch and not self._urgent:
+                self._urgent = True
+                schedule = self.flush
+            else:
+                return
+        if self._loop.is_closed():
+            return
+        self._loop.call_soon_threadsafe(schedule)
+
+    def _arm(self) -> None:
+        if self.flush_interval:
+            self._loop.call_later(self.flush_interval, self._timer_flush)
+        else:
+            self._timer_flush()
+
+    def _timer_flush(self) -> None:
+        with self._lock:
+            self._armed = False
+        self.flush()
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._buffer)
+
+    def flush(self) -> None:
+        """Deliver everything buffered so far. Must run on the loop thread."""
+        with self._lock:
+            batch = self._buffer
+            self._buffer = []
+            self._urgent = False
+        if not batch:
+            return
+        self.batches += 1
+        self.events += len(batch)
+        self._deliver(batch)
@@ -4,18 +4,21 @@ import time
 from concurrent.futures import ThreadPoolExecutor
 from concurrent.futures import TimeoutError as FutTimeout
 
-import google.generativeai as genai
-from openai import OpenAI
-
 from .llm_config import LLMConfig
+from .metrics import LLM_ERRORS, LLM_LATENCY, LLM_REQUESTS
 
 
 class LLMClient:
     def __init__(self, provider: LLMConfig):
         self.provider = provider
+        # Provider SDKs are slow to import; load only the one this client uses
         if provider.dialect == "openai":
+            from openai import OpenAI
+
             self.client = OpenAI(api_key=provider.api_key, base_url=provider.base_url)
         elif provider.dialect == "gemini":
+            import google.generativeai as genai
+
             genai.configure(api_key=provider.api_key)
             self.client = genai.GenerativeModel(provider.model)
         elif provider.dialect == "mock":
@@ -30,22 +33,30 @@ class LLMClient:
     def _with_timeout_and_retry(self, fn):
         last_err = None
         delay = self.retry_backoff_s
+        dialect = self.provider.dialect
         for attempt in range(self.max_retries + 1):
+            LLM_REQUESTS.inc(provider=dialect)
+            start = time.perf_counter()
             try:
                 # For OpenAI we'll also pass per-request timeout; for others enforce here
-                if self.provider.dialect == "openai":
-                    return fn()
-                # Run in a thread to enforce timeout
-                with ThreadPoolExecutor(max_workers=1) as ex:
-                    fut = ex.submit(fn)
-                    return fut.result(timeout=self.timeout_s)
+                if dialect == "openai":
+                    result = fn()
+                else:
+                    # Run in a thread to enforce timeout
+                    with ThreadPoolExecutor(max_workers=1) as ex:
+                        fut = ex.submit(fn)
+                        result = fut.result(timeout=self.timeout_s)
             except (FutTimeout, Exception) as e:
+                LLM_LATENCY.observe(time.perf_counter() - start, provider=dialect)
+                LLM_ERRORS.inc(provider=dialect)
                 last_err = e
                 if attempt < self.max_retries:
                     time.sleep(max(0.0, delay))
                     delay *= 2
                     continue
                 raise last_err
+            LLM_LATENCY.observe(time.perf_counter() - start, provider=dialect)
+            return result
 
     def chat(self, messages):
         if self.provider.dialect == "openai":
@@ -135,6 +146,8 @@ class LLMClient:
             resp = self.client.embeddings.create(model=self.provider.model, input=text)
             return resp.data[0].embedding
         if self.provider.dialect == "gemini":
+            import google.generativeai as genai
+
             return genai.embed_content(model=self.provider.model, content=text)[
                 "embedding"
             ]
@@ -0,0 +1,121 @@
+"""Level-gated structured logging for the simulation engine.
+
+Each subsystem gets its own logger under the ``socialsim4`` namespace, e.g.
+``get_logger("simulator")``. Calls take a short message plus keyword fields:
+
+    log.debug("turn start", turn=3, agent="Alice")
+
+Records below the configured level are discarded before any formatting
+happens, so hot-path debug calls cost a level check. Nothing is printed until
+configure_logging() installs a handler (apart from Python's last-resort
+handler for warnings and errors).
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sys
+
+ROOT_LOGGER = "socialsim4"
+
+_TRUTHY = {"1", "true", "yes", "on"}
+
+
+class SubsystemLogger:
+    __slots__ = ("_logger",)
+
+    def __init__(self, logger: logging.Logger):
+        self._logger = logger
+
+    @property
+    def name(self) -> str:
+        return self._logger.name
+
+    def enabled_for(self, level: int) -> bool:
+        return self._logger.isEnabledFor(level)
+
+    def _emit(self, level: int, msg: str, fields: dict, exc_info=None) -> None:
+        if self._logger.isEnabledFor(level):
+            self._logger.log(level, msg, extra={"fields": fields}, exc_info=exc_info, stacklevel=3)
+
+    def debug(self, msg: str, **fields) -> None:
+        self._emit(logging.DEBUG, msg, fields)
+
+    def info(self, msg: str, **fields) -> None:
+        self._emit(logging.INFO, msg, fields)
+
+    def warning(self, msg: str, **fields) -> None:
+        self._emit(logging.WARNING, msg, fields)
+
+    def error(self, msg: str, **fields) -> None:
+        self._emit(logging.ERROR, msg, fields)
+
+    def exception(self, msg: str, **fields) -> None:
+        self._emit(logging.ERROR, msg, fields, exc_info=True)
+
+
+def get_logger(subsystem: str) -> SubsystemLogger:
+    return SubsystemLogger(logging.getLogger(f"{ROOT_LOGGER}.{subsystem}"))
+
+
+class StructuredFormatter(logging.Formatter):
+    """Render records as ``key=value`` text or one JSON object per line."""
+
+    def __init__(self, json_output: bool = False):
+        super().__init__()
+        self.json_output = json_output
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields = getattr(record, "fields", None) or {}
+        subsystem = record.name[len(ROOT_LOGGER) + 1 :] if record.name.startswith(ROOT_LOGGER + ".") else record.name
+        if self.json_output:
+            payload = {
+                "ts": round(record.created, 3),
+                "level": record.levelname.lower(),
+                "subsystem": subsystem,
+                "msg": record.getMessage(),
+            }
+            payload.update(fields)
+            if record.exc_info:
+                payload["exc"] = self.formatException(record.exc_info)
+            return json.dumps(payload, ensure_ascii=False, default=str)
+        parts = [self.formatTime(record, "%H:%M:%S"), record.levelname, subsystem, record.getMessage()]
+        parts.extend(f"{k}={v}" for k, v in fields.items())
+        text = " ".join(str(p) for p in parts)
+        if record.exc_info:
+            text += "\n" + self.formatException(record.exc_info)
+        return text
+
+
+def configure_logging(level: str | int | None = None, quiet: bool | None = None, json_output: bool | None = None) -> None:
+    """Install a single stderr handler on the ``socialsim4`` logger.
+
+    Unset arguments fall back to SOCIALSIM4_LOG_LEVEL (default INFO),
+    SOCIALSIM4_LOG_QUIET (warnings and errors only) and SOCIALSIM4_LOG_FORMAT
+    (``text`` or ``json``). Safe to call repeatedly.
+    """
+    if level is None:
+        level = os.getenv("SOCIALSIM4_LOG_LEVEL", "INFO")
+    if quiet is None:
+        quiet = os.getenv("SOCIALSIM4_LOG_QUIET", "").strip().lower() in _TRUTHY
+    if json_output is None:
+        json_output = os.getenv("SOCIALSIM4_LOG_FORMAT", "text").strip().lower() == "json"
+
+    resolved = logging.getLevelName(level.upper()) if isinstance(level, str) else int(level)
+    if not isinstance(resolved, int):
+        raise ValueError(f"Unknown log level: {level}")
+    if quiet:
+        resolved = max(resolved, logging.WARNING)
+
+    root = logging.getLogger(ROOT_LOGGER)
+    root.setLevel(resolved)
+    root.propagate = False
+    for handler in list(root.handlers):
+        if getattr(handler, "_socialsim4", False):
+            root.removeHandler(handler)
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(StructuredFormatter(json_output=json_output))
+    handler._socialsim4 = True  # type: ignore[attr-defined]
+    root.addHandler(handler)
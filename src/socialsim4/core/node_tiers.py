@@ -0,0 +1,77 @@
+"""Compact storage for SimTree node snapshots outside the live object graph.
+
+Nodes that are not being advanced do not need a live Simulator. SimTree keeps
+them in one of three tiers:
+
+- hot: the live Simulator object
+- warm: zlib-compressed ``codec.encode(Simulator.serialize())`` held in memory
+- cold: the same compressed bytes appended to a per-tree spill file and read
+  back through a memory map
+
+Snapshots are read from warm/cold storage directly when a node is only copied
+(advance/branch) or serialized; the Simulator is rebuilt only when a caller
+asks for the live object.
+"""
+
+from __future__ import annotations
+
+import mmap
+import tempfile
+import threading
+import zlib
+
+from socialsim4.core import codec
+
+
+def pack(snapshot: dict) -> bytes:
+    return zlib.compress(codec.encode(snapshot), 6)
+
+
+def unpack(blob: bytes) -> dict:
+    # codec.decode also reads the zlib-compressed JSON written by older versions
+    return codec.decode(zlib.decompress(blob))
+
+
+class ColdStore:
+    """Append-only spill file for compressed snapshots.
+
+    The file is anonymous (removed by the OS once closed) and only appended
+    to; the owning tree copies the live snapshots into a fresh store once most
+    of the file is dead (see ``SimTree._compact_cold``).
+    """
+
+    def __init__(self, directory: str | None = None):
+        self._fh = tempfile.TemporaryFile(prefix="socialsim4-nodes-", dir=directory)
+        self._size = 0
+        self._map: mmap.mmap | None = None
+        self._mapped = 0
+        self._lock = threading.Lock()
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def put(self, blob: bytes) -> tuple[int, int]:
+        with self._lock:
+            offset = self._size
+            self._fh.seek(offset)
+            self._fh.write(blob)
+            self._fh.flush()
+            self._size += len(blob)
+            return offset, len(blob)
+
+    def get(self, offset: int, length: int) -> bytes:
+        with self._lock:
+            if self._map is None or offset + length > self._mapped:
+                if self._map is not None:
+                    self._map.close()
+                self._map = mmap.mmap(self._fh.fileno(), self._size, access=mmap.ACCESS_READ)
+                self._mapped = self._size
+            return bytes(self._map[offset : offset + length])
+
+    def close(self) -> None:
+        with self._lock:
+            if self._map is not None:
+                self._map.close()
+                self._map = None
+            self._fh.close()
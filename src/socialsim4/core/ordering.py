@@ -2,6 +2,10 @@ import random
 from copy import deepcopy
 from typing import Callable, Iterator, Optional
 
+from socialsim4.core.log import get_logger
+
+log = get_logger("ordering")
+
 
 class Ordering:
     NAME = "base"
@@ -22,6 +26,10 @@ class Ordering:
     def on_event(self, sim, event_type: str, data: dict) -> None:
         pass
 
+    # Called whenever an agent receives environment feedback (agent.add_env_feedback)
+    def on_agent_feedback(self, agent_name: str) -> None:
+        pass
+
     # Optional serialization of ordering state for cloning
     def get_state(self) -> Optional[dict]:
         return None
@@ -131,6 +139,95 @@ class ControlledOrdering(Ordering):
                 yield name
 
 
+class EventDrivenOrdering(Ordering):
+    """Schedule only agents with unseen input.
+
+    Agents enter a FIFO ready set when they receive environment feedback and
+    leave it when they take a turn. Feedback an agent gets during its own turn
+    (the echo of its own message, action confirmations, its status prompt) is
+    a result of that turn and does not make it ready again. With
+    ``max_idle`` set, an agent that has not acted for that many turns is woken
+    even without new input (to see status prompts or take initiative), and an
+    empty ready set wakes the longest idle agent. Without ``max_idle`` the
+    iterator ends when nobody is ready, which ends the current run.
+    """
+
+    NAME = "event_driven"
+
+    def __init__(self, max_idle: Optional[int] = None):
+        super().__init__()
+        self.max_idle = int(max_idle) if max_idle else None
+        self._ready: dict[str, None] = {}
+        self._clock: int = 0
+        self._last_turn: dict[str, int] = {}
+        # Agent whose turn is in progress; its own feedback is ignored
+        self._current: Optional[str] = None
+
+    def set_simulation(self, sim) -> None:
+        super().set_simulation(sim)
+        self._ready = {n: None for n in self._ready if n in sim.agents}
+        for name, agent in sim.agents.items():
+            self._last_turn.setdefault(name, self._clock)
+            if len(agent.short_memory) != agent.last_history_length:
+                self._ready.setdefault(name, None)
+        self._last_turn = {n: t for n, t in self._last_turn.items() if n in sim.agents}
+
+    def on_agent_feedback(self, agent_name: str) -> None:
+        if agent_name != self._current:
+            self._ready.setdefault(agent_name, None)
+
+    def _most_idle(self) -> Optional[str]:
+        names = [n for n in self.sim.agents if n in self._last_turn]
+        if not names:
+            return None
+        name = min(names, key=lambda n: self._last_turn[n])
+        if self._clock - self._last_turn[name] >= self.max_idle:
+            return name
+        return None
+
+    def iter(self) -> Iterator[str]:
+        while True:
+            name = None
+            if self.max_idle:
+                name = self._most_idle()
+            if name is None:
+                while self._ready:
+                    candidate = next(iter(self._ready))
+                    if candidate in self.sim.agents:
+                        name = candidate
+                        break
+                    self._ready.pop(candidate)
+            if name is None and self.max_idle and self.sim.agents:
+                # Nothing pending: fast-forward to the longest idle agent
+                name = min(self.sim.agents, key=lambda n: self._last_turn.get(n, 0))
+            if name is None:
+                break
+            self._current = name
+            yield name
+
+    def post_turn(self, agent_name: str) -> None:
+        self._current = None
+        self._clock += 1
+        self._last_turn[agent_name] = self._clock
+        self._ready.pop(agent_name, None)
+
+    def get_state(self) -> Optional[dict]:
+        return {
+            "ready": list(self._ready),
+            "clock": int(self._clock),
+            "last_turn": dict(self._last_turn),
+            "max_idle": self.max_idle,
+        }
+
+    def set_state(self, state: Optional[dict]) -> None:
+        if not state:
+            return
+        self._ready = {n: None for n in state.get("ready", [])}
+        self._clock = int(state.get("clock", 0))
+        self._last_turn = {n: int(t) for n, t in (state.get("last_turn") or {}).items()}
+        self.max_idle = state.get("max_idle") or None
+
+
 class LLMModeratedOrdering(Ordering):
     NAME = "llm_moderated"
 
@@ -155,7 +252,7 @@ class LLMModeratedOrdering(Ordering):
             yield self._queue.pop(0)
 
     def post_turn(self, agent_name: str) -> None:
-        print(f"Remaining schedule: {self._queue}")
+        log.debug("remaining schedule", queue=self._queue)
         if not self._queue:
             self._refill_queue()
 
@@ -212,13 +309,3 @@ class LLMModeratedOrdering(Ordering):
 
     def is_queue_empty(self) -> bool:
         return len(self._queue) == 0
-
-
-ORDERING_MAP = {
-    SequentialOrdering.NAME: SequentialOrdering,
-    CycledOrdering.NAME: CycledOrdering,
-    RandomOrdering.NAME: RandomOrdering,
-    AsynchronousOrdering.NAME: AsynchronousOrdering,
-    ControlledOrdering.NAME: ControlledOrdering,
-    LLMModeratedOrdering.NAME: LLMModeratedOrdering,
-}
@@ -1,95 +1,161 @@
-from .actions.base_actions import SendMessageAction, TalkToAction, YieldAction, SpeakAction
-from .actions.council_actions import (
-    FinishMeetingAction,
-    RequestBriefAction,
-    StartVotingAction,
-    VoteAction,
-    VotingStatusAction,
-)
-from .actions.landlord_actions import (
-    CallLandlordAction,
-    DoubleAction,
-    NoDoubleAction,
-    PassAction,
-    PlayCardsAction,
-    RobLandlordAction,
-)
-from .actions.moderation_actions import ScheduleOrderAction
-from .actions.village_actions import (
-    # ExploreAction,
-    GatherResourceAction,
-    LookAroundAction,
-    MoveToLocationAction,
-    # QuickMoveAction,
-    RestAction,
-)
-from .actions.web_actions import ViewPageAction, WebSearchAction
-from .actions.werewolf_actions import (
-    CloseVotingAction,
-    InspectAction,
-    NightKillAction,
-    OpenVotingAction,
-    VoteLynchAction,
-    WitchPoisonAction,
-    WitchSaveAction,
+"""Lazy registries of scenes, actions and orderings.
+
+Each registry maps a name to a "module:attribute" path and imports it on first
+lookup, so a worker that only runs simple_chat_scene never imports the
+landlord or village modules. Actions are instantiated once on first lookup.
+
+Third-party packages plug in without touching this module, either through
+entry points in the ``socialsim4.scenes``, ``socialsim4.actions`` and
+``socialsim4.orderings`` groups (value ``"package.module:Attr"``), or by
+calling ``register_scene`` / ``register_action`` / ``register_ordering`` at
+import time.
+"""
+
+from __future__ import annotations
+
+import importlib
+import threading
+from collections.abc import Mapping
+from importlib.metadata import entry_points
+from typing import Any, Iterator
+
+
+class LazyRegistry(Mapping):
+    def __init__(self, group: str, specs: dict[str, str], instantiate: bool = False):
+        self.group = group
+        self.instantiate = instantiate
+        self._specs: dict[str, Any] = dict(specs)
+        self._loaded: dict[str, Any] = {}
+        self._entry_points_scanned = False
+        self._lock = threading.RLock()
+
+    def _scan_entry_points(self) -> None:
+        if self._entry_points_scanned:
+            return
+        with self._lock:
+            if self._entry_points_scanned:
+                return
+            for ep in entry_points(group=self.group):
+                # Built-ins and explicit register() calls take precedence
+                self._specs.setdefault(ep.name, ep.value)
+            self._entry_points_scanned = True
+
+    def register(self, name: str, target: Any) -> None:
+        """Add or replace ``name``; ``target`` is a "module:attr" path or the object itself."""
+        with self._lock:
+            self._specs[name] = target
+            self._loaded.pop(name, None)
+
+    def _resolve(self, target: Any) -> Any:
+        if isinstance(target, str):
+            module_name, _, attr = target.partition(":")
+            obj = importlib.import_module(module_name)
+            for part in attr.split(".") if attr else []:
+                obj = getattr(obj, part)
+            target = obj
+        if self.instantiate and isinstance(target, type):
+            target = target()
+        return target
+
+    def __getitem__(self, name: str) -> Any:
+        loaded = self._loaded.get(name)
+        if loaded is not None:
+            return loaded
+        self._scan_entry_points()
+        with self._lock:
+            if name in self._loaded:
+                return self._loaded[name]
+            if name not in self._specs:
+                raise KeyError(name)
+            obj = self._resolve(self._specs[name])
+            self._loaded[name] = obj
+            return obj
+
+    def __contains__(self, name: object) -> bool:
+        self._scan_entry_points()
+        return name in self._specs
+
+    def __iter__(self) -> Iterator[str]:
+        self._scan_entry_points()
+        return iter(list(self._specs))
+
+    def __len__(self) -> int:
+        self._scan_entry_points()
+        return len(self._specs)
+
+
+_ACTIONS = "socialsim4.core.actions"
+
+ACTION_SPACE_MAP = LazyRegistry(
+    "socialsim4.actions",
+    {
+        "speak": f"{_ACTIONS}.base_actions:SpeakAction",
+        "send_message": f"{_ACTIONS}.base_actions:SendMessageAction",
+        # "speak": removed in favor of targeted talk_to
+        "talk_to": f"{_ACTIONS}.base_actions:TalkToAction",
+        "yield": f"{_ACTIONS}.base_actions:YieldAction",
+        "move_to_location": f"{_ACTIONS}.village_actions:MoveToLocationAction",
+        "look_around": f"{_ACTIONS}.village_actions:LookAroundAction",
+        "gather_resource": f"{_ACTIONS}.village_actions:GatherResourceAction",
+        "rest": f"{_ACTIONS}.village_actions:RestAction",
+        # "quick_move": QuickMoveAction(),
+        # "explore": ExploreAction(),
+        "start_voting": f"{_ACTIONS}.council_actions:StartVotingAction",
+        "finish_meeting": f"{_ACTIONS}.council_actions:FinishMeetingAction",
+        "request_brief": f"{_ACTIONS}.council_actions:RequestBriefAction",
+        "voting_status": f"{_ACTIONS}.council_actions:VotingStatusAction",
+        "vote": f"{_ACTIONS}.council_actions:VoteAction",
+        # Web actions
+        "web_search": f"{_ACTIONS}.web_actions:WebSearchAction",
+        "view_page": f"{_ACTIONS}.web_actions:ViewPageAction",
+        # Moderation actions
+        "schedule_order": f"{_ACTIONS}.moderation_actions:ScheduleOrderAction",
+        # Werewolf actions
+        "vote_lynch": f"{_ACTIONS}.werewolf_actions:VoteLynchAction",
+        "night_kill": f"{_ACTIONS}.werewolf_actions:NightKillAction",
+        "inspect": f"{_ACTIONS}.werewolf_actions:InspectAction",
+        "witch_save": f"{_ACTIONS}.werewolf_actions:WitchSaveAction",
+        "witch_poison": f"{_ACTIONS}.werewolf_actions:WitchPoisonAction",
+        # Moderator actions
+        "open_voting": f"{_ACTIONS}.werewolf_actions:OpenVotingAction",
+        "close_voting": f"{_ACTIONS}.werewolf_actions:CloseVotingAction",
+        # Landlord poker actions
+        "call_landlord": f"{_ACTIONS}.landlord_actions:CallLandlordAction",
+        "rob_landlord": f"{_ACTIONS}.landlord_actions:RobLandlordAction",
+        "pass": f"{_ACTIONS}.landlord_actions:PassAction",
+        "play_cards": f"{_ACTIONS}.landlord_actions:PlayCardsAction",
+        "double": f"{_ACTIONS}.landlord_actions:DoubleAction",
+        "no_double": f"{_ACTIONS}.landlord_actions:NoDoubleAction",
+    },
+    instantiate=True,
 )
-from .ordering import ORDERING_MAP as _ORDERING_MAP
-from .scenes.council_scene import CouncilScene
-from .scenes.landlord_scene import LandlordPokerScene
-from .scenes.simple_chat_scene import SimpleChatScene
-from .scenes.village_scene import VillageScene
-from .scenes.werewolf_scene import WerewolfScene
-
-ACTION_SPACE_MAP = {
-    "speak": SpeakAction(),
-    "send_message": SendMessageAction(),
-    # "speak": removed in favor of targeted talk_to
-    "talk_to": TalkToAction(),
-    "yield": YieldAction(),
-    "move_to_location": MoveToLocationAction(),
-    "look_around": LookAroundAction(),
-    "gather_resource": GatherResourceAction(),
-    "rest": RestAction(),
-    # "quick_move": QuickMoveAction(),
-    # "explore": ExploreAction(),
-    "start_voting": StartVotingAction(),
-    "finish_meeting": FinishMeetingAction(),
-    "request_brief": RequestBriefAction(),
-    "voting_status": VotingStatusAction(),
-    "vote": VoteAction(),
-    # Web actions
-    "web_search": WebSearchAction(),
-    "view_page": ViewPageAction(),
-    # Moderation actions
-    "schedule_order": ScheduleOrderAction(),
-    # Werewolf actions
-    "vote_lynch": VoteLynchAction(),
-    "night_kill": NightKillAction(),
-    "inspect": InspectAction(),
-    "witch_save": WitchSaveAction(),
-    "witch_poison": WitchPoisonAction(),
-    # Moderator actions
-    "open_voting": OpenVotingAction(),
-    "close_voting": CloseVotingAction(),
-    # Landlord poker actions
-    "call_landlord": CallLandlordAction(),
-    "rob_landlord": RobLandlordAction(),
-    "pass": PassAction(),
-    "play_cards": PlayCardsAction(),
-    "double": DoubleAction(),
-    "no_double": NoDoubleAction(),
-}
 
-SCENE_MAP = {
-    "simple_chat_scene": SimpleChatScene,
-    "emotional_conflict_scene": SimpleChatScene,
-    "council_scene": CouncilScene,
-    "village_scene": VillageScene,
-    "werewolf_scene": WerewolfScene,
-    "landlord_scene": LandlordPokerScene,
-}
+_SCENES = "socialsim4.core.scenes"
+
+SCENE_MAP = LazyRegistry(
+    "socialsim4.scenes",
+    {
+        "simple_chat_scene": f"{_SCENES}.simple_chat_scene:SimpleChatScene",
+        "emotional_conflict_scene": f"{_SCENES}.simple_chat_scene:SimpleChatScene",
+        "council_scene": f"{_SCENES}.council_scene:CouncilScene",
+        "village_scene": f"{_SCENES}.village_scene:VillageScene",
+        "werewolf_scene": f"{_SCENES}.werewolf_scene:WerewolfScene",
+        "landlord_scene": f"{_SCENES}.landlord_scene:LandlordPokerScene",
+    },
+)
 
-ORDERING_MAP = _ORDERING_MAP
+ORDERING_MAP = LazyRegistry(
+    "socialsim4.orderings",
+    {
+        "sequential": "socialsim4.core.ordering:SequentialOrdering",
+        "cycled": "socialsim4.core.ordering:CycledOrdering",
+        "random": "socialsim4.core.ordering:RandomOrdering",
+        "asynchronous": "socialsim4.core.ordering:AsynchronousOrdering",
+        "controlled": "socialsim4.core.ordering:ControlledOrdering",
+        "event_driven": "socialsim4.core.ordering:EventDrivenOrdering",
+        "llm_moderated": "socialsim4.core.ordering:LLMModeratedOrdering",
+    },
+)
 
 # Scene action registry: declares common (basic) actions provided by the scene
 # and optional per-agent actions that can be toggled. Keep action names aligned
@@ -130,3 +196,25 @@ SCENE_DESCRIPTIONS: dict[str, str] = {
     "werewolf_scene": "Social deduction game with night/day phases and role-specific actions (moderated flow).",
     "landlord_scene": "Dou Dizhu (Landlord) card game flow with bidding, playing, and scoring stages.",
 }
+
+
+def register_action(name: str, target: Any) -> None:
+    ACTION_SPACE_MAP.register(name, target)
+
+
+def register_ordering(name: str, target: Any) -> None:
+    ORDERING_MAP.register(name, target)
+
+
+def register_scene(
+    name: str,
+    target: Any,
+    basic_actions: list[str] | None = None,
+    allowed_actions: list[str] | None = None,
+    description: str | None = None,
+) -> None:
+    """Register a scene class (or "module:Class" path) with its action sets and description."""
+    SCENE_MAP.register(name, target)
+    SCENE_ACTIONS[name] = {"basic": list(basic_actions or ["yield"]), "allowed": list(allowed_actions or [])}
+    if description is not None:
+        SCENE_DESCRIPTIONS[name] = description
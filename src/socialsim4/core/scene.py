@@ -1,8 +1,13 @@
+import logging
+
 from socialsim4.core.actions.base_actions import YieldAction
 from socialsim4.core.agent import Agent
 from socialsim4.core.event import PublicEvent
+from socialsim4.core.log import get_logger
 from socialsim4.core.simulator import Simulator
 
+log = get_logger("scene")
+
 
 class Scene:
     TYPE = "scene"
@@ -30,7 +35,8 @@ class Scene:
 
     def parse_and_handle_action(self, action_data, agent: Agent, simulator: Simulator):
         action_name = action_data.get("action")
-        print(f"Action Space({agent.name}):", agent.action_space)
+        if log.enabled_for(logging.DEBUG):
+            log.debug("dispatch action", agent=agent.name, action=action_name, action_space=[a.NAME for a in agent.action_space])
         for act in agent.action_space:
             if act.NAME == action_name:
                 success, result, summary, meta, pass_control = act.handle(action_data, agent, simulator, self)
@@ -67,8 +73,7 @@ class Scene:
         return False
 
     def log(self, message):
-        time_str = f"[{self.state.get('time', 0) % 24}:00] "
-        print(f"{time_str}{message}")
+        log.info("scene message", scene=self.name, hour=self.state.get("time", 0) % 24, message=message)
 
     def get_agent_status_prompt(self, agent: Agent) -> str:
         """Generates a status prompt for a given agent based on the scene's state."""
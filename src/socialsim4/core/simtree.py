@@ -1,12 +1,26 @@
-import json
-from typing import Dict, List, Optional
+import threading
+import uuid
+from collections import deque
+from typing import Dict, Iterable, List, Optional
 
+from socialsim4.core import codec
 from socialsim4.core.event import PublicEvent
+from socialsim4.core.event_channel import EventChannel
+from socialsim4.core.node_tiers import ColdStore, pack, unpack
 from socialsim4.core.simulator import Simulator
 
 
 import asyncio
 
+# Fallback size of one agent memory entry, before a node has logged anything
+_MEMORY_ENTRY_BYTES = 256
+# The spill file is rewritten once its dead bytes exceed both this and its live bytes
+_COLD_COMPACT_MIN_BYTES = 8 * 1024 * 1024
+
+
+def _memory_entries(sim: Simulator) -> int:
+    return sum(len(agent.short_memory) for agent in list(sim.agents.values()))
+
 
 class SimTree:
     def __init__(self, clients: Dict[str, object]):
@@ -20,12 +34,306 @@ class SimTree:
         self._tree_broadcast = lambda event: None
         # Event loop used for thread-safe fanout (set by backend runtime)
         self._loop: asyncio.AbstractEventLoop | None = None
+        # Batches worker-thread events onto the loop once a loop is attached
+        self._channel: EventChannel | None = None
+        # Node storage tiers (hot/warm/cold); off until configure_tiers()
+        self._tiering = False
+        self._warm_budget = 0
+        self._warm_bytes = 0
+        # Running memory totals (see node_memory); updated when nodes are added,
+        # removed or change tier, and as they log. Hot nodes are estimated on read.
+        self._mem_lock = threading.Lock()
+        self._log_bytes = 0
+        self._cold_bytes = 0
+        self._hot_mem: Dict[int, dict] = {}
+        self._cold_dir: str | None = None
+        self._cold: ColdStore | None = None
+        self._tier_lock = threading.RLock()
+        # Graph index over attached nodes, kept up to date by attach/delete_subtree.
+        # graph_version counts changes; graph_epoch identifies this tree instance so
+        # clients holding a version from a reloaded tree get a full graph again.
+        self._leaves: set = set()
+        self._depths: Dict[int, set] = {}
+        self._edges: Dict[int, dict] = {}
+        self._changes: deque = deque(maxlen=1024)
+        self.graph_version = 0
+        self.graph_epoch = uuid.uuid4().hex[:8]
+        self._index_lock = threading.RLock()
 
     def set_tree_broadcast(self, fn) -> None:
         self._tree_broadcast = fn
 
-    def attach_event_loop(self, loop: asyncio.AbstractEventLoop) -> None:
+    def set_clients(self, clients: Dict[str, object]) -> None:
+        """Swap the LLM/search clients used by this tree and its live simulators."""
+        self.clients = clients
+        for node in self.nodes.values():
+            sim = node.get("sim")
+            if sim is not None:
+                sim.clients = clients
+
+    def attach_event_loop(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        flush_interval: float = 0.02,
+        max_batch: int = 256,
+    ) -> None:
         self._loop = loop
+        self._channel = EventChannel(self._deliver_events, loop, flush_interval, max_batch)
+
+    def configure_tiers(self, enabled: bool = True, warm_budget_bytes: int = 0, cold_dir: str | None = None) -> None:
+        """Let compact() demote idle interior nodes: hot -> warm, and warm -> cold past the budget."""
+        self._tiering = enabled
+        self._warm_budget = max(0, int(warm_budget_bytes))
+        self._cold_dir = cold_dir
+
+    def tier(self, node_id: int) -> str:
+        return self.nodes[node_id].get("tier", "hot")
+
+    def get_sim(self, node_id: int) -> Simulator:
+        """Live simulator of a node, rebuilt from warm/cold storage if needed."""
+        node = self.nodes[node_id]
+        with self._tier_lock:
+            sim = node.get("sim")
+            if sim is not None:
+                return sim
+            snap = self._stored_snapshot(node)
+            sim = Simulator.deserialize(snap, self.clients, log_handler=None)
+            self._attach_log_handler(node_id, sim, node["logs"])
+            cold = node.get("cold")
+            self._drop_stored(node)
+            if cold is not None:
+                # Demoting the node again unchanged reuses these bytes (see demote)
+                node["cold_prev"] = (self._cold, cold)
+            node["sim"] = sim
+            node["tier"] = "hot"
+            self._mem_hot(node_id, node, snap)
+            return sim
+
+    def load_state(self, node_id: int, snap: dict) -> Simulator:
+        """Replace a node's simulator with one rebuilt from ``snap`` (e.g. state advanced elsewhere)."""
+        node = self.nodes[node_id]
+        sim = Simulator.deserialize(snap, self.clients, log_handler=None)
+        with self._tier_lock:
+            self._attach_log_handler(node_id, sim, node["logs"])
+            self._drop_stored(node)
+            node.pop("cold_prev", None)
+            node["sim"] = sim
+            node["tier"] = "hot"
+            self._mem_hot(node_id, node, snap)
+        return sim
+
+    def snapshot(self, node_id: int) -> dict:
+        """Serialized simulator state of a node without promoting it to hot."""
+        node = self.nodes[node_id]
+        with self._tier_lock:
+            sim = node.get("sim")
+            if sim is not None:
+                return sim.serialize()
+            return self._stored_snapshot(node)
+
+    def node_turns(self, node_id: int) -> int:
+        node = self.nodes[node_id]
+        sim = node.get("sim")
+        return int(sim.turns) if sim is not None else int(node.get("turns", 0))
+
+    def _stored_snapshot(self, node: dict) -> dict:
+        if node.get("tier") == "cold":
+            offset, length = node["cold"]
+            return unpack(self._cold.get(offset, length))
+        return unpack(node["blob"])
+
+    def _drop_stored(self, node: dict) -> None:
+        with self._mem_lock:
+            blob = node.pop("blob", None)
+            if blob is not None:
+                self._warm_bytes -= len(blob)
+            cold = node.pop("cold", None)
+            if cold is not None:
+                self._cold_bytes -= cold[1]
+
+    def demote(self, node_id: int, tier: str) -> None:
+        node = self.nodes[node_id]
+        with self._tier_lock:
+            current = node.get("tier", "hot")
+            if tier == current or tier == "hot":
+                return
+            if current == "hot":
+                sim = node["sim"]
+                node["turns"] = int(sim.turns)
+                blob = pack(sim.serialize())
+            else:
+                blob = node["blob"]
+            if tier == "warm":
+                with self._mem_lock:
+                    node["blob"] = blob
+                    self._warm_bytes += len(blob)
+            elif tier == "cold":
+                if self._cold is None:
+                    self._cold = ColdStore(self._cold_dir)
+                self._drop_stored(node)
+                store, location = node.pop("cold_prev", (None, None))
+                if store is not self._cold or self._cold.get(*location) != blob:
+                    location = self._cold.put(blob)
+                with self._mem_lock:
+                    node["cold"] = location
+                    self._cold_bytes += location[1]
+            else:
+                raise ValueError("Unknown tier: " + tier)
+            node["sim"] = None
+            node["tier"] = tier
+            self._mem_not_hot(node_id, node)
+
+    def compact(self, exclude: Iterable[int] = ()) -> None:
+        """Demote idle interior nodes; leaves and ``exclude`` (e.g. running nodes) stay hot."""
+        if not self._tiering:
+            return
+        skip = set(exclude)
+        for nid in list(self.nodes):
+            node = self.nodes.get(nid)
+            if node is None or nid in skip or not self.children.get(nid):
+                continue
+            if node.get("tier", "hot") == "hot":
+                self.demote(nid, "warm")
+        if self._warm_budget and self._warm_bytes > self._warm_budget:
+            # Oldest (shallowest) warm nodes are the least likely to be revisited
+            for nid in sorted(self.nodes):
+                if self._warm_bytes <= self._warm_budget:
+                    break
+                node = self.nodes.get(nid)
+                if node is not None and nid not in skip and node.get("tier") == "warm":
+                    self.demote(nid, "cold")
+        self._compact_cold()
+
+    def _compact_cold(self) -> None:
+        """Rewrite the spill file with only the cold nodes' bytes once it is mostly dead space.
+
+        Space goes dead when cold nodes are deleted, or rehydrated and demoted
+        again with a changed state.
+        """
+        with self._tier_lock:
+            cold = self._cold
+            if cold is None or cold.size - self._cold_bytes <= max(_COLD_COMPACT_MIN_BYTES, self._cold_bytes):
+                return
+            fresh = ColdStore(self._cold_dir)
+            for node in list(self.nodes.values()):
+                location = node.get("cold")
+                if location is not None:
+                    moved = fresh.put(cold.get(*location))
+                    with self._mem_lock:
+                        node["cold"] = moved
+            self._cold = fresh
+            cold.close()
+
+    # --- memory accounting -------------------------------------------------
+
+    def node_memory(self, node_id: int) -> Dict[str, int]:
+        """Approximate bytes held by one node, by kind.
+
+        Sizes are serialized sizes (msgpack), so they track what the node holds
+        rather than exact interpreter overhead. Log entries are measured once,
+        as they are appended. Agent and scene state is measured when a node
+        becomes hot; while it runs, agent growth is estimated from the number
+        of new memory entries at the node's average log entry size.
+        ``total`` is in-memory bytes: agents + logs + scene + stored (warm
+        blob); ``cold`` bytes live in the spill file.
+        """
+        node = self.nodes[node_id]
+        with self._mem_lock:
+            acc = dict(node["mem"])
+            stored = len(node.get("blob") or b"")
+            cold = node["cold"][1] if node.get("cold") else 0
+        agents, scene = self._hot_estimate(node, acc)
+        return {
+            "agents": agents,
+            "logs": acc["logs"],
+            "scene": scene,
+            "stored": stored,
+            "cold": cold,
+            "total": agents + acc["logs"] + scene + stored,
+        }
+
+    def memory_usage(self, per_node: bool = False) -> dict:
+        """Per-kind totals over all nodes; ``per_node`` adds each node's in-memory total.
+
+        The totals are kept up to date as the tree changes, so this only walks
+        the hot nodes. Safe to call from any thread.
+        """
+        with self._mem_lock:
+            totals = {"logs": self._log_bytes, "stored": self._warm_bytes, "cold": self._cold_bytes}
+            hot = [(self.nodes.get(nid), dict(acc)) for nid, acc in self._hot_mem.items()]
+        agents = scene = 0
+        for node, acc in hot:
+            if node is not None:
+                node_agents, node_scene = self._hot_estimate(node, acc)
+                agents += node_agents
+                scene += node_scene
+        totals.update(agents=agents, scene=scene, total=agents + scene + totals["logs"] + totals["stored"])
+        if per_node:
+            totals["nodes"] = {}
+            for nid in list(self.nodes):
+                try:
+                    totals["nodes"][nid] = self.node_memory(nid)["total"]
+                except KeyError:
+                    continue  # deleted meanwhile
+        return totals
+
+    def _hot_estimate(self, node: dict, acc: dict) -> tuple:
+        sim = node.get("sim")
+        if sim is None:
+            return 0, 0
+        try:
+            grown = _memory_entries(sim) - acc["entries"]
+        except RuntimeError:
+            # Agents changed under us (node is being set up); use the last figures
+            grown = 0
+        if not grown:
+            return acc["agents"], acc["scene"]
+        count = len(node.get("logs") or ())
+        per_entry = acc["logs"] // count if count else _MEMORY_ENTRY_BYTES
+        return max(0, acc["agents"] + grown * per_entry), acc["scene"]
+
+    def _mem_add(self, node_id: int, node: dict) -> None:
+        """Start accounting a new node (call before it logs anything new)."""
+        log_bytes = sum(codec.encoded_size(entry) for entry in node["logs"])
+        self._mem_add_measured(node_id, node, log_bytes)
+
+    def _mem_add_measured(self, node_id: int, node: dict, log_bytes: int) -> None:
+        with self._mem_lock:
+            node["mem"] = {"logs": log_bytes, "agents": 0, "scene": 0, "entries": 0}
+            self._log_bytes += log_bytes
+
+    def _mem_remove(self, node_id: int, node: dict) -> None:
+        self._drop_stored(node)
+        with self._mem_lock:
+            self._log_bytes -= node["mem"]["logs"]
+            self._hot_mem.pop(node_id, None)
+
+    def _mem_hot(self, node_id: int, node: dict, snap: dict) -> None:
+        """Measure the state of a node that now holds a simulator built from ``snap``."""
+        agents = codec.encoded_size(snap.get("agents") or {})
+        scene = codec.encoded_size(snap.get("scene") or {})
+        entries = _memory_entries(node["sim"])
+        with self._mem_lock:
+            acc = node["mem"]
+            acc.update(agents=agents, scene=scene, entries=entries)
+            self._hot_mem[node_id] = acc
+
+    def _mem_not_hot(self, node_id: int, node: dict) -> None:
+        with self._mem_lock:
+            node["mem"].update(agents=0, scene=0, entries=0)
+            self._hot_mem.pop(node_id, None)
+
+    def flush_events(self) -> None:
+        """Deliver buffered events now (call on the loop thread before lifecycle broadcasts)."""
+        if self._channel is not None:
+            self._channel.flush()
+
+    def _deliver_events(self, batch: List[dict]) -> None:
+        for entry in batch:
+            for q in self._node_subs.get(entry["node"]) or []:
+                q.put_nowait(entry)
+            # Also fan out to tree-level broadcast (e.g., WS attached to the tree)
+            self._tree_broadcast(entry)
 
     @classmethod
     def new(
@@ -33,11 +341,18 @@ class SimTree:
         sim: Simulator,
         clients: Dict[str, object],
     ):
-        tree = cls(clients)
-        root_id = tree._next_id()
         # Store a live simulator object on the node; clone via serialize->deserialize
-        snap = sim.serialize()
+        return cls.from_snapshot(sim.serialize(), clients)
+
+    @classmethod
+    def from_snapshot(cls, snap: dict, clients: Dict[str, object]):
+        """New single-node tree whose root is deserialized from a simulator snapshot.
 
+        ``snap`` is not modified, so one snapshot can seed any number of trees.
+        Events still queued in it are emitted into the root logs.
+        """
+        tree = cls(clients)
+        root_id = tree._next_id()
         sim_clone = Simulator.deserialize(snap, clients, log_handler=None)
         root_logs: List[dict] = []
         tree.nodes[root_id] = {
@@ -49,31 +364,39 @@ class SimTree:
             "sim": sim_clone,
             "logs": root_logs,
         }
+        tree._mem_add_measured(root_id, tree.nodes[root_id], 0)
+        tree._mem_hot(root_id, tree.nodes[root_id], snap)
         # Attach log handler so future events at root accumulate into root logs
         tree._attach_log_handler(root_id, sim_clone, root_logs)
         sim_clone.emit_remaining_events()
         tree.children[root_id] = []
         tree.root = root_id
+        tree._index_add(root_id)
         return tree
 
+    @property
+    def seq(self) -> int:
+        """Id the next new node will get; ids are never reused."""
+        return self._seq
+
     def _next_id(self) -> int:
         i = self._seq
         self._seq = i + 1
         return i
 
     def copy_sim(self, node_id: int) -> int:
-        # Clone the simulator by snapshotting the node's live sim
-        base = self.nodes[node_id]["sim"]
-        snap = base.serialize()
-        # Deep-copy the snapshot to avoid sharing nested lists/dicts
-        deep = json.loads(json.dumps(snap))
-        sim_copy = Simulator.deserialize(deep, self.clients, log_handler=None)
+        # Clone the simulator from the node's snapshot (no rehydration for warm/cold nodes)
+        # (deserialize copies its input, so nested lists/dicts are not shared)
+        snap = self.snapshot(node_id)
+        sim_copy = Simulator.deserialize(snap, self.clients, log_handler=None)
+        # A node's turn count is that of its own run; a fresh copy has not run yet
+        sim_copy.turns = 0
 
         # Prepare a new node with inherited logs snapshot; parent/ops assigned later
         nid = self._next_id()
         parent_logs = list(self.nodes[node_id].get("logs", []))
         # Deep copy parent's logs so child does not share dict references
-        child_logs: List[dict] = json.loads(json.dumps(parent_logs))
+        child_logs: List[dict] = codec.clone(parent_logs)
         node = {
             "id": nid,
             "parent": None,
@@ -85,24 +408,39 @@ class SimTree:
         }
 
         self._attach_log_handler(nid, sim_copy, child_logs)
+        # The logs are a copy of the parent's, already measured
+        self._mem_add_measured(nid, node, self.nodes[node_id]["mem"]["logs"])
+        self._mem_hot(nid, node, snap)
         self.nodes[nid] = node
         self.children[nid] = []
         return nid
 
-    def _attach_log_handler(self, node_id: int, sim: Simulator, logs: List[dict]) -> None:
+    def log_handler(self, node_id: int):
+        """``log_event(kind, data)`` callable appending to a node's logs, for events produced elsewhere."""
+        return self._log_handler(node_id, self.nodes[node_id]["logs"])
+
+    def _log_handler(self, node_id: int, logs: List[dict]):
         def _lh(kind, data):
-            entry = {"type": kind, "data": data, "node": int(node_id)}
-            logs.append(entry)
-            subs = self._node_subs.get(node_id) or []
-            if self._loop is not None:
-                for q in subs:
-                    self._loop.call_soon_threadsafe(q.put_nowait, entry)
+            # seq is the entry's index in this node's log, so a client that
+            # missed live events knows where to pick up in the stored logs
+            entry = {"type": kind, "data": data, "node": int(node_id), "seq": len(logs)}
+            size = codec.encoded_size(entry)
+            with self._mem_lock:
+                logs.append(entry)
+                node = self.nodes.get(node_id)
+                # Entries of a deleted node are no longer counted
+                if node is not None and node.get("logs") is logs:
+                    node["mem"]["logs"] += size
+                    self._log_bytes += size
+            if self._channel is not None:
+                self._channel.publish(entry)
             else:
-                for q in subs:
-                    q.put_nowait(entry)
-            # Also fan out to tree-level broadcast (e.g., WS attached to the tree)
-            self._tree_broadcast(entry)
+                self._deliver_events([entry])
 
+        return _lh
+
+    def _attach_log_handler(self, node_id: int, sim: Simulator, logs: List[dict]) -> None:
+        _lh = self._log_handler(node_id, logs)
         sim.log_event = _lh
         for a in sim.agents.values():
             a.log_event = _lh
@@ -122,10 +460,33 @@ class SimTree:
         if q in lst:
             lst.remove(q)
 
-    def serialize(self) -> dict:
+    def has_subscribers(self) -> bool:
+        return any(self._node_subs.values())
+
+    def node_subscribers(self) -> List[object]:
+        return [q for subs in list(self._node_subs.values()) for q in list(subs)]
+
+    def close(self) -> None:
+        """Release the cold spill file once the tree is dropped; compact() stops demoting."""
+        with self._tier_lock:
+            self._tiering = False
+            if self._cold is not None:
+                self._cold.close()
+                self._cold = None
+
+    def serialize(self, node_ids: Optional[List[int]] = None) -> dict:
+        """Whole-tree state; ``node_ids`` restricts it to nodes chosen by the caller.
+
+        Callers that serialize from a worker thread should pick ``node_ids`` on
+        the thread that mutates the tree; nodes removed meanwhile are skipped.
+        """
+        if node_ids is None:
+            node_ids = list(self.nodes)
         nodes: list[dict] = []
-        for nid, node in self.nodes.items():
-            sim: Simulator = node["sim"]
+        for nid in node_ids:
+            node = self.nodes.get(nid)
+            if node is None:
+                continue
             nodes.append(
                 {
                     "id": int(nid),
@@ -133,7 +494,7 @@ class SimTree:
                     "depth": int(node["depth"]) if node.get("depth") is not None else None,
                     "edge_type": node.get("edge_type"),
                     "ops": node.get("ops", []),
-                    "sim": sim.serialize(),
+                    "sim": self.snapshot(nid),
                     "logs": list(node.get("logs", [])),
                 }
             )
@@ -170,12 +531,17 @@ class SimTree:
                 "logs": logs,
             }
             tree.nodes[nid] = node
+            tree._mem_add(nid, node)
+            tree._mem_hot(nid, node, sim_data)
             if parent is not None:
                 tree.children.setdefault(parent, []).append(nid)
             tree.children.setdefault(nid, [])
         # Attach log handlers so future events append and fan out
         for nid, node in tree.nodes.items():
             tree._attach_log_handler(nid, node["sim"], node.get("logs") or [])
+        for nid in sorted(tree.nodes):
+            if tree.nodes[nid].get("depth") is not None:
+                tree._index_add(nid, record=False)
         return tree
 
     def attach(self, parent_id: int, ops: List[dict], cid: int) -> int:
@@ -203,24 +569,26 @@ class SimTree:
         if parent_id not in self.children:
             self.children[parent_id] = []
         self.children[parent_id].append(cid)
+        self._index_add(cid)
         return cid
 
     # _save_child removed: parent/ops are assigned by the caller after copy_sim
 
     def advance(self, parent_id: int, turns: int = 1) -> int:
         cid = self.copy_sim(parent_id)
-        sim = self.nodes[cid]["sim"]
+        sim = self.get_sim(cid)
         sim.run(max_turns=int(turns))
         return self.attach(parent_id, [{"op": "advance", "turns": int(turns)}], cid)
 
     def branch(self, parent_id: int, ops: List[dict]) -> int:
         cid = self.copy_sim(parent_id)
-        sim = self.nodes[cid]["sim"]
+        sim = self.get_sim(cid)
         for op in ops:
             name = op["op"]
             if name == "agent_ctx_append":
                 ag = sim.agents[op["name"]]
                 ag.short_memory.append(op["role"], op["content"])
+                sim.on_agent_feedback(ag.name)
             elif name == "agent_plan_replace":
                 ag = sim.agents[op["name"]]
                 ag.plan_state = op["plan_state"]
@@ -261,7 +629,7 @@ class SimTree:
     def summaries(self) -> List[dict]:
         items: List[dict] = []
         for nid, node in self.nodes.items():
-            turns = int(node["sim"].turns)
+            turns = self.node_turns(nid)
             parent = node["parent"]
             edges = []
             for cid in self.children.get(nid, []):
@@ -285,31 +653,108 @@ class SimTree:
         return items
 
     def leaves(self) -> List[int]:
-        res: List[int] = []
-        for nid in self.nodes.keys():
-            if len(self.children.get(nid, [])) == 0:
-                res.append(nid)
-        res.sort()
-        return res
+        with self._index_lock:
+            return sorted(self._leaves)
 
     def max_depth(self) -> int:
-        m = 0
-        for n in self.nodes.values():
-            d = int(n["depth"])
-            if d > m:
-                m = d
-        return m
+        with self._index_lock:
+            return max(self._depths) if self._depths else 0
 
     def frontier(self, only_max_depth: bool = True) -> List[int]:
-        lf = self.leaves()
-        if not only_max_depth:
-            return lf
-        md = self.max_depth()
-        res: List[int] = []
-        for nid in lf:
-            if int(self.nodes[nid]["depth"]) == md:
-                res.append(nid)
-        return res
+        with self._index_lock:
+            if not only_max_depth:
+                return sorted(self._leaves)
+            if not self._depths:
+                return []
+            return sorted(self._depths[max(self._depths)] & self._leaves)
+
+    # Graph index ------------------------------------------------------
+
+    def _index_add(self, nid: int, record: bool = True) -> None:
+        node = self.nodes[nid]
+        depth = int(node["depth"])
+        parent = node["parent"]
+        edge = None
+        with self._index_lock:
+            self._depths.setdefault(depth, set()).add(nid)
+            self._leaves.add(nid)
+            if parent is not None:
+                self._leaves.discard(parent)
+                edge = {"from": int(parent), "to": int(nid), "type": node.get("edge_type")}
+                self._edges[nid] = edge
+            self.graph_version += 1
+            if record:
+                self._changes.append((self.graph_version, "add", {"id": int(nid), "depth": depth}, edge))
+
+    def _index_remove(self, depths: Dict[int, Optional[int]], parent: Optional[int]) -> None:
+        with self._index_lock:
+            removed = []
+            for nid, depth in depths.items():
+                bucket = self._depths.get(depth) if depth is not None else None
+                if bucket is not None and nid in bucket:
+                    bucket.discard(nid)
+                    if not bucket:
+                        del self._depths[depth]
+                    removed.append(int(nid))
+                self._leaves.discard(nid)
+                self._edges.pop(nid, None)
+            if parent is not None and parent in self.nodes:
+                if not any(c in self._edges for c in self.children.get(parent, [])):
+                    self._leaves.add(parent)
+            self.graph_version += 1
+            self._changes.append((self.graph_version, "remove", removed, None))
+
+    def graph(self, since: Optional[int] = None, epoch: Optional[str] = None) -> dict:
+        """Nodes/edges of attached nodes, or only what changed after ``since``.
+
+        A diff is returned when ``since`` (and ``epoch``, if given) refer to
+        this tree and the change log still covers it; otherwise the full graph
+        is returned with ``full: True``.
+        """
+        with self._index_lock:
+            out = {
+                "version": self.graph_version,
+                "epoch": self.graph_epoch,
+                "root": int(self.root) if self.root is not None else None,
+                "frontier": self.frontier(True),
+            }
+            oldest = self._changes[0][0] if self._changes else self.graph_version + 1
+            usable = (
+                since is not None
+                and (epoch is None or epoch == self.graph_epoch)
+                and since <= self.graph_version
+                and (since == self.graph_version or since + 1 >= oldest)
+            )
+            if not usable:
+                nodes = [
+                    {"id": int(nid), "depth": int(depth)}
+                    for depth, bucket in self._depths.items()
+                    for nid in bucket
+                ]
+                nodes.sort(key=lambda n: n["id"])
+                edges = [self._edges[nid] for nid in sorted(self._edges)]
+                out.update({"full": True, "nodes": nodes, "edges": edges})
+                return out
+            added: Dict[int, tuple] = {}
+            removed: set = set()
+            for version, kind, payload, edge in self._changes:
+                if version <= since:
+                    continue
+                if kind == "add":
+                    added[payload["id"]] = (payload, edge)
+                else:
+                    for nid in payload:
+                        if added.pop(nid, None) is None:
+                            removed.add(nid)
+            out.update(
+                {
+                    "full": False,
+                    "nodes": [added[nid][0] for nid in sorted(added)],
+                    "edges": [added[nid][1] for nid in sorted(added) if added[nid][1] is not None],
+                    "removed": sorted(removed),
+                }
+            )
+            return out
 
     def advance_frontier(
         self, turns: int = 1, only_max_depth: bool = True
@@ -327,7 +772,7 @@ class SimTree:
             res.append(cid)
         return res
 
-    def delete_subtree(self, node_id: int) -> None:
+    def delete_subtree(self, node_id: int) -> List[int]:
         if node_id == self.root:
             raise ValueError("Cannot delete root node")
         root_parent = self.nodes[node_id]["parent"]
@@ -338,14 +783,18 @@ class SimTree:
             to_del.append(nid)
             for c in self.children.get(nid, []):
                 stack.append(c)
+        depths = {nid: self.nodes[nid].get("depth") for nid in to_del if nid in self.nodes}
         for nid in to_del:
             if nid in self.children:
                 del self.children[nid]
             if nid in self.nodes:
+                self._mem_remove(nid, self.nodes[nid])
                 del self.nodes[nid]
         if root_parent is not None:
             ch = self.children.get(root_parent, [])
             if node_id in ch:
                 ch.remove(node_id)
                 self.children[root_parent] = ch
+        self._index_remove(depths, root_parent)
         # Root is not allowed to be deleted; no adjustment needed here
+        return to_del
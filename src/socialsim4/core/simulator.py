@@ -1,13 +1,16 @@
-from copy import deepcopy
 from queue import Queue
 from typing import Callable, List, Optional
 
+from socialsim4.core import codec
 from socialsim4.core.agent import Agent
 from socialsim4.core.event import Event, StatusEvent
-from socialsim4.core.ordering import ORDERING_MAP, Ordering, SequentialOrdering
+from socialsim4.core.log import get_logger
+from socialsim4.core.ordering import Ordering, SequentialOrdering
 
 # from socialsim4.core.scene import Scene
 
+log = get_logger("simulator")
+
 
 class Simulator:
     def __init__(
@@ -26,6 +29,7 @@ class Simulator:
 
         for agent in agents:
             agent.log_event = self.log_event
+            agent.on_feedback = self.on_agent_feedback
 
         self.agents = {agent.name: agent for agent in agents}  # 用dict便于查找
         self.clients = clients  # Dictionary of LLM clients
@@ -69,6 +73,9 @@ class Simulator:
         if self.started:
             self.ordering.on_event(self, event_type, data)
 
+    def on_agent_feedback(self, agent_name: str):
+        self.ordering.on_agent_feedback(agent_name)
+
     def emit_event_later(self, event_type: str, data: dict):
         self.event_queue.put({"type": event_type, "data": data})
 
@@ -116,14 +123,14 @@ class Simulator:
             "turns": int(self.turns),
             "emotion_enabled": self.emotion_enabled,
         }
-        return deepcopy(snap)
+        return codec.clone(snap)
 
     @classmethod
     def deserialize(cls, data, clients, log_handler=None):
-        data = deepcopy(data)
+        data = codec.clone(data)
         # Note: clients are not serialized and must be passed in.
         scenario_data = data["scene"]
-        from socialsim4.core.registry import SCENE_MAP
+        from socialsim4.core.registry import ORDERING_MAP, SCENE_MAP
 
         scene_type = scenario_data["type"]
         scene_class = SCENE_MAP.get(scene_type)
@@ -165,6 +172,7 @@ class Simulator:
         # Apply ordering state if provided
         simulator.ordering.deserialize(ordering_state)
         simulator.order_iter = simulator.ordering.iter()
+        simulator.turns = int(data.get("turns", 0))
         # Restore pending event queue contents
         pending = data.get("event_queue") or []
         if pending:
@@ -174,24 +182,37 @@ class Simulator:
             simulator.event_queue = q
         return simulator
 
-    def run(self, max_turns=1000):
+    def run(self, max_turns=1000, cancel=None, on_turn=None):
+        """Run up to ``max_turns`` turns.
+
+        ``cancel`` (a threading.Event) stops the run at the next step
+        boundary; the current turn's post-turn hooks still run. ``on_turn`` is
+        called with the number of completed turns after each turn.
+        """
         turns = 0
-        print(f"Running for {max_turns} turns.")
+        log.info("run start", max_turns=max_turns)
 
         while turns < max_turns:
+            if cancel is not None and cancel.is_set():
+                log.info("run cancelled", turns=turns)
+                break
             if self.scene.is_complete():
-                print("Scenario complete. Simulation ends.")
+                log.info("scenario complete", turns=turns)
                 break
 
-            agent_name = next(self.order_iter)
+            agent_name = next(self.order_iter, None)
+            if agent_name is None:
+                # The ordering has nobody to schedule; start a fresh iterator next run
+                log.info("no agent to schedule", turns=turns)
+                self.order_iter = self.ordering.iter()
+                break
 
             agent = self.agents.get(agent_name)
-            print(f"Turn {turns}: {agent_name}")
+            log.debug("turn start", turn=turns, agent=agent_name)
 
             if not agent:
                 continue
 
-            print("Running turn..")
             # Optional: provide a status prompt at the start of each turn
             status_prompt = self.scene.get_agent_status_prompt(agent)
             if status_prompt:
@@ -201,10 +222,12 @@ class Simulator:
 
             # Skip turn based on scene rule
             if self.scene.should_skip_turn(agent, self):
-                print(f"Skipping turn for {agent.name} as per scene rules.")
+                log.debug("turn skipped by scene", turn=turns, agent=agent.name)
                 self.scene.post_turn(agent, self)
                 self.ordering.post_turn(agent.name)
                 turns += 1
+                if on_turn is not None:
+                    on_turn(turns)
                 continue
 
             # Intra-turn loop (bounded by global cap)
@@ -212,18 +235,16 @@ class Simulator:
             continue_turn = True
             self.emit_remaining_events()
 
-            print(2)
-
             while continue_turn and steps < self.max_steps_per_turn:
+                if cancel is not None and cancel.is_set():
+                    break
                 try:
-                    print(3)
                     self.emit_event("agent_process_start", {"agent": agent.name, "step": steps + 1})
                     action_datas = agent.process(
                         self.clients,
                         initiative=False,
                         scene=self.scene,
                     )
-                    print(4)
                     self.emit_event(
                         "agent_process_end",
                         {
@@ -258,7 +279,7 @@ class Simulator:
                             yielded = True
                             break
                 except Exception as e:
-                    print(f"Exception: {e}")
+                    log.exception("agent step failed", agent=agent.name, step=steps + 1, error=str(e))
 
                 steps += 1
                 if yielded:
@@ -270,3 +291,5 @@ class Simulator:
             self.ordering.post_turn(agent.name)
             turns += 1
             self.turns = turns
+            if on_turn is not None:
+                on_turn(turns)
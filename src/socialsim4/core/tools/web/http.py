@@ -1,6 +1,5 @@
 import html
 import re
-import httpx
 from urllib.parse import urlparse
 
 
@@ -9,6 +8,8 @@ def http_get(url: str, headers=None, timeout=10):
 
     Raises RuntimeError on HTTP/network errors.
     """
+    import httpx
+
     with httpx.Client(follow_redirects=True, timeout=timeout, headers=headers or {}) as client:
         resp = client.get(url)
         resp.raise_for_status()
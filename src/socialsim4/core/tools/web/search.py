@@ -2,9 +2,6 @@ from __future__ import annotations
 
 from typing import List
 
-import httpx
-from duckduckgo_search import DDGS
-
 from socialsim4.core.search_config import SearchConfig
 
 
@@ -23,6 +20,8 @@ class DDGSearchClient(SearchClient):
         params = self.config.params or {}
         region = params.get("region")
         safesearch = params.get("safesearch")
+        from duckduckgo_search import DDGS
+
         with DDGS() as ddgs:
             results = ddgs.text(query, max_results=max_results, region=region, safesearch=safesearch)
             for item in results:
@@ -54,6 +53,8 @@ class SerpApiSearchClient(SearchClient):
         extra = self.config.params or {}
         for k, v in extra.items():
             params[k] = v
+        import httpx
+
         with httpx.Client(timeout=30) as client:
             resp = client.get(base, params=params)
             data = resp.json()
@@ -83,6 +84,8 @@ class SerperSearchClient(SearchClient):
             "num": max(1, min(10, int(max_results))),
         }
         headers = {"X-API-KEY": api_key, "Content-Type": "application/json"}
+        import httpx
+
         with httpx.Client(timeout=30) as client:
             resp = client.post(base, json=payload, headers=headers)
             data = resp.json()
@@ -141,6 +144,8 @@ class TavilySearchClient(SearchClient):
         ]:
             if key in extra:
                 payload[key] = extra[key]
+        import httpx
+
         with httpx.Client(timeout=30) as client:
             resp = client.post(base, json={"api_key": api_key, **payload})
             data = resp.json()
@@ -1,5 +1,4 @@
 import re
-import trafilatura
 
 from .http import http_get, safe_http_https_only, strip_html_text
 
@@ -23,6 +22,9 @@ def view_page(url: str, max_chars: int = 4000):
     text = body
     title = None
     if content_type and "text/html" in content_type:
+        # trafilatura pulls in lxml and friends; import on first page view
+        import trafilatura
+
         extracted = trafilatura.extract(
             body, include_comments=False, include_tables=False
         )
@@ -0,0 +1,38 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from litestar.testing import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+import socialsim4.backend.models  # noqa: F401
+from socialsim4.backend.core import database
+from socialsim4.backend.db.base import Base
+from socialsim4.backend.main import app
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    """Test client on a temporary SQLite database, logged in as a user with an active mock provider."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'api.db'}")
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+    monkeypatch.setattr(database, "SessionLocal", sessions)
+
+    async def _create_tables():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    asyncio.run(_create_tables())
+    client = TestClient(app)
+    client.post(
+        "/api/auth/register",
+        json={"email": "r@example.com", "username": "r", "full_name": "R", "phone_number": "+8613800138000", "password": "pw123456"},
+    )
+    token = client.post("/api/auth/login", json={"email": "r@example.com", "password": "pw123456"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    provider = client.post(
+        "/api/providers/", json={"name": "m", "provider": "mock", "model": "mock", "base_url": "", "api_key": ""}, headers=headers
+    ).json()
+    client.post(f"/api/providers/{provider['id']}/activate", headers=headers)
+    yield SimpleNamespace(client=client, headers=headers, sessions=sessions)
+    asyncio.run(engine.dispose())
@@ -0,0 +1,42 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from socialsim4.backend.api.routes import admin
+from socialsim4.backend.db.base import Base
+from socialsim4.backend.models.user import User
+
+
+def test_stats_buckets_and_keyset_pages(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'admin.db'}")
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+    now = datetime.now()
+    created = [now, now, now - timedelta(days=1), now - timedelta(days=40)]
+
+    async def scenario():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with sessions() as session:
+            for i, at in enumerate(created):
+                session.add(User(email=f"u{i}@x.io", username=f"u{i}", hashed_password="x", created_at=at, updated_at=at))
+            await session.commit()
+
+            buckets, start = admin._period_buckets("day", now)
+            signups = await admin._count_by_bucket(session, "sqlite", "day", User.created_at, start)
+
+            pages, cursor = [], None
+            while True:
+                stmt = admin._keyset(select(User), User.created_at, User.id, True, cursor, True, 3)
+                rows = (await session.execute(stmt.add_columns(User.created_at.label("sort_key")))).all()
+                pages.append([row[0].username for row in rows[:3]])
+                if len(rows) <= 3:
+                    break
+                cursor = admin._encode_cursor(rows[2].sort_key, rows[2][0].id)
+        await engine.dispose()
+        return buckets, signups, pages
+
+    buckets, signups, pages = asyncio.run(scenario())
+    assert signups == {buckets[-1]: 2, buckets[-2]: 1}
+    assert pages == [["u1", "u0", "u2"], ["u3"]]
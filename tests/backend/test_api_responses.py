@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+from socialsim4.backend.api.responses import encode_json
+from socialsim4.backend.models.simulation import SimulationLog
+
+
+def test_encoder_rejects_unknown_types():
+    with pytest.raises(TypeError):
+        encode_json({"sim": object()})
+
+
+def test_pre_encoded_bodies_round_trip(api):
+    client, headers, sessions = api.client, api.headers, api.sessions
+    sim = client.post(
+        "/api/simulations/",
+        json={
+            "scene_type": "simple_chat_scene",
+            "scene_config": {"initial_events": ["hi"]},
+            "agent_config": {"agents": [{"name": "A", "profile": "p"}]},
+        },
+        headers=headers,
+    ).json()
+
+    payload = {"node": 0, "seq": 0, "data": {"text": "héllo \"quoted\"", "items": [1, 2.5, None, True]}}
+
+    async def _add_log():
+        async with sessions() as session:
+            session.add(SimulationLog(simulation_id=sim["id"], sequence=0, event_type="system_broadcast", payload=payload))
+            await session.commit()
+
+    asyncio.run(_add_log())
+    # Stored payload JSON is embedded as-is (msgspec.Raw); it must still parse to the same value
+    logs = client.get(f"/api/simulations/{sim['id']}/logs", headers=headers)
+    assert logs.status_code == 200 and logs.headers["content-type"].startswith("application/json")
+    [entry] = logs.json()
+    assert entry["event_type"] == "system_broadcast" and entry["payload"] == payload
+    assert isinstance(entry["created_at"], str)
+
+    graph = client.get(f"/api/simulations/{sim['id']}/tree/graph", headers=headers).json()
+    assert graph["root"] == 0 and graph["nodes"] == [{"id": 0, "depth": 0}] and graph["running"] == []
+
+    events = client.get(f"/api/simulations/{sim['id']}/tree/sim/0/events", params={"limit": 1}, headers=headers)
+    assert events.status_code == 200 and len(events.json()) == 1
+    assert events.headers["x-next-since"] == "1"
+    again = client.get(f"/api/simulations/{sim['id']}/tree/sim/0/events", params={"limit": 1}, headers={**headers, "If-None-Match": events.headers["etag"]})
+    assert again.status_code == 304
+
+
+def test_snapshot_pages_are_cached_as_encoded_nodes(api, monkeypatch):
+    from socialsim4.backend.api.routes import simulations
+
+    client, headers = api.client, api.headers
+    sim = client.post(
+        "/api/simulations/",
+        json={
+            "scene_type": "simple_chat_scene",
+            "scene_config": {"initial_events": ["hi"]},
+            "agent_config": {"agents": [{"name": "A", "profile": "p"}]},
+        },
+        headers=headers,
+    ).json()
+    snap = client.post(f"/api/simulations/{sim['id']}/save", json={"label": "s"}, headers=headers).json()
+    monkeypatch.setattr(simulations, "_SNAPSHOT_PAGES", simulations.OrderedDict())
+
+    page = client.get(f"/api/simulations/{sim['id']}/snapshots/{snap['id']}", params={"limit": 1}, headers=headers).json()
+    assert page["root"] == 0 and page["total_nodes"] == 1 and page["next_offset"] is None
+    assert page["nodes"][0]["id"] == 0 and page["nodes"][0]["sim"]["agents"]
+    [(_, pages, size)] = simulations._SNAPSHOT_PAGES.values()
+    assert all(isinstance(node, bytes) for node in pages["nodes"]) and size == len(pages["nodes"][0])
+
+    # Entries larger than the budget are served but not kept
+    simulations._SNAPSHOT_PAGES.clear()
+    monkeypatch.setattr(simulations, "_SNAPSHOT_PAGES_MAX_BYTES", size - 1)
+    again = client.get(f"/api/simulations/{sim['id']}/snapshots/{snap['id']}", headers=headers).json()
+    assert again["nodes"] == page["nodes"] and not simulations._SNAPSHOT_PAGES
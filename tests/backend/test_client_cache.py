@@ -0,0 +1,27 @@
+import asyncio
+
+from socialsim4.backend.services import clients as clients_module
+from socialsim4.backend.services.clients import ClientCache
+
+
+def test_clients_are_reused_until_invalidated(monkeypatch):
+    builds = []
+
+    async def _build(session, user_id):
+        builds.append(user_id)
+        return {"chat": object()}
+
+    monkeypatch.setattr(clients_module, "build_user_clients", _build)
+    cache = ClientCache()
+
+    async def scenario():
+        first = await cache.get(None, 1)
+        again = await cache.get(None, 1)
+        cache.invalidate(1)
+        rebuilt = await cache.get(None, 1)
+        return first, again, rebuilt
+
+    first, again, rebuilt = asyncio.run(scenario())
+    assert first is again
+    assert rebuilt is not first
+    assert builds == [1, 1]
@@ -0,0 +1,29 @@
+import json
+import zlib
+
+import pytest
+
+from socialsim4.core import codec
+from socialsim4.core.node_tiers import unpack
+
+SNAP = {
+    "agents": {"Alice": {"name": "Alice", "role": "seer"}, "Bob": {"name": "Bob", "role": "seer"}},
+    "event_queue": [{"type": "system_broadcast", "data": {"recipients": ["Alice", "Bob"], "time": 1080}}],
+    "scene": {"state": {"hands": {"Alice": [3, 4, 5]}, "ratio": 0.5, "over": False, "winner": None}},
+}
+
+
+@pytest.mark.parametrize("intern", [False, True])
+def test_round_trip(intern):
+    blob = codec.encode(SNAP, intern=intern)
+    assert blob.startswith(codec.MAGIC)
+    assert codec.decode(blob) == SNAP
+
+
+def test_reads_json_snapshots_and_rejects_newer_versions():
+    assert codec.decode(json.dumps(SNAP).encode()) == SNAP
+    assert unpack(zlib.compress(json.dumps(SNAP).encode())) == SNAP
+    blob = bytearray(codec.encode(SNAP))
+    blob[3] = codec.VERSION + 1
+    with pytest.raises(codec.CodecError):
+        codec.decode(bytes(blob))
@@ -0,0 +1,66 @@
+from types import SimpleNamespace
+
+from socialsim4.backend.services.simtree_runtime import _build_tree_for_sim
+from socialsim4.core.ordering import EventDrivenOrdering
+from socialsim4.core.simulator import Simulator
+
+
+def _fake_sim(pending: dict[str, bool]):
+    agents = {n: SimpleNamespace(short_memory=[1] if p else [], last_history_length=0) for n, p in pending.items()}
+    return SimpleNamespace(agents=agents)
+
+
+def test_only_agents_with_input_are_scheduled():
+    sim = _fake_sim({"A": False, "B": True, "C": False})
+    ordering = EventDrivenOrdering()
+    ordering.set_simulation(sim)
+    it = ordering.iter()
+
+    assert next(it) == "B"
+    sim.agents["B"].last_history_length = 1
+    sim.agents["C"].short_memory.append(1)
+    ordering.on_agent_feedback("C")
+    ordering.post_turn("B")
+    assert next(it) == "C"
+    sim.agents["C"].last_history_length = 1
+    ordering.post_turn("C")
+    assert next(it, None) is None
+
+
+def test_idle_agents_are_woken():
+    sim = _fake_sim({"A": False, "B": False})
+    ordering = EventDrivenOrdering(max_idle=2)
+    ordering.set_simulation(sim)
+    it = ordering.iter()
+    # Nobody is ready: the longest idle agent is woken instead of stopping
+    assert next(it) == "A"
+    ordering.post_turn("A")
+    assert next(it) == "B"
+
+
+def test_run_stops_when_nobody_is_ready():
+    tree = _build_tree_for_sim(
+        SimpleNamespace(
+            id="E",
+            name="chat",
+            scene_type="simple_chat_scene",
+            scene_config={"initial_events": ["hello"], "ordering": "event_driven"},
+            agent_config={"agents": [{"name": "A", "profile": "p"}]},
+        )
+    )
+    sim = tree.get_sim(tree.root)
+    assert isinstance(sim.ordering, EventDrivenOrdering)
+    assert sim.ordering.get_state()["ready"] == ["A"]
+
+    # A answers the greeting; the echo of its own message does not wake it again
+    done = []
+    sim.run(max_turns=30, on_turn=done.append)
+    assert done == [1]
+
+    copy = Simulator.deserialize(sim.serialize(), tree.clients)
+    assert isinstance(copy.ordering, EventDrivenOrdering)
+    copy.run(max_turns=30, on_turn=done.append)
+    assert done == [1]
+    copy.agents["A"].add_env_feedback("ping")
+    copy.run(max_turns=30, on_turn=done.append)
+    assert done == [1, 1]
@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+
+from socialsim4.backend.services.event_stream import EventSubscriber
+
+
+def _delta(seq: int, content: str, node: int = 1) -> dict:
+    return {
+        "type": "agent_ctx_delta",
+        "data": {"agent": "Alice", "role": "user", "content": content},
+        "node": node,
+        "seq": seq,
+    }
+
+
+def test_drop_oldest_reports_lag():
+    sub = EventSubscriber(maxsize=2, policy="drop_oldest")
+    for seq in range(4):
+        sub.put_nowait(_delta(seq, str(seq)))
+    batch = asyncio.run(sub.get_many())
+    assert batch[0] == {"type": "lag", "data": {"dropped": 2, "nodes": {"1": 0}, "graph": False}}
+    assert [e["seq"] for e in batch[1:]] == [2, 3]
+    assert sub.dropped == 2
+
+
+def test_coalesce_merges_ctx_deltas():
+    sub = EventSubscriber(maxsize=2, policy="coalesce")
+    sub.put_nowait({"type": "run_start", "data": {"node": 1}})
+    for seq in range(3):
+        sub.put_nowait(_delta(seq, str(seq)))
+    batch = asyncio.run(sub.get_many())
+    assert len(batch) == 2
+    assert batch[1]["data"]["content"] == "0\n1\n2"
+    assert sub.dropped == 0
+
+
+def test_disconnect_policy_flags_overflow():
+    sub = EventSubscriber(maxsize=1, policy="disconnect")
+    sub.put_nowait(_delta(0, "a"))
+    sub.put_nowait(_delta(1, "b"))
+    assert sub.overflowed
+    assert asyncio.run(sub.get_many()) == []
+    assert sub.resync_hint()["data"]["nodes"] == {"1": 0}
+
+
+def test_event_channel_batches_worker_thread_events():
+    from socialsim4.core.event_channel import EventChannel
+
+    async def scenario():
+        batches: list[list[dict]] = []
+        channel = EventChannel(batches.append, asyncio.get_running_loop(), flush_interval=0.01, max_batch=1000)
+        await asyncio.to_thread(lambda: [channel.publish({"seq": i}) for i in range(50)])
+        await asyncio.sleep(0.05)
+        return batches
+
+    batches = asyncio.run(scenario())
+    assert len(batches) == 1
+    assert [e["seq"] for e in batches[0]] == list(range(50))
+
+
+def test_frame_encoder_formats_and_deflate():
+    import json
+    import zlib
+
+    import msgspec
+
+    from socialsim4.backend.services.event_stream import FrameEncoder
+
+    events = [_delta(0, "hello " * 50), _delta(1, "hello " * 50)]
+    (text,) = FrameEncoder("json", batched=True).encode(events)
+    assert json.loads(text) == events
+
+    (packed,) = FrameEncoder("msgpack", batched=True).encode(events)
+    assert msgspec.msgpack.decode(packed) == events
+
+    encoder = FrameEncoder("json", compress="deflate")
+    frames = encoder.encode(events)
+    assert encoder.binary and len(frames) == 2
+    inflater = zlib.decompressobj(-15)
+    assert [json.loads(inflater.decompress(f)) for f in frames] == events
+    # The second frame is compressed against the first
+    assert len(frames[1]) < len(frames[0])
+
+    # Same rule as the HTTP responses: no repr() of unknown objects on the wire
+    for fmt in ("json", "msgpack"):
+        with pytest.raises(TypeError):
+            FrameEncoder(fmt).encode([{"type": "x", "data": object()}])
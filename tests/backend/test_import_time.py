@@ -0,0 +1,16 @@
+import subprocess
+import sys
+
+HEAVY = ("openai", "google.generativeai", "trafilatura", "duckduckgo_search", "httpx")
+
+
+def test_core_import_does_not_load_provider_sdks():
+    # -X importtime lists every module imported, one per line on stderr
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import socialsim4.cli, socialsim4.core.registry, socialsim4.core.simtree"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    loaded = {line.rsplit("|", 1)[-1].strip() for line in proc.stderr.splitlines() if line.startswith("import time:")}
+    assert not [name for name in HEAVY if name in loaded]
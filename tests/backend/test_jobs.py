@@ -0,0 +1,86 @@
+import asyncio
+from types import SimpleNamespace
+
+from socialsim4.backend.services.event_stream import EventSubscriber
+from socialsim4.backend.services.jobs import JobManager
+from socialsim4.backend.services.simtree_runtime import SimTreeRecord, _build_tree_for_sim, wire_tree_events
+
+
+def _tree():
+    return _build_tree_for_sim(
+        SimpleNamespace(
+            id="X",
+            name="chat",
+            scene_type="simple_chat_scene",
+            scene_config={"initial_events": ["hello"]},
+            agent_config={"agents": [{"name": "A", "profile": "p"}, {"name": "B", "profile": "q"}]},
+        )
+    )
+
+
+def test_job_reports_progress_and_stops_on_cancel():
+    record = SimTreeRecord(_tree())
+    subscriber = EventSubscriber(maxsize=10_000)
+    record.subs.append(subscriber)
+    manager = JobManager()
+
+    async def scenario():
+        cid = record.tree.copy_sim(record.tree.root)
+        sim = record.tree.get_sim(cid)
+
+        async def body(job):
+            def _run():
+                progress = job.turn_callback(cid)
+
+                # Cancel from inside the run once a few turns have completed
+                def _on_turn(turns):
+                    progress(turns)
+                    if turns == 3:
+                        job.cancel_event.set()
+
+                sim.run(max_turns=100, cancel=job.cancel_event, on_turn=_on_turn)
+
+            await asyncio.to_thread(_run)
+            return {"child": cid}
+
+        job = manager.submit("X", "advance_chain", record, 100, body)
+        await job.task
+        await asyncio.sleep(0)
+        return job, await subscriber.get_many()
+
+    job, events = asyncio.run(scenario())
+    assert job.status == "cancelled"
+    assert job.done_turns == 3
+    assert record.active_jobs == 0
+    statuses = [e["data"]["status"] for e in events if e["type"] == "job_progress"]
+    assert statuses[0] == "running" and statuses[-1] == "cancelled"
+
+
+def test_progress_does_not_overtake_buffered_node_events():
+    record = SimTreeRecord(_tree())
+    subscriber = EventSubscriber(maxsize=10_000)
+    record.subs.append(subscriber)
+    manager = JobManager()
+
+    async def scenario():
+        wire_tree_events(record, record.tree)
+        # Batches would only go out on their own after the run is over
+        record.tree.attach_event_loop(asyncio.get_running_loop(), flush_interval=60.0)
+        cid = record.tree.copy_sim(record.tree.root)
+        record.running.add(cid)
+        sim = record.tree.get_sim(cid)
+
+        async def body(job):
+            await asyncio.to_thread(sim.run, max_turns=3, on_turn=job.turn_callback(cid))
+            return {"child": cid}
+
+        job = manager.submit("X", "advance", record, 3, body)
+        await job.task
+        await asyncio.sleep(0)
+        return await subscriber.get_many()
+
+    events = asyncio.run(scenario())
+    kinds = [e["type"] for e in events]
+    first_turn = next(i for i, e in enumerate(events) if e["type"] == "job_progress" and e["data"]["done_turns"] == 1)
+    assert "job_progress" not in kinds[1:first_turn] and first_turn > 1
+    assert kinds[-1] == "job_progress" and events[-1]["data"]["status"] == "succeeded"
@@ -0,0 +1,59 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from socialsim4.backend.db.base import Base
+from socialsim4.backend.models.simulation import Simulation, SimTreeNode, SimulationLog
+from socialsim4.backend.models.user import User
+from socialsim4.backend.services import log_writer
+from socialsim4.backend.services.log_writer import SimulationLogWriter
+
+
+def test_log_writer_batches_rows_with_monotonic_sequence(tmp_path, monkeypatch):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'logs.db'}")
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+
+    @asynccontextmanager
+    async def _session():
+        async with sessions() as session:
+            yield session
+
+    monkeypatch.setattr(log_writer, "get_session", _session)
+
+    async def scenario():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with sessions() as session:
+            user = User(email="a@example.com", username="a", full_name="A", hashed_password="x")
+            session.add(user)
+            await session.flush()
+            session.add(Simulation(id="SIM1", owner_id=user.id, name="s", scene_type="simple_chat_scene"))
+            node_row = SimTreeNode(simulation_id="SIM1", node_id=1, parent_node_id=0, depth=1, edge_type="advance", ops=[], state={})
+            session.add(node_row)
+            await session.commit()
+
+        writer = SimulationLogWriter(max_buffer=5, batch_size=2)
+        for i in range(6):
+            writer.submit("SIM1", {"type": "agent_ctx_delta", "data": {"i": i}, "node": 1, "seq": i})
+        assert writer.dropped == 1
+        await writer.stop()
+
+        # A fresh writer continues the sequence from what is stored
+        writer = SimulationLogWriter()
+        writer.submit("SIM1", {"type": "system_broadcast", "data": {}, "node": 1, "seq": 5})
+        writer.submit("SIM1", {"type": "system_broadcast", "data": {}, "node": 2, "seq": 0})
+        await writer.stop()
+
+        async with sessions() as session:
+            rows = (await session.execute(select(SimulationLog).order_by(SimulationLog.sequence))).scalars().all()
+        await engine.dispose()
+        return rows, node_row.id
+
+    rows, node_row_id = asyncio.run(scenario())
+    assert [r.sequence for r in rows] == [0, 1, 2, 3, 4, 5, 6]
+    # Events point at their stored tree node; node 2 has no row yet
+    assert [r.tree_node_id for r in rows] == [node_row_id] * 6 + [None]
+    assert [r.payload["data"].get("i") for r in rows[:5]] == [0, 1, 2, 3, 4]
+    assert rows[-2].event_type == "system_broadcast"
@@ -0,0 +1,39 @@
+from litestar.testing import TestClient
+from pydantic import SecretStr
+
+from socialsim4.backend.core.config import get_settings
+from socialsim4.backend.main import app
+from socialsim4.core.metrics import MetricsRegistry
+
+
+def test_metrics_endpoint_exposes_runtime_gauges():
+    client = TestClient(app)
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert "# TYPE socialsim4_simtrees gauge" in body
+    assert "# TYPE socialsim4_llm_request_duration_seconds histogram" in body
+    assert 'socialsim4_ws_subscribers{scope="tree"}' in body
+    assert "# TYPE process_cpu_seconds_total counter" in body
+    assert "simulation=" not in body
+
+
+def test_metrics_token_is_required_when_configured(monkeypatch):
+    monkeypatch.setattr(get_settings(), "metrics_token", SecretStr("scrape"))
+    client = TestClient(app)
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer scrape"}).status_code == 200
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    hist = registry.histogram("demo_seconds", "Demo.", ["provider"], buckets=(0.1, 1.0))
+    hist.observe(0.05, provider="mock")
+    hist.observe(0.5, provider="mock")
+    text = registry.render()
+    assert 'demo_seconds_bucket{provider="mock",le="0.1"} 1' in text
+    assert 'demo_seconds_bucket{provider="mock",le="1"} 2' in text
+    assert 'demo_seconds_bucket{provider="mock",le="+Inf"} 2' in text
+    assert 'demo_seconds_count{provider="mock"} 2' in text
@@ -0,0 +1,83 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from socialsim4.backend.services.node_executor import _CANCEL_SLOTS, ProcessNodeExecutor
+from socialsim4.backend.services.simtree_runtime import _build_tree_for_sim
+from socialsim4.scenarios.basic import LLMSettings, make_clients
+
+
+def _tree():
+    return _build_tree_for_sim(
+        SimpleNamespace(
+            id="P",
+            name="chat",
+            scene_type="simple_chat_scene",
+            scene_config={"initial_events": ["hello"]},
+            agent_config={"agents": [{"name": "A", "profile": "p"}, {"name": "B", "profile": "q"}]},
+        ),
+        make_clients(LLMSettings(dialect="mock")),
+    )
+
+
+def test_process_executor_runs_node_remotely_and_streams_events():
+    tree = _tree()
+    cid = tree.copy_sim(tree.root)
+    tree.attach(tree.root, [{"op": "advance", "turns": 2}], cid)
+    before = len(tree.nodes[cid]["logs"])
+    progress = []
+    executor = ProcessNodeExecutor(max_workers=1)
+    try:
+        asyncio.run(executor.run(tree, cid, 2, cancel=threading.Event(), on_turn=progress.append))
+    finally:
+        executor.shutdown()
+
+    logs = tree.nodes[cid]["logs"]
+    assert progress == [1, 2]
+    assert tree.get_sim(cid).turns == 2
+    assert len(logs) > before
+    assert [entry["seq"] for entry in logs] == list(range(len(logs)))
+    assert {entry["node"] for entry in logs[before:]} == {cid}
+
+
+def test_process_executor_bounds_runs_and_cancels():
+    tree = _tree()
+    tree.configure_tiers(True)
+    children = [tree.copy_sim(tree.root) for _ in range(3)]
+    for cid in children:
+        tree.attach(tree.root, [{"op": "advance", "turns": 1}], cid)
+    # A warm node is shipped from its stored snapshot
+    tree.demote(children[0], "warm")
+    stopped = threading.Event()
+    stopped.set()
+    progress = []
+    executor = ProcessNodeExecutor(max_workers=1)
+
+    async def scenario():
+        await asyncio.gather(*[executor.run(tree, cid, 1) for cid in children])
+        await executor.run(tree, children[1], 3, cancel=stopped, on_turn=progress.append)
+        loop = asyncio.get_running_loop()
+        started = asyncio.Event()
+        task = asyncio.create_task(
+            executor.run(tree, children[2], 100000, on_turn=lambda _: loop.call_soon_threadsafe(started.set))
+        )
+        await started.wait()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        # The worker stops at its next step and hands the slot back
+        for _ in range(100):
+            if len(executor._free_slots) == _CANCEL_SLOTS:
+                break
+            await asyncio.sleep(0.05)
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+
+    assert tree.get_sim(children[0]).turns == 1
+    assert progress == []
+    assert len(executor._free_slots) == _CANCEL_SLOTS
@@ -0,0 +1,33 @@
+import subprocess
+import sys
+
+import pytest
+
+from socialsim4.core.registry import SCENE_ACTIONS, SCENE_DESCRIPTIONS, SCENE_MAP, register_scene
+
+
+@pytest.fixture
+def plugin_scene():
+    # The registries are process-wide; drop the test scene again so it does not leak into later tests
+    yield "plugin_chat_scene"
+    SCENE_MAP._specs.pop("plugin_chat_scene", None)
+    SCENE_MAP._loaded.pop("plugin_chat_scene", None)
+    SCENE_ACTIONS.pop("plugin_chat_scene", None)
+    SCENE_DESCRIPTIONS.pop("plugin_chat_scene", None)
+
+
+def test_resolving_one_scene_leaves_other_scene_modules_unloaded():
+    code = (
+        "import sys\n"
+        "from socialsim4.core.registry import SCENE_MAP, ACTION_SPACE_MAP\n"
+        "SCENE_MAP['simple_chat_scene']; ACTION_SPACE_MAP['send_message']\n"
+        "print(','.join(m for m in sys.modules if m.startswith('socialsim4.core.scenes.')))\n"
+    )
+    proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert proc.stdout.strip().split(",") == ["socialsim4.core.scenes.simple_chat_scene"]
+
+
+def test_register_scene_by_path(plugin_scene):
+    register_scene(plugin_scene, "socialsim4.core.scenes.simple_chat_scene:SimpleChatScene", allowed_actions=["send_message"])
+    assert SCENE_MAP[plugin_scene] is SCENE_MAP["simple_chat_scene"]
+    assert SCENE_ACTIONS[plugin_scene]["allowed"] == ["send_message"]
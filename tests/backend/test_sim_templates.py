@@ -0,0 +1,56 @@
+from types import SimpleNamespace
+
+from socialsim4.backend.services.sim_templates import TEMPLATE_HITS
+from socialsim4.backend.services.simtree_runtime import SIM_TEMPLATES, SIM_TREE_REGISTRY, _build_tree_for_sim
+
+
+def _record(**overrides):
+    fields = dict(
+        id="T",
+        name="chat",
+        scene_type="simple_chat_scene",
+        scene_config={"initial_events": ["hello"]},
+        agent_config={"agents": [{"name": "A", "profile": "p"}, {"name": "B", "profile": "q"}]},
+    )
+    fields.update(overrides)
+    return SimpleNamespace(**fields)
+
+
+def test_trees_for_same_config_are_independent_clones():
+    SIM_TEMPLATES.clear()
+    first = _build_tree_for_sim(_record())
+    assert len(SIM_TEMPLATES) == 1
+    second = _build_tree_for_sim(_record(id="U", name="copy"))
+    assert len(SIM_TEMPLATES) == 1
+    assert first.nodes[first.root]["logs"] == second.nodes[second.root]["logs"]
+
+    first.get_sim(first.root).agents["A"].user_profile = "changed"
+    assert second.get_sim(second.root).agents["A"].user_profile == "p"
+
+    _build_tree_for_sim(_record(scene_config={"initial_events": ["other"]}))
+    assert len(SIM_TEMPLATES) == 2
+    assert first.get_sim(first.root).scene.name == "chat"
+    assert second.get_sim(second.root).scene.name == "copy"
+
+
+def test_copied_simulation_is_cloned_from_the_template(api):
+    client, headers = api.client, api.headers
+    SIM_TEMPLATES.clear()
+    sim = client.post(
+        "/api/simulations/",
+        json={
+            "scene_type": "simple_chat_scene",
+            "scene_config": {"initial_events": ["hi"]},
+            "agent_config": {"agents": [{"name": "A", "profile": "p"}]},
+        },
+        headers=headers,
+    ).json()
+    assert client.get(f"/api/simulations/{sim['id']}/tree/graph", headers=headers).status_code == 200
+
+    copy = client.post(f"/api/simulations/{sim['id']}/copy", headers=headers).json()
+    assert copy["name"] != sim["name"]
+    hits = TEMPLATE_HITS.value()
+    assert client.get(f"/api/simulations/{copy['id']}/tree/graph", headers=headers).status_code == 200
+    assert TEMPLATE_HITS.value() == hits + 1
+    tree = SIM_TREE_REGISTRY.get(copy["id"]).tree
+    assert tree.get_sim(tree.root).scene.name == copy["name"]
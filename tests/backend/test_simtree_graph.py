@@ -0,0 +1,38 @@
+from types import SimpleNamespace
+
+from socialsim4.backend.services.simtree_runtime import _build_tree_for_sim
+
+
+def _tree():
+    return _build_tree_for_sim(
+        SimpleNamespace(
+            id="X",
+            name="chat",
+            scene_type="simple_chat_scene",
+            scene_config={},
+            agent_config={"agents": [{"name": "A", "profile": "p"}]},
+        )
+    )
+
+
+def test_graph_index_tracks_attach_and_delete():
+    tree = _tree()
+    root = tree.root
+    a = tree.advance(root, turns=1)
+    b = tree.advance(root, turns=1)
+    start = tree.graph()
+    assert start["full"] and tree.frontier() == [a, b]
+
+    c = tree.advance(a, turns=1)
+    unattached = tree.copy_sim(b)
+    tree.delete_subtree(b)
+    diff = tree.graph(since=start["version"], epoch=start["epoch"])
+    assert diff["full"] is False
+    assert [n["id"] for n in diff["nodes"]] == [c]
+    assert diff["edges"] == [{"from": a, "to": c, "type": "advance"}]
+    assert diff["removed"] == [b]
+    assert tree.leaves() == [c] and tree.max_depth() == 2 and unattached not in tree.leaves()
+
+    # Unknown epoch or a version older than the change log gives the full graph
+    assert tree.graph(since=start["version"], epoch="other")["full"] is True
+    assert tree.graph(since=diff["version"])["nodes"] == []
@@ -0,0 +1,38 @@
+from types import SimpleNamespace
+
+from socialsim4.backend.services.simtree_runtime import _build_tree_for_sim
+
+
+def test_memory_accounting_tracks_growth_and_tiers():
+    tree = _build_tree_for_sim(
+        SimpleNamespace(
+            id="M",
+            name="chat",
+            scene_type="simple_chat_scene",
+            scene_config={"initial_events": ["hello"]},
+            agent_config={"agents": [{"name": "A", "profile": "p"}, {"name": "B", "profile": "q"}]},
+        )
+    )
+    root = tree.root
+    before = tree.node_memory(root)
+    assert before["logs"] > 0 and before["agents"] > 0 and before["scene"] > 0
+
+    cid = tree.advance(root, 2)
+    child = tree.node_memory(cid)
+    assert child["logs"] > before["logs"] and child["agents"] > before["agents"]
+
+    tree.demote(root, "warm")
+    warm = tree.node_memory(root)
+    assert warm["agents"] == warm["scene"] == 0 and warm["stored"] > 0
+    assert warm["logs"] == before["logs"]
+
+    usage = tree.memory_usage(per_node=True)
+    assert usage["total"] == sum(usage["nodes"].values()) == warm["total"] + child["total"]
+    assert tree.memory_usage()["total"] == usage["total"]
+
+    tree.get_sim(root)
+    assert tree.node_memory(root)["agents"] == before["agents"]
+    tree.delete_subtree(cid)
+    usage = tree.memory_usage(per_node=True)
+    assert list(usage["nodes"]) == [root] and usage["total"] == tree.node_memory(root)["total"]
+    assert usage["logs"] == before["logs"] and usage["stored"] == 0
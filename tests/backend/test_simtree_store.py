@@ -0,0 +1,235 @@
+import asyncio
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from socialsim4.backend.db.base import Base
+from socialsim4.backend.models.simulation import Simulation, SimTreeNode
+from socialsim4.backend.services import simtree_store
+from socialsim4.backend.services.simtree_runtime import _build_tree_for_sim
+
+
+def test_nodes_round_trip_through_sim_tree_nodes(tmp_path, monkeypatch):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'tree.db'}")
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+
+    @asynccontextmanager
+    async def _session():
+        async with sessions() as session:
+            yield session
+
+    monkeypatch.setattr(simtree_store, "get_session", _session)
+
+    sim_record = SimpleNamespace(
+        id="SIM1",
+        name="chat",
+        scene_type="simple_chat_scene",
+        scene_config={"initial_events": ["hello"]},
+        agent_config={"agents": [{"name": "A", "profile": "p"}, {"name": "B", "profile": "q"}]},
+    )
+    tree = _build_tree_for_sim(sim_record)
+    first = tree.advance(tree.root, turns=1)
+    second = tree.advance(first, turns=1)
+    doomed = tree.advance(first, turns=1)
+
+    async def scenario():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with sessions() as session:
+            session.add(Simulation(id="SIM1", owner_id=1, name="chat", scene_type="simple_chat_scene"))
+            await session.commit()
+        await simtree_store.save_nodes("SIM1", tree, list(tree.nodes))
+        tree.delete_subtree(doomed)
+        await simtree_store.delete_nodes("SIM1", [doomed])
+        loaded = await simtree_store.load_tree("SIM1", tree.clients)
+        async with sessions() as session:
+            rows = {row.node_id: row for row in (await session.execute(select(SimTreeNode))).scalars()}
+        await engine.dispose()
+        return loaded, rows
+
+    loaded, rows = asyncio.run(scenario())
+    assert sorted(loaded.nodes) == sorted(tree.nodes)
+    assert loaded.nodes[second]["logs"] == tree.nodes[second]["logs"]
+    assert loaded.nodes[second]["sim"].turns == tree.nodes[second]["sim"].turns == 1
+    assert loaded.children[first] == [second]
+    assert rows[tree.root].parent_id is None
+    assert rows[second].parent_id == rows[first].id and rows[first].parent_id == rows[tree.root].id
+    # The deleted node had the largest id; it is not handed out again
+    assert loaded.seq == tree.seq == doomed + 1
+    assert loaded.copy_sim(first) == doomed + 1
+
+
+def test_copies_start_at_zero_turns_and_stored_nodes_keep_theirs():
+    tree = _build_tree_for_sim(
+        SimpleNamespace(
+            id="SIM3",
+            name="chat",
+            scene_type="simple_chat_scene",
+            scene_config={"initial_events": ["hello"]},
+            agent_config={"agents": [{"name": "A", "profile": "p"}]},
+        )
+    )
+    node = tree.advance(tree.root, turns=1)
+    assert tree.node_turns(node) == 1
+    # A branch child reports its own (not yet run) turns, not its parent's
+    assert tree.node_turns(tree.copy_sim(node)) == 0
+    tree.demote(node, "warm")
+    assert tree.node_turns(node) == 1 and tree.get_sim(node).turns == 1
+
+
+def test_failed_replace_keeps_the_stored_tree(tmp_path, monkeypatch):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'tree.db'}")
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+
+    @asynccontextmanager
+    async def _session():
+        async with sessions() as session:
+            yield session
+
+    monkeypatch.setattr(simtree_store, "get_session", _session)
+    tree = _build_tree_for_sim(
+        SimpleNamespace(
+            id="SIM2",
+            name="chat",
+            scene_type="simple_chat_scene",
+            scene_config={"initial_events": ["hello"]},
+            agent_config={"agents": [{"name": "A", "profile": "p"}]},
+        )
+    )
+    tree.advance(tree.root, turns=1)
+    real_state = simtree_store._node_state
+
+    async def scenario():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        await simtree_store.replace_tree("SIM2", tree)
+        # Every row claims node 0: the inserts violate the unique index after the delete ran
+        monkeypatch.setattr(simtree_store, "_node_state", lambda t, nid: real_state(t, t.root))
+        with pytest.raises(IntegrityError):
+            await simtree_store.replace_tree("SIM2", tree)
+        loaded = await simtree_store.load_tree("SIM2", tree.clients)
+        await engine.dispose()
+        return loaded
+
+    loaded = asyncio.run(scenario())
+    assert sorted(loaded.nodes) == sorted(tree.nodes)
+
+
+def test_registry_evicts_least_recently_used_idle_tree():
+    from socialsim4.backend.services.simtree_runtime import SimTreeRecord, SimTreeRegistry
+
+    registry = SimTreeRegistry(max_trees=2)
+    tree = _build_tree_for_sim(
+        SimpleNamespace(
+            id="X",
+            name="chat",
+            scene_type="simple_chat_scene",
+            scene_config={},
+            agent_config={"agents": [{"name": "A", "profile": "p"}]},
+        )
+    )
+    for key in ("A", "B", "C"):
+        registry._records[key] = SimTreeRecord(tree, simulation_id=key)
+    registry._records["A"].running.add(1)
+    registry.get("A")
+    registry._enforce_budget(keep="C")
+    assert [k for k, _ in registry.items()] == ["C", "A"]
+
+
+def test_leased_and_subscribed_trees_are_kept_and_evicted_trees_closed():
+    from socialsim4.backend.services.simtree_runtime import SimTreeRecord, SimTreeRegistry
+
+    def _tree():
+        return _build_tree_for_sim(
+            SimpleNamespace(
+                id="X",
+                name="chat",
+                scene_type="simple_chat_scene",
+                scene_config={"initial_events": ["hello"]},
+                agent_config={"agents": [{"name": "A", "profile": "p"}]},
+            )
+        )
+
+    registry = SimTreeRegistry(max_trees=1)
+    for key in ("A", "B", "C", "D"):
+        registry._records[key] = SimTreeRecord(_tree(), simulation_id=key)
+    spilled = registry._records["A"].tree
+    spilled.configure_tiers(True)
+    spilled.advance(spilled.root, turns=1)
+    spilled.demote(spilled.root, "cold")
+    assert spilled._cold is not None
+    registry._records["C"].tree.add_node_sub(0, object())
+
+    with registry.lease(registry.get("B")):
+        registry._enforce_budget(keep="D")
+        assert [k for k, _ in registry.items()] == ["C", "D", "B"]
+    assert spilled._cold is None
+    registry._enforce_budget(keep="D")
+    assert [k for k, _ in registry.items()] == ["C", "D"]
+
+
+def test_interior_nodes_move_to_warm_and_cold_tiers():
+    tree = _build_tree_for_sim(
+        SimpleNamespace(
+            id="X",
+            name="chat",
+            scene_type="simple_chat_scene",
+            scene_config={"initial_events": ["hello"]},
+            agent_config={"agents": [{"name": "A", "profile": "p"}, {"name": "B", "profile": "q"}]},
+        )
+    )
+    tree.configure_tiers(True, warm_budget_bytes=0)
+    child = tree.advance(tree.root, turns=1)
+    grandchild = tree.advance(child, turns=1)
+    expected = tree.snapshot(child)
+
+    tree.compact(exclude=[grandchild])
+    assert (tree.tier(tree.root), tree.tier(child), tree.tier(grandchild)) == ("warm", "warm", "hot")
+    tree.demote(child, "cold")
+    assert tree.snapshot(child) == expected
+
+    # Copying from a cold node does not rehydrate it; inspecting it does
+    sibling = tree.advance(child, turns=1)
+    assert tree.tier(child) == "cold" and tree.tier(sibling) == "hot"
+    assert tree.get_sim(child).serialize() == expected
+    assert tree.tier(child) == "hot"
+
+
+def test_cold_file_reuses_unchanged_bytes_and_compacts(monkeypatch):
+    from socialsim4.core import simtree
+
+    tree = _build_tree_for_sim(
+        SimpleNamespace(
+            id="X",
+            name="chat",
+            scene_type="simple_chat_scene",
+            scene_config={"initial_events": ["hello"]},
+            agent_config={"agents": [{"name": "A", "profile": "p"}]},
+        )
+    )
+    tree.configure_tiers(True)
+    node = tree.advance(tree.root, turns=1)
+    tree.demote(node, "cold")
+    size = tree._cold.size
+
+    # Inspecting and demoting again with no change appends nothing
+    for _ in range(3):
+        tree.get_sim(node)
+        tree.demote(node, "warm")
+        tree.demote(node, "cold")
+    assert tree._cold.size == size
+
+    # Changed state is appended; dead copies go once they outweigh the live bytes
+    monkeypatch.setattr(simtree, "_COLD_COMPACT_MIN_BYTES", 0)
+    for _ in range(2):
+        tree.get_sim(node).run(max_turns=1)
+        expected = tree.snapshot(node)
+        tree.demote(node, "cold")
+        assert tree._cold.size > tree.memory_usage()["cold"]
+    tree.compact()
+    assert tree._cold.size == tree.memory_usage()["cold"]
+    assert tree.snapshot(node) == expected
@@ -0,0 +1,72 @@
+from types import SimpleNamespace
+
+import pytest
+from litestar.exceptions import HTTPException
+
+from socialsim4.backend.api.routes import simulations
+from socialsim4.backend.services.simtree_runtime import _build_tree_for_sim
+
+
+def _advanced_tree():
+    tree = _build_tree_for_sim(
+        SimpleNamespace(
+            id="Q",
+            name="chat",
+            scene_type="simple_chat_scene",
+            scene_config={"initial_events": ["hello"]},
+            agent_config={"agents": [{"name": "A", "profile": "p"}, {"name": "B", "profile": "q"}]},
+        )
+    )
+    return tree, tree.advance(tree.root, 3)
+
+
+def test_event_pages_follow_the_type_filter():
+    tree, node = _advanced_tree()
+    logs = tree.nodes[node]["logs"]
+    matching = [i for i, entry in enumerate(logs) if entry["type"] == "action_end"]
+    assert len(matching) >= 2
+
+    page, next_since = simulations._events_page(tree, node, 0, 1, "action_end")
+    assert page == [logs[matching[0]]]
+    # The cursor points at the first matching entry that did not fit
+    assert next_since == matching[1]
+    page, _ = simulations._events_page(tree, node, next_since, 1, "action_end")
+    assert page == [logs[matching[1]]]
+
+    page, next_since = simulations._events_page(tree, node, matching[-1], None, "action_end")
+    assert page == [logs[matching[-1]]] and next_since == len(logs)
+
+
+def test_state_selection_and_tail():
+    tree, node = _advanced_tree()
+    state = simulations._state_view(tree, node, "B", 0)
+    assert [a["name"] for a in state["agents"]] == ["B"]
+    assert state["agents"][0]["short_memory"] == [] and state["agents"][0]["memory_size"] > 0
+    state = simulations._state_view(tree, node, None, 2)
+    assert all(len(a["short_memory"]) == 2 for a in state["agents"])
+
+
+def test_unknown_node_is_404():
+    tree, _ = _advanced_tree()
+    for call in (
+        lambda: simulations._events_etag(tree, 999, 0, None, None),
+        lambda: simulations._state_etag(tree, 999, None, None),
+        lambda: simulations._state_view(tree, 999, None, None),
+    ):
+        with pytest.raises(HTTPException) as exc:
+            call()
+        assert exc.value.status_code == 404
+
+
+def test_etags_change_when_the_node_logs():
+    tree, node = _advanced_tree()
+    events_etag = simulations._events_etag(tree, node, 0, None, None)
+    state_etag = simulations._state_etag(tree, node, None, None)
+    request = SimpleNamespace(headers={"If-None-Match": f'W/"other", {events_etag}'})
+    assert simulations._not_modified(request, events_etag)
+    assert not simulations._not_modified(SimpleNamespace(headers={}), events_etag)
+
+    tree.get_sim(node).emit_event("system_broadcast", {"text": "late"})
+    assert simulations._events_etag(tree, node, 0, None, None) != events_etag
+    assert simulations._state_etag(tree, node, None, None) != state_etag
+    assert not simulations._not_modified(request, simulations._events_etag(tree, node, 0, None, None))
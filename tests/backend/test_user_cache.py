@@ -0,0 +1,30 @@
+from datetime import datetime, timezone
+
+from socialsim4.backend.schemas.user import UserPublic
+from socialsim4.backend.services.user_cache import UserCache
+
+
+def _user(role="user"):
+    now = datetime.now(timezone.utc)
+    return UserPublic(
+        id=7,
+        email="a@example.com",
+        username="a",
+        is_active=True,
+        is_verified=True,
+        role=role,
+        created_at=now,
+        updated_at=now,
+    )
+
+
+def test_cached_user_expires_and_invalidates():
+    cache = UserCache(ttl_seconds=60)
+    cache.put(_user())
+    assert cache.get(7).role == "user"
+    cache.invalidate(7)
+    assert cache.get(7) is None
+
+    cache.ttl = -1
+    cache.put(_user("admin"))
+    assert cache.get(7) is None